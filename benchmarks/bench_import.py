@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 下午5:20
+# @Author  : fzf
+# @FileName: bench_import.py
+# @Software: PyCharm
+"""
+冷启动耗时：每轮起一个全新解释器，测 `import core.service` 与首次取策略的耗时，
+并检查重依赖（playwright / httpx / rich）是否被提前导入。
+
+    python -m benchmarks.bench_import --runs 10 --output import.json
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+from .bench_login import percentile
+
+HEAVY_MODULES = ("playwright", "httpx", "rich")
+
+_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import core.service
+t1 = time.perf_counter()
+after_import = [m for m in %(heavy)r if m in sys.modules]
+from core.strategies import LoginStrategyFactory
+LoginStrategyFactory.get(%(platform)r)
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "first_get_ms": (t2 - t1) * 1000,
+                  "heavy_after_import": after_import,
+                  "heavy_after_get": [m for m in %(heavy)r if m in sys.modules]}))
+"""
+
+
+def probe(platform: str) -> Dict[str, Any]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = _PROBE % {"heavy": HEAVY_MODULES, "platform": platform}
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {"p50_ms": round(percentile(samples, 50), 3), "p95_ms": round(percentile(samples, 95), 3),
+            "min_ms": round(min(samples), 3)}
+
+
+def bench(args: argparse.Namespace) -> Dict[str, Any]:
+    runs = [probe(args.platform) for _ in range(args.runs)]
+    return {
+        "meta": {"runs": args.runs, "platform": args.platform, "python": sys.version.split()[0]},
+        "import": summarize([r["import_ms"] for r in runs]),
+        "first_get": summarize([r["first_get_ms"] for r in runs]),
+        "heavy_after_import": runs[-1]["heavy_after_import"],
+        "heavy_after_get": runs[-1]["heavy_after_get"],
+    }
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="cold import benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--platform", default="baijiahao")
+    parser.add_argument("--output", help="结果 JSON 路径，缺省输出到 stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> None:
+    args = parse_args(argv)
+    text = json.dumps(bench(args), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
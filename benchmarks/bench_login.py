@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 下午2:40
+# @Author  : fzf
+# @FileName: bench_login.py
+# @Software: PyCharm
+"""
+离线压测：在本地替身站点上跑 auth / setup / 批量校验，输出各并发档位的 p50/p95/p99 与吞吐（JSON）。
+
+    python -m benchmarks.bench_login --backend http --concurrency 1,8,32 --requests 500 --output bench.json
+
+--proxies N 时经 N 个替身代理访问（另加 --dead-proxies 个不可用出口，观察摘除），报告附带各代理的分配与健康状态。
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import platform as _platform
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from core.schemas import LoginOptions, LoginResponse
+from core.service import LoginService
+from core.strategies.utils.proxy_pool import proxy_pool
+from core.utils.timeouts import adaptive_timeouts
+
+from .proxy import dead_proxy, spawn_proxies
+from .server import PLATFORMS, patch_urls, spawn_server, storage_state
+
+# 只能经替身代理解析的主机名，确认请求确实走了代理
+PROXIED_HOST = "bench.test"
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def summarize(latencies: List[float], elapsed: float, results: List[LoginResponse]) -> Dict[str, Any]:
+    reasons: Dict[str, int] = {}
+    for r in results:
+        reasons[str(r.reason)] = reasons.get(str(r.reason), 0) + 1
+    return {
+        "requests": len(results),
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "reasons": reasons,
+    }
+
+
+def make_accounts(directory: str, host: str, count: int) -> List[Tuple[str, str]]:
+    """按平台轮流生成 storage_state，一半有效一半失效。"""
+    items = []
+    for i in range(count):
+        platform = PLATFORMS[i % len(PLATFORMS)]
+        path = os.path.join(directory, platform, f"account{i}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(storage_state(host, valid=i % 2 == 0), f)
+        items.append((platform, path))
+    return items
+
+
+async def run_calls(items: List[Tuple[str, str]], concurrency: int,
+                    call: Callable[[str, str], Awaitable[LoginResponse]]) -> Dict[str, Any]:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    results: List[LoginResponse] = []
+
+    async def one(platform: str, account_file: str) -> None:
+        async with sem:
+            start = time.perf_counter()
+            res = await call(platform, account_file)
+            latencies.append(time.perf_counter() - start)
+            results.append(res)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(p, f) for p, f in items))
+    return summarize(latencies, time.perf_counter() - start, results)
+
+
+async def run_batch(items: List[Tuple[str, str]], concurrency: int, options: LoginOptions) -> Dict[str, Any]:
+    # 单条耗时取结果自带的 extra["timings"]["total"]（含排队），整体吞吐另由 throughput_rps 给出
+    latencies: List[float] = []
+    results: List[LoginResponse] = []
+    start = time.perf_counter()
+    async for res in LoginService.auth_many(items, options=options, concurrency=concurrency):
+        total_ms = (res.extra.get("timings") or {}).get("total")
+        if total_ms is not None:
+            latencies.append(total_ms / 1000.0)
+        results.append(res)
+    return summarize(latencies, time.perf_counter() - start, results)
+
+
+async def bench(args: argparse.Namespace) -> Dict[str, Any]:
+    proc, base_url = spawn_server(redirect_to_login=not args.no_redirect)
+    proxy_proc = None
+    if args.proxies:
+        parts = urlsplit(base_url)
+        proxy_proc, proxy_urls = spawn_proxies(args.proxies, resolve={PROXIED_HOST: parts.hostname})
+        proxy_pool.configure(proxy_urls + [dead_proxy() for _ in range(args.dead_proxies)])
+        base_url = f"http://{PROXIED_HOST}:{parts.port}"
+    else:
+        proxy_pool.configure([])
+    patch_urls(base_url)
+    host = urlsplit(base_url).hostname
+    # 替身站点的耗时不能混进线上学到的超时，也不能覆盖 LOGIN_TIMEOUT_STATE_FILE
+    adaptive_timeouts.path = ""
+    options = LoginOptions(headless=True, http_auth=args.backend == "http", auth_cache=False, retries=1,
+                           enable_screenshot_on_error=False, adaptive_timeouts=False)
+    report: Dict[str, Any] = {
+        "meta": {
+            "backend": args.backend,
+            "server": base_url,
+            "requests": args.requests,
+            "proxies": args.proxies,
+            "dead_proxies": args.dead_proxies if args.proxies else 0,
+            "python": sys.version.split()[0],
+            "machine": _platform.machine(),
+            "timestamp": time.time(),
+        },
+        "results": [],
+    }
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            items = make_accounts(directory, host, args.requests)
+            if args.backend == "browser":
+                await LoginService.start()
+            for concurrency in args.concurrency:
+                for mode in args.modes:
+                    if mode == "auth":
+                        stats = await run_calls(items, concurrency, lambda p, f: LoginService.auth(
+                            p, f, options=options))
+                    elif mode == "setup":
+                        stats = await run_calls(items, concurrency, lambda p, f: LoginService.setup(
+                            p, f, handle=False, options=options))
+                    else:
+                        stats = await run_batch(items, concurrency, options)
+                    report["results"].append({"mode": mode, "concurrency": concurrency, **stats})
+        if args.proxies:
+            report["proxies"] = LoginService.proxy_stats()
+    finally:
+        await LoginService.stop()
+        for p in (proc, proxy_proc):
+            if p is not None:
+                p.terminate()
+                p.join()
+    return report
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="offline login/auth benchmark")
+    parser.add_argument("--backend", choices=["http", "browser"], default="http")
+    parser.add_argument("--modes", type=lambda v: v.split(","), default=["auth", "setup", "batch"])
+    parser.add_argument("--concurrency", type=lambda v: [int(x) for x in v.split(",")], default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--no-redirect", action="store_true", help="首页不跳转登录页，直接渲染需登录文案")
+    parser.add_argument("--proxies", type=int, default=0, help="经多少个替身代理访问，0 为直连")
+    parser.add_argument("--dead-proxies", type=int, default=0, help="额外加入的不可用代理数（需 --proxies）")
+    parser.add_argument("--output", help="结果 JSON 路径，缺省输出到 stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(bench(args))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/20 上午11:50
+# @Author  : fzf
+# @FileName: proxy.py
+# @Software: PyCharm
+"""
+本地替身出口代理：普通 HTTP 转发（绝对 URI）+ CONNECT 隧道，可选 Basic 认证。
+resolve 把主机名映射到实际地址（如 bench.test -> 127.0.0.1）：这类主机名只有经代理才能访问，
+可以确认请求确实走了代理；Chromium 默认对 127.0.0.1/localhost 绕过代理，压测时也需要这样的主机名。
+"""
+from __future__ import annotations
+import base64
+import http.client
+import multiprocessing
+import select
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-authorization", "proxy-authenticate", "proxy-connection", "te",
+              "trailer", "transfer-encoding", "upgrade"}
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    resolve: Dict[str, str] = {}
+    auth: str | None = None  # "user:pass"
+
+    def setup(self) -> None:
+        super().setup()
+        # 同一客户端连接上复用到上游的 keep-alive 连接
+        self._upstreams: Dict[Tuple[str, int], http.client.HTTPConnection] = {}
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _target(self, host: str) -> str:
+        return self.resolve.get(host, host)
+
+    def _authorized(self) -> bool:
+        if not self.auth:
+            return True
+        expected = "Basic " + base64.b64encode(self.auth.encode()).decode()
+        if self.headers.get("Proxy-Authorization") == expected:
+            return True
+        self.send_response(407)
+        self.send_header("Proxy-Authenticate", 'Basic realm="bench"')
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return False
+
+    def _forward(self) -> None:
+        if not self._authorized():
+            return
+        parts = urlsplit(self.path)
+        if parts.scheme != "http" or not parts.hostname:
+            self.send_error(400, "absolute http URI required")
+            return
+        address = (self._target(parts.hostname), parts.port or 80)
+        conn = self._upstreams.get(address)
+        if conn is None:
+            conn = self._upstreams[address] = http.client.HTTPConnection(*address, timeout=30)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_BY_HOP}
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        try:
+            conn.request(self.command, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            data = resp.read()
+        except OSError:
+            self._upstreams.pop(address, None)
+            conn.close()
+            self.send_error(502, "upstream unreachable")
+            return
+        self.send_response(resp.status, resp.reason)
+        for k, v in resp.getheaders():
+            if k.lower() not in HOP_BY_HOP and k.lower() != "content-length":
+                self.send_header(k, v)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_HEAD = _forward
+
+    def do_CONNECT(self) -> None:
+        if not self._authorized():
+            return
+        host, _, port = self.path.rpartition(":")
+        try:
+            upstream = socket.create_connection((self._target(host), int(port)), timeout=30)
+        except (OSError, ValueError):
+            self.send_error(502, "upstream unreachable")
+            return
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self.close_connection = True
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, _ = select.select(sockets, [], [], 30)
+                if not readable:
+                    return
+                for s in readable:
+                    data = s.recv(65536)
+                    if not data:
+                        return
+                    (upstream if s is self.connection else self.connection).sendall(data)
+        finally:
+            upstream.close()
+
+
+class StandInProxy:
+    """在后台线程运行的替身代理，url 可直接放进 LOGIN_PROXIES / proxy_pool.configure()。"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, resolve: Dict[str, str] | None = None,
+                 auth: str | None = None) -> None:
+        handler = type("Handler", (_ProxyHandler,), {"resolve": dict(resolve or {}), "auth": auth})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.auth = auth
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{self.auth + '@' if self.auth else ''}{host}:{port}"
+
+    def start(self) -> StandInProxy:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _serve(conn, count: int, resolve: Dict[str, str], auth: str | None) -> None:
+    proxies = [StandInProxy(resolve=resolve, auth=auth).start() for _ in range(count)]
+    conn.send([p.url for p in proxies])
+    threading.Event().wait()
+
+
+def spawn_proxies(count: int, resolve: Dict[str, str] | None = None,
+                  auth: str | None = None) -> Tuple[multiprocessing.Process, List[str]]:
+    """在子进程中运行 count 个替身代理（各自监听一个端口），返回 (进程, 代理 URL 列表)。"""
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe()
+    proc = ctx.Process(target=_serve, args=(child, count, dict(resolve or {}), auth), daemon=True)
+    proc.start()
+    return proc, parent.recv()
+
+
+def dead_proxy() -> str:
+    """一个没有进程监听的本地端口，用来模拟不可用的出口。"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+if __name__ == "__main__":
+    proxy = StandInProxy(port=8766, resolve={"bench.test": "127.0.0.1"}).start()
+    print(f"stand-in proxy on {proxy.url}")
+    threading.Event().wait()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 下午2:10
+# @Author  : fzf
+# @FileName: server.py
+# @Software: PyCharm
+"""本地平台替身：模拟各平台首页/登录页的「已登录」与「需要登录」两种形态，供压测离线使用。"""
+from __future__ import annotations
+import multiprocessing
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Tuple
+from urllib.parse import urlsplit
+
+from core.config import URLConfig
+from core.enums import LoginStrategyType
+
+PLATFORMS = [LoginStrategyType.BAIJIAHAO, LoginStrategyType.TOUTIAO, LoginStrategyType.NETEASE,
+             LoginStrategyType.SOHU, LoginStrategyType.DAYU, LoginStrategyType.PENGUIN, LoginStrategyType.YIDIAN]
+
+SESSION_COOKIE = "bench_session"
+VALID_SESSION = "valid"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive，贴近真实站点
+    disable_nagle_algorithm = True  # 头和正文分两次写，不关 Nagle 会吃到 40ms 延迟 ACK
+    need_login_text: Dict[str, str] = {}
+    redirect_to_login = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: str = "", headers: Dict[str, str] | None = None) -> None:
+        raw = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(raw)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_GET(self) -> None:
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        if len(parts) != 2 or parts[0] not in self.need_login_text:
+            return self._send(404, "not found")
+        platform, page = parts
+        logged_in = f"{SESSION_COOKIE}={VALID_SESSION}" in (self.headers.get("Cookie") or "")
+        need_login = f"<html><body><a>{self.need_login_text[platform]}</a></body></html>"
+        if page == "login":
+            return self._send(200, need_login)
+        if page != "home":
+            return self._send(404, "not found")
+        if logged_in:
+            return self._send(200, f"<html><body><h1>{platform} dashboard</h1></body></html>")
+        if self.redirect_to_login:
+            return self._send(302, headers={"Location": f"/{platform}/login?redirect=home"})
+        # 不跳转、直接在首页渲染需登录文案的形态
+        return self._send(200, need_login)
+
+
+class StandInServer:
+    """在后台线程运行的替身站点，start() 后通过 patch_urls() 把 URLConfig 指向它。"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, redirect_to_login: bool = True) -> None:
+        handler = type("Handler", (_Handler,), {
+            "need_login_text": {p: URLConfig().platform(p, "NEED_LOGIN_TEXT") for p in PLATFORMS},
+            "redirect_to_login": redirect_to_login,
+        })
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> StandInServer:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def patch_urls(self, platforms: Iterable[str] = PLATFORMS) -> None:
+        patch_urls(self.base_url, platforms)
+
+
+def patch_urls(base_url: str, platforms: Iterable[str] = PLATFORMS) -> None:
+    """把各平台的首页/登录页、放行域名与关键 cookie 指向替身站点。"""
+    host = urlsplit(base_url).hostname
+    for p in platforms:
+        prefix = str(p).upper()
+        setattr(URLConfig, f"{prefix}_HOME_URL", f"{base_url}/{p}/home")
+        setattr(URLConfig, f"{prefix}_LOGIN_URL", f"{base_url}/{p}/login")
+        setattr(URLConfig, f"{prefix}_AUTH_DOMAINS", (host,))
+        setattr(URLConfig, f"{prefix}_AUTH_COOKIES", (SESSION_COOKIE,))
+
+
+def _serve(conn, redirect_to_login: bool) -> None:
+    server = StandInServer(redirect_to_login=redirect_to_login)
+    conn.send(server.base_url)
+    server.httpd.serve_forever()
+
+
+def spawn_server(redirect_to_login: bool = True) -> Tuple[multiprocessing.Process, str]:
+    """在子进程中运行替身站点，避免与压测客户端争抢 GIL。返回 (进程, base_url)。"""
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe()
+    proc = ctx.Process(target=_serve, args=(child, redirect_to_login), daemon=True)
+    proc.start()
+    return proc, parent.recv()
+
+
+def storage_state(host: str, valid: bool, expires: float = -1) -> Dict:
+    return {
+        "cookies": [{"name": SESSION_COOKIE, "value": VALID_SESSION if valid else "expired", "domain": host,
+                     "path": "/", "expires": expires, "httpOnly": True, "secure": False, "sameSite": "Lax"}],
+        "origins": [],
+    }
+
+
+if __name__ == "__main__":
+    server = StandInServer(port=8765).start()
+    print(f"stand-in platforms on {server.base_url}")
+    threading.Event().wait()
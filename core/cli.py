@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 下午6:10
+# @Author  : fzf
+# @FileName: cli.py
+# @Software: PyCharm
+"""
+按 JSONL 清单批量校验 / 登录，结果逐行输出为 JSONL，支持断点续跑。
+
+清单每行一个对象：{"platform": "baijiahao", "account_file": "./data/a.json", "mode": "auth"}
+mode 可省略（取 --mode），可选 auth / setup / login_and_save。
+
+    python -m core.cli accounts.jsonl -o results.jsonl --concurrency 32 --platform baijiahao,toutiao \\
+        --option http_auth=true --option auth_cache=true
+
+中断后用同样的参数再跑一次即可：结论明确的条目（cookie 有效 / 失效 / 文件缺失、登录成功）记录在
+checkpoint 文件（缺省为 <清单>.ckpt）中，会被跳过；熔断、超时等暂时性失败续跑时重试。结果追加写入输出文件。
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+from typing import Any, Dict, IO, Iterator, List, Set, Tuple
+
+from .enums import LoginReasonType, StrategyModeType
+from .schemas import LoginOptions, LoginResponse
+from .service import BATCH_MODES, LoginService
+
+Item = Tuple[str, str, str]
+
+_MODE_ALIASES = {"login": StrategyModeType.LOGIN}
+_TRUE = {"1", "true", "yes", "y", "on"}
+_FALSE = {"0", "false", "no", "n", "off"}
+
+
+def _parse_value(field: dataclasses.Field, raw: str) -> Any:
+    """按 LoginOptions 字段声明的类型解析命令行字符串。"""
+    kind = str(field.type)
+    optional = "None" in kind
+    if optional and raw.strip().lower() in ("", "none", "null"):
+        return None
+    if kind.startswith("bool"):
+        value = raw.strip().lower()
+        if value not in _TRUE | _FALSE:
+            raise ValueError(f"{field.name} expects a boolean, got {raw!r}")
+        return value in _TRUE
+    if kind.startswith("int"):
+        return int(raw)
+    if kind.startswith("float"):
+        return float(raw)
+    if kind.startswith("list"):
+        return [x.strip() for x in raw.split(",") if x.strip()]
+    return raw
+
+
+def build_options(overrides: List[str]) -> LoginOptions:
+    """在环境默认值（LoginOptions().default）之上应用 --option key=value。"""
+    options = LoginOptions().default
+    fields = {f.name: f for f in dataclasses.fields(LoginOptions)}
+    changes: Dict[str, Any] = {}
+    for entry in overrides:
+        key, sep, raw = entry.partition("=")
+        key = key.strip()
+        if not sep or key not in fields:
+            raise ValueError(f"invalid --option {entry!r}, expected key=value with key in {sorted(fields)}")
+        changes[key] = _parse_value(fields[key], raw)
+    return dataclasses.replace(options, **changes)
+
+
+def _item_key(item: Item) -> str:
+    return json.dumps(list(item), ensure_ascii=False)
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """读取已完成条目；最后一行可能因中断写了一半，直接忽略。"""
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                done.add(_item_key(tuple(json.loads(line))))
+            except (ValueError, TypeError):
+                continue
+    return done
+
+
+def read_manifest(stream: IO[str], default_mode: str, platforms: Set[str] | None, done: Set[str],
+                  stats: Counter) -> Iterator[Item]:
+    """流式读取清单（不整体载入内存），过滤平台与已完成条目。"""
+    for lineno, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            row = json.loads(line)
+            platform, account_file = str(row["platform"]), str(row["account_file"])
+            mode = str(row.get("mode") or default_mode)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            stats["invalid"] += 1
+            print(f"manifest line {lineno} skipped: {e!r}", file=sys.stderr)
+            continue
+        mode = _MODE_ALIASES.get(mode, mode)
+        if platforms and platform not in platforms:
+            stats["filtered"] += 1
+            continue
+        item = (platform, account_file, mode)
+        if _item_key(item) in done:
+            stats["resumed"] += 1
+            continue
+        done.add(_item_key(item))  # 清单内重复条目只跑一次
+        yield item
+
+
+def result_line(item: Item, res: LoginResponse) -> str:
+    # 不输出 storage_state 等大对象，只保留对账需要的字段
+    platform, account_file, mode = item
+    return json.dumps({"platform": platform, "account_file": account_file, "mode": mode, **res.to_dict()},
+                      ensure_ascii=False, default=str)
+
+
+# 结论明确的结果：cookie 有效 / 失效 / 文件缺失，以及登录成功；其余（熔断、超时、浏览器错误等）续跑时重试
+CONCLUSIVE_REASONS = frozenset({LoginReasonType.COOKIE_VALID, LoginReasonType.COOKIE_INVALID,
+                                LoginReasonType.COOKIE_FILE_MISSING})
+
+
+def is_conclusive(res: LoginResponse) -> bool:
+    if res.reason in CONCLUSIVE_REASONS:
+        return True
+    return bool(res.ok) and res.reason in (LoginReasonType.COOKIE_SAVED, LoginReasonType.OK)
+
+
+class Checkpoint:
+    """追加写入已完成条目，每 sync_every 条 fsync 一次，兼顾吞吐与崩溃后的丢失量。"""
+
+    def __init__(self, path: str, sync_every: int = 100) -> None:
+        self.path = path
+        self.sync_every = max(1, sync_every)
+        self._file: IO[str] | None = None
+        self._unsynced = 0
+
+    def __enter__(self) -> Checkpoint:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        return self
+
+    def add(self, item: Item) -> None:
+        self._file.write(_item_key(item) + "\n")
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+
+async def run(args: argparse.Namespace, options: LoginOptions) -> Counter:
+    platforms = {p for value in args.platform for p in value.split(",") if p} or None
+    checkpoint_path = args.checkpoint or (f"{args.manifest}.ckpt" if args.manifest != "-" else None)
+    if checkpoint_path and args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    done = load_checkpoint(checkpoint_path) if checkpoint_path else set()
+    stats: Counter = Counter()
+    start = time.perf_counter()
+
+    with ExitStack() as stack:
+        manifest = sys.stdin if args.manifest == "-" else stack.enter_context(
+            open(args.manifest, "r", encoding="utf-8"))
+        # 续跑时结果追加到同一文件
+        output = sys.stdout if args.output in (None, "-") else stack.enter_context(
+            open(args.output, "a", encoding="utf-8"))
+        checkpoint = stack.enter_context(Checkpoint(checkpoint_path, args.sync_every)) if checkpoint_path else None
+        if args.start_pool:
+            await LoginService.start()
+        try:
+            items = read_manifest(manifest, args.mode, platforms, done, stats)
+            deadline = time.time() + args.deadline if args.deadline else None
+            async for item, res in LoginService.run_many(items, options=options, concurrency=args.concurrency,
+                                                         handle=args.handle, deadline=deadline):
+                # 先写结果再记 checkpoint：中断时最多重复输出，不会丢结果
+                output.write(result_line(item, res) + "\n")
+                output.flush()
+                # 只有结论明确的条目记 checkpoint，熔断 / 超时 / 截止时间中断等续跑时重新执行
+                if checkpoint is not None and is_conclusive(res):
+                    checkpoint.add(item)
+                stats["done"] += 1
+                stats[f"reason:{res.reason}"] += 1
+        finally:
+            await LoginService.stop()
+    stats["elapsed_ms"] = int((time.perf_counter() - start) * 1000)
+    return stats
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m core.cli", description="bulk auth / login from a JSONL manifest")
+    parser.add_argument("manifest", help="JSONL 清单路径，- 表示 stdin")
+    parser.add_argument("-o", "--output", help="结果 JSONL 路径（追加写），缺省输出到 stdout")
+    parser.add_argument("--checkpoint", help="checkpoint 路径，缺省为 <manifest>.ckpt（stdin 时不记录）")
+    parser.add_argument("--restart", action="store_true", help="忽略并清空已有 checkpoint，从头开始")
+    parser.add_argument("--concurrency", type=int, default=None, help="全局并发，缺省 LOGIN_BATCH_CONCURRENCY")
+    parser.add_argument("--platform", action="append", default=[], help="只处理这些平台，可重复或逗号分隔")
+    parser.add_argument("--mode", default=StrategyModeType.AUTH, choices=[*BATCH_MODES, "login"],
+                        help="清单行未指定 mode 时使用")
+    parser.add_argument("--handle", action="store_true", help="setup 模式下失效时触发登录")
+    parser.add_argument("--option", action="append", default=[], metavar="KEY=VALUE",
+                        help="覆盖 LoginOptions 字段，如 http_auth=true、retries=1，可重复")
+    parser.add_argument("--start-pool", action="store_true", help="预先启动浏览器池（登录 / 混合模式时推荐）")
+    parser.add_argument("--sync-every", type=int, default=100, help="每写入多少条 fsync 一次 checkpoint")
+    parser.add_argument("--deadline", type=float, default=None, metavar="SECONDS",
+                        help="整批最长运行秒数，到点返回已完成部分，未完成的下次续跑")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(argv)
+    try:
+        options = build_options(args.option)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    try:
+        stats = asyncio.run(run(args, options))
+    except KeyboardInterrupt:
+        print("interrupted, rerun the same command to resume", file=sys.stderr)
+        return 130
+    print(json.dumps(dict(stats), ensure_ascii=False), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,7 @@
 from __future__ import annotations
 import os
 from dataclasses import dataclass, field
-from typing import List
+from typing import Any, List, Tuple
 
 
 def _env(key: str, default: str) -> str:
@@ -20,6 +20,13 @@ def _env_int(key: str, default: int) -> int:
         return default
 
 
+def _env_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key, str(default)))
+    except ValueError:
+        return default
+
+
 def _env_bool(key: str, default: bool) -> bool:
     v = os.getenv(key)
     if v is None:
@@ -33,42 +40,85 @@ class URLConfig:
     BAIJIAHAO_LOGIN_URL: str = "https://baijiahao.baidu.com/builder/theme/bjh/login"
     BAIJIAHAO_HOME_URL: str = "https://baijiahao.baidu.com/builder/rc/home"
     BAIJIAHAO_NEED_LOGIN_TEXT: str = "注册/登录百家号"
+    BAIJIAHAO_HTTP_AUTH: bool = True  # 是否允许走无浏览器的 HTTP 校验
+    BAIJIAHAO_AUTH_COOKIES: Tuple[str, ...] = ("BDUSS",)  # 关键登录 cookie，已过期则离线判失效；留空不预检
+    BAIJIAHAO_AUTH_DOMAINS: Tuple[str, ...] = ("baijiahao.baidu.com", "passport.baidu.com")  # auth 放行接口的域名
+    BAIJIAHAO_AUTH_API: str = ""  # 登录态接口完整 URL，浏览器 auth 带 context 的 cookie 直接请求，以响应状态作为判定信号；留空不启用
 
     # 头条号
     TOUTIAO_LOGIN_URL: str = "https://sso.toutiao.com/login/"
     TOUTIAO_HOME_URL: str = "https://mp.toutiao.com/profile_v4/index"
     TOUTIAO_NEED_LOGIN_TEXT: str = "登录"
+    TOUTIAO_HTTP_AUTH: bool = True
+    TOUTIAO_AUTH_COOKIES: Tuple[str, ...] = ("sessionid",)
+    TOUTIAO_AUTH_DOMAINS: Tuple[str, ...] = ("mp.toutiao.com", "sso.toutiao.com")
+    TOUTIAO_AUTH_API: str = ""
 
     # 网易号
     NETEASE_LOGIN_URL: str = "https://mp.163.com/login.html"
     NETEASE_HOME_URL: str = "https://mp.163.com/writer#/"
     NETEASE_NEED_LOGIN_TEXT: str = "登录"
+    NETEASE_HTTP_AUTH: bool = True
+    NETEASE_AUTH_COOKIES: Tuple[str, ...] = ("NTES_SESS",)
+    NETEASE_AUTH_DOMAINS: Tuple[str, ...] = ("mp.163.com",)
+    NETEASE_AUTH_API: str = ""
 
     # 搜狐号
     SOHU_LOGIN_URL: str = "https://mp.sohu.com/mpfe/v3/login"
     SOHU_HOME_URL: str = "https://mp.sohu.com/main.html"
     SOHU_NEED_LOGIN_TEXT: str = "登录"
+    SOHU_HTTP_AUTH: bool = True
+    SOHU_AUTH_COOKIES: Tuple[str, ...] = ("ppinf",)
+    SOHU_AUTH_DOMAINS: Tuple[str, ...] = ("mp.sohu.com",)
+    SOHU_AUTH_API: str = ""
 
     # 大鱼号
     DAYU_LOGIN_URL: str = "https://mp.dayu.com/account/login"
     DAYU_HOME_URL: str = "https://mp.dayu.com/dashboard"
     DAYU_NEED_LOGIN_TEXT: str = "登录"
+    DAYU_HTTP_AUTH: bool = True
+    DAYU_AUTH_COOKIES: Tuple[str, ...] = ()
+    DAYU_AUTH_DOMAINS: Tuple[str, ...] = ("mp.dayu.com",)
+    DAYU_AUTH_API: str = ""
 
     # 企鹅号
     PENGUIN_LOGIN_URL: str = "https://om.qq.com/user/auth/login"
     PENGUIN_HOME_URL: str = "https://om.qq.com/user/home"
     PENGUIN_NEED_LOGIN_TEXT: str = "登录"
+    PENGUIN_HTTP_AUTH: bool = True
+    PENGUIN_AUTH_COOKIES: Tuple[str, ...] = ()
+    PENGUIN_AUTH_DOMAINS: Tuple[str, ...] = ("om.qq.com",)
+    PENGUIN_AUTH_API: str = ""
 
     # 一点号
     YIDIAN_LOGIN_URL: str = "https://mp.yidianzixun.com/login"
     YIDIAN_HOME_URL: str = "https://mp.yidianzixun.com/dashboard"
     YIDIAN_NEED_LOGIN_TEXT: str = "登录"
+    YIDIAN_HTTP_AUTH: bool = True
+    YIDIAN_AUTH_COOKIES: Tuple[str, ...] = ()
+    YIDIAN_AUTH_DOMAINS: Tuple[str, ...] = ("mp.yidianzixun.com",)
+    YIDIAN_AUTH_API: str = ""
+
+    def platform(self, platform: str, key: str, default: Any = None) -> Any:
+        """按平台取配置：platform("baijiahao", "HOME_URL") -> BAIJIAHAO_HOME_URL"""
+        return getattr(self, f"{str(platform).upper()}_{key}", default)
 
 
 @dataclass(slots=True)
 class Config(URLConfig):
+    # storage_state 存储后端：file（一个账号一个 JSON）/ sqlite
+    SESSION_STORE: str = _env("LOGIN_SESSION_STORE", "file")
+    SESSION_DB: str = _env("LOGIN_SESSION_DB", "./data/sessions.db")
+    # 登录成功后由库写入 storage_state：裁剪到平台相关域、精简字段，文件后端可选 gzip
+    STATE_PRUNE: bool = _env_bool("LOGIN_STATE_PRUNE", True)
+    STATE_COMPACT: bool = _env_bool("LOGIN_STATE_COMPACT", True)
+    STATE_COMPRESS: bool = _env_bool("LOGIN_STATE_COMPRESS", False)
+    RETURN_STATE: bool = _env_bool("LOGIN_RETURN_STATE", False)  # 结果中是否带回 storage_state
+
     # 日志
     LOGGER_LEVEL: str = _env("LOGIN_LOG_LEVEL", "INFO")
+    LOGGER_FORMAT: str = _env("LOGIN_LOG_FORMAT", "rich")  # rich / plain / json（一行一个 JSON）
+    LOGGER_QUEUE_SIZE: int = _env_int("LOGIN_LOG_QUEUE_SIZE", 10_000)  # 待输出日志上限，满了丢弃
 
     # 目录（强烈建议统一）
     DATA_DIR: str = _env("LOGIN_DATA_DIR", "./data")
@@ -83,13 +133,127 @@ class Config(URLConfig):
 
     PW_RETRIES: int = _env_int("PW_RETRIES", 2)
     PW_RETRY_BACKOFF_MS: int = _env_int("PW_RETRY_BACKOFF_MS", 800)
+    PW_RETRY_BACKOFF_MAX_MS: int = _env_int("PW_RETRY_BACKOFF_MAX_MS", 10_000)  # 指数退避上限
+    PW_RETRY_DEADLINE_MS: int = _env_int("PW_RETRY_DEADLINE_MS", 600_000)  # 超过后不再发起新的重试
 
     PW_ENABLE_TRACE: bool = _env_bool("PW_ENABLE_TRACE", False)
     PW_ENABLE_SCREENSHOT_ON_ERROR: bool = _env_bool("PW_ENABLE_SCREENSHOT_ON_ERROR", True)
+    PW_SCREENSHOT_FULL_PAGE: bool = _env_bool("PW_SCREENSHOT_FULL_PAGE", False)  # 默认只截视口
+
+    # 排障文件：按 (平台, 原因) 采样，后台写入，目录按总大小/时长淘汰最旧文件
+    ARTIFACT_SAMPLE_RATE: float = _env_float("LOGIN_ARTIFACT_SAMPLE_RATE", 1.0)
+    ARTIFACT_TRACE_SAMPLE_RATE: float = _env_float("LOGIN_ARTIFACT_TRACE_SAMPLE_RATE", 1.0)  # enable_trace 时的录制比例
+    ARTIFACT_RATE_PER_MIN: int = _env_int("LOGIN_ARTIFACT_RATE_PER_MIN", 6)  # 每个 (平台, 原因) 每分钟最多几份
+    ARTIFACT_MAX_BYTES: int = _env_int("LOGIN_ARTIFACT_MAX_BYTES", 512 * 1024 * 1024)
+    ARTIFACT_MAX_AGE_S: int = _env_int("LOGIN_ARTIFACT_MAX_AGE_S", 7 * 24 * 3600)
+    ARTIFACT_QUEUE_SIZE: int = _env_int("LOGIN_ARTIFACT_QUEUE_SIZE", 64)  # 待写队列，满了丢弃新文件
+    ARTIFACT_SCREENSHOT_TIMEOUT_MS: int = _env_int("LOGIN_ARTIFACT_SCREENSHOT_TIMEOUT_MS", 2_000)
 
     PW_EXECUTABLE_PATH: str | None = os.getenv("PW_EXECUTABLE_PATH")  # /usr/bin/google-chrome-stable
     PW_CHANNEL: str | None = os.getenv("PW_CHANNEL")  # "chrome"
     PW_BROWSER_ARGS: List[str] = field(
         default_factory=lambda: _env("PW_BROWSER_ARGS", "--lang=en-GB").split())
 
+    # 浏览器池（LoginService.start() 后生效）
+    PW_POOL_SIZE: int = _env_int("PW_POOL_SIZE", 2)  # 每类（auth/login）常驻浏览器数
+    PW_POOL_MAX_USES: int = _env_int("PW_POOL_MAX_USES", 200)  # 单个浏览器创建多少个 context 后回收
+    PW_POOL_MAX_CONTEXTS: int = _env_int("PW_POOL_MAX_CONTEXTS", 8)  # 单个浏览器同时承载的 context 数
+
+    # 批量校验
+    BATCH_CONCURRENCY: int = _env_int("LOGIN_BATCH_CONCURRENCY", 16)  # auth_many 全局并发上限
+    BATCH_BUFFER: int = _env_int("LOGIN_BATCH_BUFFER", 10_000)  # auth_many 预读的待调度条目上限
+
+    # 调度：平台级并发 / 限速（可用 LOGIN_<PLATFORM>_CONCURRENCY 等按平台覆盖），全局并发 0 为不限
+    PLATFORM_CONCURRENCY: int = _env_int("LOGIN_PLATFORM_CONCURRENCY", 8)
+    PLATFORM_RATE: float = _env_float("LOGIN_PLATFORM_RATE", 0)  # 每秒请求数，0 为不限速
+    PLATFORM_BURST: int = _env_int("LOGIN_PLATFORM_BURST", 1)
+    GLOBAL_CONCURRENCY: int = _env_int("LOGIN_GLOBAL_CONCURRENCY", 0)
+
+    # 后台复检（Revalidator）
+    REVALIDATE_CONCURRENCY: int = _env_int("LOGIN_REVALIDATE_CONCURRENCY", 8)
+    REVALIDATE_INTERVAL_S: int = _env_int("LOGIN_REVALIDATE_INTERVAL_S", 6 * 3600)  # 有效账号的常规复检间隔
+    REVALIDATE_EXPIRY_MARGIN_S: int = _env_int("LOGIN_REVALIDATE_EXPIRY_MARGIN_S", 3600)  # 关键 cookie 过期前提前复检
+    REVALIDATE_RETRY_S: int = _env_int("LOGIN_REVALIDATE_RETRY_S", 600)  # 超时/异常后的重试间隔
+    REVALIDATE_RESCAN_S: int = _env_int("LOGIN_REVALIDATE_RESCAN_S", 60)  # 增量扫描目录的周期
+
+    # 无浏览器 HTTP 校验
+    HTTP_AUTH: bool = _env_bool("LOGIN_HTTP_AUTH", False)
+    HTTP_TIMEOUT_MS: int = _env_int("LOGIN_HTTP_TIMEOUT_MS", 3_000)
+    HTTP_MAX_CONNECTIONS: int = _env_int("LOGIN_HTTP_MAX_CONNECTIONS", 200)
+    HTTP_MAX_REDIRECTS: int = _env_int("LOGIN_HTTP_MAX_REDIRECTS", 10)
+    HTTP_USER_AGENT: str = _env(
+        "LOGIN_HTTP_USER_AGENT",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36")
+
+    # auth 结果缓存（LoginOptions.auth_cache 开启后生效）
+    AUTH_CACHE: bool = _env_bool("LOGIN_AUTH_CACHE", False)
+    AUTH_CACHE_SIZE: int = _env_int("LOGIN_AUTH_CACHE_SIZE", 10_000)
+    AUTH_CACHE_VALID_TTL_S: int = _env_int("LOGIN_AUTH_CACHE_VALID_TTL_S", 300)
+    AUTH_CACHE_INVALID_TTL_S: int = _env_int("LOGIN_AUTH_CACHE_INVALID_TTL_S", 60)
+
+    # 浏览器 auth 判定：等待确定信号（跳转/状态码/接口/文案/首页）的最长时间
+    AUTH_DETECT_TIMEOUT_MS: int = _env_int("LOGIN_AUTH_DETECT_TIMEOUT_MS", 3_000)
+    AUTH_NAV_TIMEOUT_MS: int = _env_int("LOGIN_AUTH_NAV_TIMEOUT_MS", 3_000)  # auth 模式导航超时
+    PW_LAUNCH_TIMEOUT_MS: int = _env_int("PW_LAUNCH_TIMEOUT_MS", 3_000)  # 浏览器启动超时
+
+    # 自适应超时：按平台观测耗时，超时 = max(分位数, EWMA) × 倍数，限制在 [floor, ceiling]；
+    # 样本不足时用上面的固定值（登录页导航用 LoginOptions.nav_timeout_ms）
+    ADAPTIVE_TIMEOUTS: bool = _env_bool("LOGIN_ADAPTIVE_TIMEOUTS", True)
+    TIMEOUT_QUANTILE: float = _env_float("LOGIN_TIMEOUT_QUANTILE", 0.99)
+    TIMEOUT_MULTIPLIER: float = _env_float("LOGIN_TIMEOUT_MULTIPLIER", 1.5)
+    TIMEOUT_FLOOR_MS: int = _env_int("LOGIN_TIMEOUT_FLOOR_MS", 1_000)
+    TIMEOUT_CEILING_MS: int = _env_int("LOGIN_TIMEOUT_CEILING_MS", 30_000)
+    TIMEOUT_MIN_SAMPLES: int = _env_int("LOGIN_TIMEOUT_MIN_SAMPLES", 20)
+    TIMEOUT_EWMA_ALPHA: float = _env_float("LOGIN_TIMEOUT_EWMA_ALPHA", 0.2)
+    # 超时不计入样本：每次超时把放宽系数乘 WIDEN_STEP（成功后回落），最多为成功耗时推出的超时的 MAX_WIDEN 倍
+    TIMEOUT_WIDEN_STEP: float = _env_float("LOGIN_TIMEOUT_WIDEN_STEP", 1.25)
+    TIMEOUT_MAX_WIDEN: float = _env_float("LOGIN_TIMEOUT_MAX_WIDEN", 2.0)
+    TIMEOUT_WINDOW: int = _env_int("LOGIN_TIMEOUT_WINDOW", 2_000)  # 草图样本数超过后减半，旧样本逐步淡出
+    TIMEOUT_STATE_FILE: str = _env("LOGIN_TIMEOUT_STATE_FILE", "./data/timeouts.json")  # 留空不落盘
+    TIMEOUT_SAVE_INTERVAL_S: int = _env_int("LOGIN_TIMEOUT_SAVE_INTERVAL_S", 60)
+
+    # 平台熔断（auth）：最近 CIRCUIT_WINDOW 次中超时/导航错误占比达到 CIRCUIT_FAILURE_RATE 即打开，
+    # CIRCUIT_OPEN_S 秒内直接返回 circuit_open，之后放行单个探测请求决定是否恢复
+    CIRCUIT_BREAKER: bool = _env_bool("LOGIN_CIRCUIT_BREAKER", True)
+    CIRCUIT_WINDOW: int = _env_int("LOGIN_CIRCUIT_WINDOW", 20)
+    CIRCUIT_MIN_CALLS: int = _env_int("LOGIN_CIRCUIT_MIN_CALLS", 10)
+    CIRCUIT_FAILURE_RATE: float = _env_float("LOGIN_CIRCUIT_FAILURE_RATE", 0.5)
+    CIRCUIT_OPEN_S: float = _env_float("LOGIN_CIRCUIT_OPEN_S", 30.0)
+
+    # 出口代理池：按 (平台, 账号) 会合哈希固定出口，连续失败 PROXY_MAX_FAILURES 次即摘除，
+    # 摘除时长从 PROXY_EJECT_S 起倍增到 PROXY_EJECT_MAX_S；同时被摘除的代理不超过 PROXY_MAX_EJECT_RATIO
+    PROXIES: List[str] = field(default_factory=lambda: _env("LOGIN_PROXIES", "").replace(",", " ").split())
+    PROXY_FILE: str = _env("LOGIN_PROXY_FILE", "")  # 每行一个代理 URL，# 开头为注释
+    PROXY_POOL: bool = _env_bool("LOGIN_PROXY_POOL", True)  # 配置了代理时是否使用
+    PROXY_MAX_FAILURES: int = _env_int("LOGIN_PROXY_MAX_FAILURES", 3)
+    PROXY_EJECT_S: float = _env_float("LOGIN_PROXY_EJECT_S", 30.0)
+    PROXY_EJECT_MAX_S: float = _env_float("LOGIN_PROXY_EJECT_MAX_S", 600.0)
+    PROXY_MAX_EJECT_RATIO: float = _env_float("LOGIN_PROXY_MAX_EJECT_RATIO", 0.5)
+
+    # 离线预检：关键 cookie 已过期时不启动浏览器直接判失效
+    OFFLINE_PRECHECK: bool = _env_bool("LOGIN_OFFLINE_PRECHECK", True)
+
+    # 资源拦截：auth 只放行主文档与登录判定接口，login 拦截字体/媒体与统计脚本
+    RESOURCE_POLICY: bool = _env_bool("LOGIN_RESOURCE_POLICY", True)
+    RESOURCE_DENY_DOMAINS: List[str] = field(default_factory=lambda: _env(
+        "LOGIN_RESOURCE_DENY_DOMAINS",
+        "hm.baidu.com google-analytics.com googletagmanager.com doubleclick.net cnzz.com umeng.com "
+        "growingio.com sensorsdata.cn mmstat.com").split())
+
+    # MCP 服务（python -m core.mcp_server）
+    MCP_NAME: str = _env("LOGIN_MCP_NAME", "auto-base-login")
+    MCP_TRANSPORT: str = _env("LOGIN_MCP_TRANSPORT", "stdio")  # stdio / sse
+    MCP_CONCURRENCY: int = _env_int("LOGIN_MCP_CONCURRENCY", 16)  # 同时执行的工具调用数，其余排队
+    MCP_WARM: bool = _env_bool("LOGIN_MCP_WARM", True)  # 启动时预热浏览器池
+    MCP_LATENCY_WINDOW: int = _env_int("LOGIN_MCP_LATENCY_WINDOW", 1024)  # 每个工具保留最近多少次耗时
+
+    def platform_limits(self, platform: str) -> Tuple[int, float, int]:
+        """平台的 (并发, 每秒请求数, 突发容量)，未单独配置时取全局默认值。"""
+        prefix = f"LOGIN_{str(platform).upper()}_"
+        return (_env_int(prefix + "CONCURRENCY", self.PLATFORM_CONCURRENCY),
+                _env_float(prefix + "RATE", self.PLATFORM_RATE),
+                _env_int(prefix + "BURST", self.PLATFORM_BURST))
+
+
 settings = Config()
@@ -19,6 +19,9 @@ class LoginReasonType(StrEnum):
     NAVIGATION_TIMEOUT = "navigation_timeout"
     ELEMENT_TIMEOUT = "element_timeout"
     RETRY_EXHAUSTED = "retry_exhausted"
+    CIRCUIT_OPEN = "circuit_open"  # 平台熔断中，未发起请求直接返回
+    USER_ABORTED = "user_aborted"  # 用户关闭登录窗口 / 任务被取消
+    DEADLINE_EXCEEDED = "deadline_exceeded"  # 调用 / 批次到达截止时间
 
     # 浏览器/环境
     BROWSER_LAUNCH_FAILED = "browser_launch_failed"
@@ -28,6 +31,22 @@ class LoginReasonType(StrEnum):
     UNKNOWN_ERROR = "unknown_error"
 
 
+class AuthSignalType(StrEnum):
+    """浏览器 auth 判定依据（extra["signal"]）。"""
+    REDIRECT = "redirect"  # 主文档跳转到登录页
+    STATUS = "status"  # 主文档 401/403
+    API = "api"  # 平台登录态接口的响应状态
+    DOM_MARKER = "dom_marker"  # 页面出现需登录文案
+    HOME_URL = "home_url"  # DOM 就绪后停留在首页且无需登录文案
+    NONE = "none"  # 超时前没有任何确定信号
+
+
+class CircuitStateType(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
 class StrategyModeType(object):
     AUTH = "auth"
     LOGIN = "login_and_save"
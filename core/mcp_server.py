@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 下午7:30
+# @Author  : fzf
+# @FileName: mcp_server.py
+# @Software: PyCharm
+"""
+常驻 MCP 服务：把 LoginService 暴露为工具（auth / setup / login_and_save / auth_many / stats）。
+
+    python -m core.mcp_server              # stdio
+    python -m core.mcp_server --transport sse
+
+进程启动时拉起浏览器池并预热，之后每次工具调用只新建 context；工具调用数受 LOGIN_MCP_CONCURRENCY 限制，
+超出的排队等待，stats 工具可查看排队深度与耗时分位。
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import dataclasses
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List
+
+from fastmcp import FastMCP
+
+from .config import settings
+from .enums import LoginStrategyType
+from .schemas import LoginOptions, LoginResponse
+from .service import LoginService
+from .strategies.utils.browser_pool import browser_pool
+from .strategies.utils.playwright_base import BasePlaywrightStrategy
+from .utils.logger import get_logger
+from .utils.metrics import metrics
+
+# 日志统一由后台线程写 stderr，不干扰 stdio 传输
+logger = get_logger("mcp")
+
+mcp = FastMCP(settings.MCP_NAME)
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))]
+
+
+class ToolGate:
+    """限制同时执行的工具调用数，并记录排队深度、在途数与最近 window 次耗时。"""
+
+    def __init__(self, concurrency: int, window: int) -> None:
+        self.concurrency = max(1, concurrency)
+        self._sem: asyncio.Semaphore | None = None
+        self._window = max(1, window)
+        self._latency: Dict[str, Deque[float]] = {}
+        self._wait: Deque[float] = deque(maxlen=self._window)
+        self.waiting = 0
+        self.running = 0
+        self.calls = 0
+        self.errors = 0
+
+    @asynccontextmanager
+    async def slot(self, tool: str) -> AsyncIterator[None]:
+        if self._sem is None:
+            # 在服务所在事件循环里创建
+            self._sem = asyncio.Semaphore(self.concurrency)
+        queued = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self.waiting -= 1
+        self._wait.append(time.perf_counter() - queued)
+        self.running += 1
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.running -= 1
+            self.calls += 1
+            self._latency.setdefault(tool, deque(maxlen=self._window)).append(time.perf_counter() - start)
+            self._sem.release()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        def summary(samples: Deque[float]) -> Dict[str, Any]:
+            values = list(samples)
+            return {"count": len(values), "p50_ms": round(_percentile(values, 50) * 1000, 3),
+                    "p95_ms": round(_percentile(values, 95) * 1000, 3),
+                    "p99_ms": round(_percentile(values, 99) * 1000, 3)}
+
+        return {
+            "concurrency": self.concurrency,
+            "waiting": self.waiting,
+            "running": self.running,
+            "calls": self.calls,
+            "errors": self.errors,
+            "queue_wait": summary(self._wait),
+            "latency": {tool: summary(samples) for tool, samples in self._latency.items()},
+        }
+
+
+gate = ToolGate(settings.MCP_CONCURRENCY, settings.MCP_LATENCY_WINDOW)
+
+
+def _options(overrides: Dict[str, Any] | None) -> LoginOptions:
+    """在环境默认值之上覆盖 LoginOptions 字段，未知字段直接报错。"""
+    options = LoginOptions().default
+    if not overrides:
+        return options
+    names = {f.name for f in dataclasses.fields(LoginOptions)}
+    unknown = sorted(set(overrides) - names)
+    if unknown:
+        raise ValueError(f"Unknown LoginOptions fields={unknown}. Supported={sorted(names)}")
+    return dataclasses.replace(options, **overrides)
+
+
+def _result(res: LoginResponse) -> Dict[str, Any]:
+    # 不回传 storage_state，cookie 只落在服务端存储中
+    return res.to_dict()
+
+
+@mcp.tool(description="校验账号 cookie 是否仍有效。options 可覆盖 LoginOptions 字段，如 {\"http_auth\": true}")
+async def auth(platform: str, account_file: str, options: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    async with gate.slot("auth"):
+        return _result(await LoginService.auth(platform, account_file, options=_options(options)))
+
+
+@mcp.tool(description="cookie 不存在或失效时（handle=true）触发登录，否则只返回当前状态")
+async def setup(platform: str, account_file: str, handle: bool = False,
+                options: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    async with gate.slot("setup"):
+        return _result(await LoginService.setup(platform, account_file, handle=handle, options=_options(options)))
+
+
+@mcp.tool(description="打开登录页等待登录完成并保存 cookie")
+async def login_and_save(platform: str, account_file: str, options: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    async with gate.slot("login_and_save"):
+        return _result(await LoginService.login_and_save(platform, account_file, options=_options(options)))
+
+
+@mcp.tool(description="批量校验，items 为 [{\"platform\": ..., \"account_file\": ...}]，按完成顺序返回结果列表；"
+                       "timeout_s 到点时只返回已完成部分（在途条目为 deadline_exceeded）")
+async def auth_many(items: List[Dict[str, str]], concurrency: int | None = None,
+                    options: Dict[str, Any] | None = None, timeout_s: float | None = None) -> List[Dict[str, Any]]:
+    pairs = [(item["platform"], item["account_file"]) for item in items]
+    deadline = time.time() + timeout_s if timeout_s else None
+    results: List[Dict[str, Any]] = []
+    # 整个批次占一个槽位，批内并发由 concurrency / 平台调度控制
+    async with gate.slot("auth_many"):
+        async for res in LoginService.auth_many(pairs, options=_options(options), concurrency=concurrency,
+                                                deadline=deadline):
+            results.append(_result(res))
+    return results
+
+
+@mcp.tool(description="服务状态：工具排队深度与耗时分位、平台调度与熔断、出口代理、浏览器池、auth 缓存与阶段耗时汇总")
+async def stats() -> Dict[str, Any]:
+    sink_data = getattr(metrics.sink, "data", None)
+    return {
+        "tools": gate.stats,
+        "scheduler": LoginService.scheduler_stats(),
+        "circuits": LoginService.circuit_stats(),
+        "proxies": LoginService.proxy_stats(),
+        "browser_pool": browser_pool.stats,
+        "artifacts": LoginService.artifact_stats(),
+        "auth_cache": LoginService.cache_stats(),
+        "metrics": sink_data if isinstance(sink_data, dict) else None,
+    }
+
+
+async def warm_up(options: LoginOptions | None = None) -> None:
+    """启动浏览器池并为 auth 模式预先拉起一个浏览器；失败（如未安装 Chromium）只记录日志，HTTP 校验仍可用。"""
+    options = options or LoginOptions().default
+    try:
+        await LoginService.start()
+        mode = LoginStrategyType.AUTH
+        async with browser_pool.browser(mode, BasePlaywrightStrategy.launch_kwargs(options, mode),
+                                        learn=options.adaptive_timeouts):
+            pass
+    except Exception as e:
+        logger.warning(f"browser pool warm-up failed: {e!r}")
+
+
+async def serve(transport: str = "stdio", warm: bool = True) -> None:
+    if warm:
+        await warm_up()
+    try:
+        if transport == "sse":
+            await mcp.run_sse_async()
+        else:
+            await mcp.run_stdio_async()
+    finally:
+        await LoginService.stop()
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m core.mcp_server", description="login/auth MCP server")
+    parser.add_argument("--transport", choices=["stdio", "sse"], default=settings.MCP_TRANSPORT)
+    parser.add_argument("--no-warm", action="store_true", help="不预热浏览器池（只用 HTTP 校验时）")
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args.transport, warm=settings.MCP_WARM and not args.no_warm))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 上午11:15
+# @Author  : fzf
+# @FileName: revalidator.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import heapq
+import inspect
+import itertools
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+from .config import settings
+from .enums import LoginReasonType
+from .schemas import LoginOptions, LoginResponse
+from .service import LoginService
+from .strategies import LoginStrategyFactory
+
+InvalidCallback = Callable[[LoginResponse], Awaitable[None] | None]
+
+
+@dataclass(slots=True)
+class _Account:
+    platform: str
+    account_file: str
+    mtime_ns: int
+    next_check: float | None = None  # None 表示暂不复检（失效后等文件变化）
+    last_checked: float | None = None
+    last_reason: str | None = None
+    version: int = 0  # 堆中旧条目的失效标记
+
+
+def default_platform_of(path: str, cookie_dir: str) -> str | None:
+    """默认目录布局：<COOKIE_DIR>/<platform>/<account>.json"""
+    rel = os.path.relpath(path, cookie_dir)
+    platform = rel.split(os.sep, 1)[0]
+    return platform if platform in LoginStrategyFactory.registry else None
+
+
+class Revalidator:
+    """
+    后台复检调度：
+    - 首次全量索引 cookie 目录，之后按 rescan 周期只比对文件 mtime，新增/变更的账号立即入队
+    - 最小堆维护每个账号的下次检查时间：有效账号按「固定间隔」与「关键 cookie 过期前 margin」取早者，
+      失效账号交给回调/队列后暂停，直到文件被重写；出错的账号稍后重试
+    - 到期账号以有限并发调用 LoginService.auth
+    """
+
+    def __init__(self, cookie_dir: str | None = None, *, on_invalid: InvalidCallback | None = None,
+                 queue: asyncio.Queue | None = None, options: LoginOptions | None = None,
+                 concurrency: int | None = None, platform_of: Callable[[str], str | None] | None = None) -> None:
+        self.cookie_dir = cookie_dir or settings.COOKIE_DIR
+        self.on_invalid = on_invalid
+        self.queue = queue
+        self.options = options or LoginOptions().default
+        self.concurrency = max(1, concurrency or settings.REVALIDATE_CONCURRENCY)
+        self.platform_of = platform_of or (lambda path: default_platform_of(path, self.cookie_dir))
+
+        self._accounts: Dict[str, _Account] = {}
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._running: Set[asyncio.Task] = set()
+        self._next_scan = 0.0
+        self.checked = 0
+        self.invalid = 0
+
+    # ---- 索引 ----
+    def _schedule(self, account: _Account, at: float | None) -> None:
+        account.version += 1
+        account.next_check = at
+        if at is not None:
+            heapq.heappush(self._heap, (at, next(self._seq), account.account_file, account.version))
+            self._wakeup.set()
+
+    def _walk(self) -> Dict[str, int]:
+        """遍历 cookie 目录，返回 {路径: mtime_ns}；只 stat 不读文件，不碰调度状态，可放在线程中执行。"""
+        files: Dict[str, int] = {}
+        for root, _, names in os.walk(self.cookie_dir):
+            for name in names:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    files[path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+        return files
+
+    def _apply(self, files: Dict[str, int]) -> int:
+        now = time.time()
+        changed = 0
+        for path, mtime_ns in files.items():
+            account = self._accounts.get(path)
+            if account is not None and account.mtime_ns == mtime_ns:
+                continue
+            platform = self.platform_of(path)
+            if platform is None:
+                continue
+            if account is None:
+                account = self._accounts[path] = _Account(platform, path, mtime_ns)
+            account.mtime_ns = mtime_ns
+            self._schedule(account, now)
+            changed += 1
+        for path in set(self._accounts) - files.keys():
+            del self._accounts[path]
+            changed += 1
+        self._next_scan = time.monotonic() + settings.REVALIDATE_RESCAN_S
+        return changed
+
+    def scan(self) -> int:
+        """增量扫描：mtime 变化或新出现的文件立即安排复检。返回变更数。"""
+        return self._apply(self._walk())
+
+    async def ascan(self) -> int:
+        """同 scan()，目录遍历在线程中执行，不阻塞事件循环；比对与入堆仍在事件循环线程内。"""
+        return self._apply(await asyncio.to_thread(self._walk))
+
+    # ---- 复检 ----
+    async def _next_time(self, account: _Account, res: LoginResponse) -> float | None:
+        now = time.time()
+        if res.reason == LoginReasonType.COOKIE_INVALID or res.reason == LoginReasonType.COOKIE_FILE_MISSING:
+            return None
+        if res.reason != LoginReasonType.COOKIE_VALID:
+            return now + settings.REVALIDATE_RETRY_S
+        at = now + settings.REVALIDATE_INTERVAL_S
+        expiry = await LoginStrategyFactory.get(account.platform).cookie_expiry(account.account_file)
+        if expiry is not None and expiry.earliest is not None:
+            # 过期前 margin 复检；已临近过期时也至少间隔 retry，避免原地打转
+            at = min(at, max(expiry.earliest - settings.REVALIDATE_EXPIRY_MARGIN_S,
+                             now + settings.REVALIDATE_RETRY_S))
+        return at
+
+    async def _check(self, account: _Account) -> None:
+        try:
+            res = await LoginService.auth(account.platform, account.account_file, options=self.options)
+        except Exception as e:
+            res = LoginResponse(False, LoginReasonType.UNKNOWN_ERROR, path=account.account_file, extra={"err": str(e)})
+        self.checked += 1
+        account.last_checked = time.time()
+        account.last_reason = res.reason
+        if not res.ok and res.reason in (LoginReasonType.COOKIE_INVALID, LoginReasonType.COOKIE_FILE_MISSING):
+            self.invalid += 1
+            res.extra.setdefault("platform", account.platform)
+            await self._report(res)
+        if self._accounts.get(account.account_file) is account:
+            self._schedule(account, await self._next_time(account, res))
+
+    async def _report(self, res: LoginResponse) -> None:
+        if self.queue is not None:
+            await self.queue.put(res)
+        if self.on_invalid is not None:
+            ret = self.on_invalid(res)
+            if inspect.isawaitable(ret):
+                await ret
+
+    def _pop_due(self, now: float, limit: int) -> List[_Account]:
+        due: List[_Account] = []
+        while self._heap and self._heap[0][0] <= now and len(due) < limit:
+            _, _, path, version = heapq.heappop(self._heap)
+            account = self._accounts.get(path)
+            if account is not None and account.version == version:
+                due.append(account)
+        return due
+
+    async def run_due(self) -> int:
+        """跑一轮：复检当前所有到期账号，返回复检数量。"""
+        due = self._pop_due(time.time(), len(self._heap))
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def _one(account: _Account) -> None:
+            async with sem:
+                await self._check(account)
+
+        await asyncio.gather(*(_one(a) for a in due))
+        return len(due)
+
+    async def _loop(self) -> None:
+        while True:
+            if time.monotonic() >= self._next_scan:
+                await self.ascan()
+            free = self.concurrency - len(self._running)
+            for account in self._pop_due(time.time(), free):
+                task = asyncio.create_task(self._check(account))
+                self._running.add(task)
+                task.add_done_callback(self._on_done)
+
+            # 睡到下一个到期时间 / 下一次扫描 / 有任务完成
+            wait = self._next_scan - time.monotonic()
+            if self._heap and len(self._running) < self.concurrency:
+                wait = min(wait, self._heap[0][0] - time.time())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, wait))
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._wakeup.set()
+
+    # ---- 生命周期 ----
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        tasks = [t for t in (task, *self._running) if t is not None]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._running.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "tracked": len(self._accounts),
+            "due": sum(1 for a in self._accounts.values() if a.next_check is not None and a.next_check <= now),
+            "paused": sum(1 for a in self._accounts.values() if a.next_check is None),
+            "running": len(self._running),
+            "checked": self.checked,
+            "invalid": self.invalid,
+        }
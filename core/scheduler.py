@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 上午9:40
+# @Author  : fzf
+# @FileName: scheduler.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict
+
+from .config import settings
+
+
+class TokenBucket:
+    """令牌桶：rate 为每秒令牌数（<=0 不限速），burst 为桶容量。按预约排队，先到先得。"""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> float:
+        """取一个令牌，返回等待的秒数。"""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        # 允许透支：令牌为负即排在前面的人已经预约，按欠账时长等待
+        self._tokens -= 1
+        wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class FairGate:
+    """全局并发闸门：名额释放时在各平台的等待队列间轮转发放，避免单个平台占满全局并发。"""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {}
+        self._order: Deque[str] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    async def acquire(self, platform: str) -> None:
+        if self.limit <= 0:
+            return
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        queue = self._queues.setdefault(platform, deque())
+        if not queue:
+            self._order.append(platform)
+        queue.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # 名额已经发给自己却被取消，交还给下一位
+                self.release()
+            raise
+
+    def release(self) -> None:
+        if self.limit <= 0:
+            return
+        self.active -= 1
+        while self.active < self.limit and self._order:
+            platform = self._order.popleft()
+            queue = self._queues[platform]
+            while queue and queue[0].cancelled():
+                queue.popleft()
+            if not queue:
+                continue
+            queue.popleft().set_result(None)
+            self.active += 1
+            if queue:
+                self._order.append(platform)
+
+
+@dataclass(slots=True)
+class PlatformStats:
+    waiting: int = 0  # 排队中
+    running: int = 0  # 执行中
+    completed: int = 0
+    wait_total_s: float = 0.0
+    wait_max_s: float = 0.0
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        avg = self.wait_total_s / self.completed if self.completed else 0.0
+        return {"waiting": self.waiting, "running": self.running, "completed": self.completed,
+                "wait_avg_ms": round(avg * 1000, 2), "wait_max_ms": round(self.wait_max_s * 1000, 2)}
+
+
+class _PlatformLimiter:
+    def __init__(self, concurrency: int, rate: float, burst: int) -> None:
+        self.concurrency = max(1, concurrency)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.stats = PlatformStats()
+
+    def rebind(self) -> None:
+        """换事件循环后重建信号量（旧循环上的排队与占用随旧循环一起作废），统计保留。"""
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.stats.waiting = self.stats.running = 0
+
+
+class PlatformScheduler:
+    """
+    LoginService 之下的调度层：
+    - 每个平台独立的最大并发 + 令牌桶限速（见 settings.platform_limits）
+    - 可选的全局并发上限，名额在平台间轮转发放
+    - 暴露各平台排队深度与等待时长
+    - 信号量与闸门按事件循环绑定，每次 asyncio.run 换循环时重建
+    """
+
+    def __init__(self, global_concurrency: int | None = None) -> None:
+        self.gate = FairGate(settings.GLOBAL_CONCURRENCY if global_concurrency is None else global_concurrency)
+        self._limiters: Dict[str, _PlatformLimiter] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _bind(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None:
+            self.gate = FairGate(self.gate.limit)
+            for limiter in self._limiters.values():
+                limiter.rebind()
+        self._loop = loop
+
+    def limiter(self, platform: str) -> _PlatformLimiter:
+        limiter = self._limiters.get(platform)
+        if limiter is None:
+            limiter = self._limiters[platform] = _PlatformLimiter(*settings.platform_limits(platform))
+        return limiter
+
+    def concurrency(self, platform: str) -> int:
+        return self.limiter(platform).concurrency
+
+    @asynccontextmanager
+    async def slot(self, platform: str) -> AsyncIterator[None]:
+        """先占平台并发，再取令牌，最后拿全局名额；被限速的平台不会占着全局名额空等。"""
+        self._bind()
+        limiter = self.limiter(platform)
+        stats = limiter.stats
+        start = time.monotonic()
+        stats.waiting += 1
+        try:
+            await limiter.semaphore.acquire()
+        except BaseException:
+            stats.waiting -= 1
+            raise
+        try:
+            try:
+                await limiter.bucket.acquire()
+                await self.gate.acquire(platform)
+            finally:
+                stats.waiting -= 1
+            waited = time.monotonic() - start
+            stats.wait_total_s += waited
+            stats.wait_max_s = max(stats.wait_max_s, waited)
+            stats.running += 1
+            try:
+                yield
+            finally:
+                stats.running -= 1
+                stats.completed += 1
+                self.gate.release()
+        finally:
+            limiter.semaphore.release()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "global": {"limit": self.gate.limit, "active": self.gate.active, "waiting": self.gate.waiting},
+            "platforms": {p: l.stats.data for p, l in self._limiters.items()},
+        }
+
+
+scheduler = PlatformScheduler()
@@ -8,6 +8,7 @@ from dataclasses import dataclass, field, asdict, is_dataclass
 from typing import Any, Dict
 
 from .config import settings
+from .enums import LoginReasonType
 
 
 class DataMixin:
@@ -36,10 +37,30 @@ class LoginOptions(DataMixin):
     artifacts_dir: str = "./artifacts"  # 截图/trace 输出目录
     enable_trace: bool = False  # 需要时打开
     enable_screenshot_on_error: bool = True
+    screenshot_full_page: bool = False  # 错误截图默认只截视口
 
     # 重试
     retries: int = 2
-    retry_backoff_ms: int = 800
+    retry_backoff_ms: int = 800  # 首次退避，之后按 2 的幂增长并加抖动
+    retry_backoff_max_ms: int = 10_000
+    retry_deadline_ms: int = 600_000  # 整个 execute 的重试截止时间
+
+    # auth 走无浏览器 HTTP 校验（平台需在 URLConfig 中开启 *_HTTP_AUTH）
+    http_auth: bool = False
+    # 复用进程内 auth 结果缓存（cookie 文件未变化时不重复校验）
+    auth_cache: bool = False
+    # 关键 cookie 已过期时直接判失效，不启动浏览器
+    offline_precheck: bool = True
+    # 按平台默认策略拦截无关资源（context 级路由）
+    resource_policy: bool = True
+    # 按平台观测到的耗时自适应导航/判定/启动超时（见 core.utils.timeouts）
+    adaptive_timeouts: bool = True
+    # 平台熔断：站点持续超时/出错时 auth 直接返回 circuit_open（见 circuit_breaker.py）
+    circuit_breaker: bool = True
+    # 登录成功后 storage_state 已写入存储；为 True 时额外放在 LoginResponse.data 中返回
+    return_state: bool = False
+    # 配置了出口代理（LOGIN_PROXIES / LOGIN_PROXY_FILE）时按账号分配 context 级代理（见 proxy_pool.py）
+    proxy_pool: bool = True
 
     @property
     def default(self) -> LoginOptions:
@@ -54,10 +75,27 @@ class LoginOptions(DataMixin):
             artifacts_dir=settings.ARTIFACTS_DIR,
             enable_trace=settings.PW_ENABLE_TRACE,
             enable_screenshot_on_error=settings.PW_ENABLE_SCREENSHOT_ON_ERROR,
+            screenshot_full_page=settings.PW_SCREENSHOT_FULL_PAGE,
             retries=settings.PW_RETRIES,
             retry_backoff_ms=settings.PW_RETRY_BACKOFF_MS,
+            retry_backoff_max_ms=settings.PW_RETRY_BACKOFF_MAX_MS,
+            retry_deadline_ms=settings.PW_RETRY_DEADLINE_MS,
+            http_auth=settings.HTTP_AUTH,
+            auth_cache=settings.AUTH_CACHE,
+            offline_precheck=settings.OFFLINE_PRECHECK,
+            resource_policy=settings.RESOURCE_POLICY,
+            adaptive_timeouts=settings.ADAPTIVE_TIMEOUTS,
+            circuit_breaker=settings.CIRCUIT_BREAKER,
+            return_state=settings.RETURN_STATE,
+            proxy_pool=settings.PROXY_POOL,
         )
 
+    @property
+    def coalesce_key(self) -> tuple:
+        """会改变结果的选项：同账号并发调用只有这些一致时才合并，否则各自执行。"""
+        return (self.http_auth, self.auth_cache, self.offline_precheck, self.circuit_breaker, self.return_state,
+                self.proxy_pool, self.headless, self.executable_path, self.channel, tuple(self.browser_args))
+
     @property
     def auth_on_goto(self) -> list[str]:
         return [
@@ -93,6 +131,7 @@ class LoginOptions(DataMixin):
             '--no-first-run',
             '--safebrowsing-disable-auto-update',
             '--single-process',
+            # 配置了出口代理池时由 ProxyPool.launch_kwargs 去掉这两项，改由 context 级代理决定出口
             '--proxy-server="direct://"',
             '--proxy-bypass-list=*',
             '--log-level=3',
@@ -101,16 +140,35 @@ class LoginOptions(DataMixin):
 
 
 @dataclass(slots=True)
-class LoginResponse(DataMixin):
+class LoginResponse:
+    """
+    精简结果：reason 统一为 LoginReasonType（自定义策略返回的未知取值保留原字符串）。
+    data 为登录拿到的 storage_state，已由库写入存储，只有 LoginOptions.return_state=True 时才保留在结果里。
+    """
     ok: bool | None = None
-    reason: str | None = None
+    reason: LoginReasonType | str | None = None
     path: str | None = None
     extra: Dict[str, Any] = field(default_factory=dict)
-    data: Dict[str, Any] = field(default_factory=dict)
+    data: Dict[str, Any] | None = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.reason is not None and not isinstance(self.reason, LoginReasonType):
+            try:
+                self.reason = LoginReasonType(self.reason)
+            except ValueError:
+                pass
+
+    def to_dict(self, include_state: bool = False) -> Dict[str, Any]:
+        """可直接 JSON 序列化的浅层 dict：不深拷贝 extra，默认不带 storage_state。"""
+        out = {"ok": self.ok, "reason": str(self.reason) if self.reason is not None else None,
+               "path": self.path, "extra": self.extra}
+        if include_state and self.data is not None:
+            out["data"] = self.data
+        return out
 
 
 if __name__ == "__main__":
     opts = LoginOptions()
     login = LoginResponse()
     print(opts.data)
-    print(login.data)
+    print(login.to_dict())
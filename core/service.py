@@ -4,28 +4,249 @@
 # @FileName: service.py
 # @Software: PyCharm
 from __future__ import annotations
+import asyncio
 import os
+import time
+from collections import Counter, deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, Tuple
+
+from .config import settings
+from .enums import LoginReasonType, StrategyModeType
+from .scheduler import scheduler
 from .strategies import LoginStrategyFactory
+from .strategies.utils.artifacts import artifact_writer
+from .strategies.utils.browser_pool import browser_pool
+from .strategies.utils.circuit_breaker import circuit_breakers
+from .strategies.utils.http_base import http_client_pool
+from .strategies.utils.proxy_pool import proxy_pool
 from .schemas import LoginOptions, LoginResponse
+from .store import SessionStore, close_session_store, set_session_store
+from .utils.auth_cache import auth_cache
+from .utils.cookies import CookieExpiry
+from .utils.deadline import deadline_scope
+from .utils.metrics import metrics
+from .utils.timeouts import adaptive_timeouts
+
+# run_many 支持的 mode
+BATCH_MODES = (StrategyModeType.AUTH, "setup", StrategyModeType.LOGIN)
 
 
 class LoginService:
 
     @staticmethod
-    async def setup(platform: str, account_file: str, *, handle: bool = False, options: LoginOptions | None = None
-                    ) -> LoginResponse:
-        options = options or LoginOptions.default
+    async def start() -> None:
+        """启动常驻 Playwright 驱动与浏览器池，之后的调用只新建 context。"""
+        await browser_pool.start()
+
+    @staticmethod
+    async def stop() -> None:
+        await browser_pool.stop()
+        await http_client_pool.aclose()
+        await close_session_store()
+        await artifact_writer.aclose()
+        await adaptive_timeouts.asave()
+
+    @staticmethod
+    def scheduler_stats() -> Dict[str, Any]:
+        """各平台排队深度、执行中数量与等待时长。"""
+        return scheduler.stats
+
+    @staticmethod
+    def cache_stats() -> Dict[str, Any]:
+        """auth 结果缓存的命中/未命中/淘汰计数。"""
+        return auth_cache.stats
+
+    @staticmethod
+    def metrics_text() -> str:
+        """各阶段耗时直方图与按结果计数，Prometheus 文本格式，可直接挂到 /metrics。"""
+        return metrics.render()
+
+    @staticmethod
+    def artifact_stats() -> Dict[str, Any]:
+        """排障文件的采样、待写、丢弃、淘汰计数与各目录占用。"""
+        return artifact_writer.stats
+
+    @staticmethod
+    def circuit_stats() -> Dict[str, Any]:
+        """各平台熔断状态、窗口内失败数与剩余冷却时间。"""
+        return circuit_breakers.stats
+
+    @staticmethod
+    def proxy_stats() -> Dict[str, Any]:
+        """出口代理的健康状态、连续失败次数、剩余摘除时间与分配次数。"""
+        return proxy_pool.stats
+
+    @staticmethod
+    def timeout_stats() -> Dict[str, Any]:
+        """各平台各阶段学到的耗时（样本数、EWMA、分位），超时取值见 core.utils.timeouts。"""
+        return adaptive_timeouts.stats
+
+    @staticmethod
+    async def cookie_expiry(platform: str, account_file: str) -> CookieExpiry | None:
+        """离线读取账号关键 cookie 的最早过期时间等信息，便于安排复检。"""
+        return await LoginStrategyFactory.get(platform).cookie_expiry(account_file)
+
+    @staticmethod
+    def use_store(store: SessionStore) -> None:
+        """切换 storage_state 存储后端（默认按 LOGIN_SESSION_STORE 选择 file / sqlite）。"""
+        set_session_store(store)
+
+    @staticmethod
+    async def within(deadline: float | None, account_file: str, call: Callable[[], Awaitable[LoginResponse]]
+                     ) -> LoginResponse:
+        """
+        在截止时间（epoch 秒）内执行 call：各阶段超时取剩余预算，到点取消调用
+        （context / 浏览器随之关闭）并返回 DEADLINE_EXCEEDED。deadline 为 None 时不限时。
+        """
+        if deadline is None:
+            return await call()
+        with deadline_scope(deadline) as effective:
+            when = asyncio.get_running_loop().time() + (effective - time.time())
+            try:
+                async with asyncio.timeout_at(when) as scope:
+                    return await call()
+            except TimeoutError:
+                if not scope.expired():
+                    raise
+                return LoginResponse(False, LoginReasonType.DEADLINE_EXCEEDED, path=account_file,
+                                     extra={"deadline": effective})
+
+    @staticmethod
+    async def setup(platform: str, account_file: str, *, handle: bool = False, options: LoginOptions | None = None,
+                    deadline: float | None = None) -> LoginResponse:
+        options = options or LoginOptions().default
         strategy = LoginStrategyFactory.get(platform)
-        return await strategy.setup(account_file, options, handle=handle)
+        return await LoginService.within(deadline, account_file,
+                                         lambda: strategy.setup(account_file, options, handle=handle))
 
     @staticmethod
-    async def auth(platform: str, account_file: str, *, options: LoginOptions | None = None) -> LoginResponse:
-        options = options or LoginOptions.default
+    async def auth(platform: str, account_file: str, *, options: LoginOptions | None = None,
+                   deadline: float | None = None) -> LoginResponse:
+        options = options or LoginOptions().default
         strategy = LoginStrategyFactory.get(platform)
-        return await strategy.auth(account_file, options)
+        return await LoginService.within(deadline, account_file, lambda: strategy.auth(account_file, options))
 
     @staticmethod
-    async def login_and_save(platform: str, account_file: str, *, options: LoginOptions | None = None) -> LoginResponse:
-        options = options or LoginOptions.default
+    async def login_and_save(platform: str, account_file: str, *, options: LoginOptions | None = None,
+                             deadline: float | None = None) -> LoginResponse:
+        options = options or LoginOptions().default
         strategy = LoginStrategyFactory.get(platform)
-        return await strategy.login_and_save(account_file, options)
\ No newline at end of file
+        return await LoginService.within(deadline, account_file,
+                                         lambda: strategy.login_and_save(account_file, options))
+
+    @staticmethod
+    async def _run_one(platform: str, account_file: str, mode: str, options: LoginOptions,
+                       handle: bool = False, deadline: float | None = None) -> LoginResponse:
+        try:
+            strategy = LoginStrategyFactory.get(platform)
+        except KeyError as e:
+            return LoginResponse(False, LoginReasonType.UNKNOWN_ERROR, path=account_file,
+                                 extra={"err": str(e), "platform": platform})
+        if mode == StrategyModeType.AUTH:
+            res = await LoginService.within(deadline, account_file, lambda: strategy.auth(account_file, options))
+        elif mode == "setup":
+            res = await LoginService.within(deadline, account_file,
+                                            lambda: strategy.setup(account_file, options, handle=handle))
+        elif mode == StrategyModeType.LOGIN:
+            res = await LoginService.within(deadline, account_file,
+                                            lambda: strategy.login_and_save(account_file, options))
+        else:
+            return LoginResponse(False, LoginReasonType.UNKNOWN_ERROR, path=account_file,
+                                 extra={"err": f"Unknown mode={mode}. Supported={list(BATCH_MODES)}",
+                                        "platform": platform})
+        # 结果乱序返回，带上平台方便调用方对账
+        res.extra.setdefault("platform", platform)
+        return res
+
+    @staticmethod
+    async def auth_many(items: Iterable[Tuple[str, str]], *, options: LoginOptions | None = None,
+                        concurrency: int | None = None, deadline: float | None = None) -> AsyncIterator[LoginResponse]:
+        """
+        批量校验 (platform, account_file)，谁先完成先 yield（不保证输入顺序）。
+        - concurrency: 全局并发上限，默认 settings.BATCH_CONCURRENCY
+        - 平台间轮转派发，单个平台在途数不超过其调度并发，被限速的平台不会拖住其他平台
+        - 浏览器池未启动时自动启动，结束后关闭，保证少量浏览器复用到大量 context
+        - deadline: 整个批次的截止时间（epoch 秒），到点后在途条目返回 DEADLINE_EXCEEDED，未开始的条目不再执行
+        """
+        items = ((platform, account_file, StrategyModeType.AUTH) for platform, account_file in items)
+        async for _, res in LoginService.run_many(items, options=options, concurrency=concurrency, deadline=deadline):
+            yield res
+
+    @staticmethod
+    async def run_many(items: Iterable[Tuple[str, str, str]], *, options: LoginOptions | None = None,
+                       concurrency: int | None = None, handle: bool = False, deadline: float | None = None
+                       ) -> AsyncIterator[Tuple[Tuple[str, str, str], LoginResponse]]:
+        """
+        同 auth_many，但每条为 (platform, account_file, mode)，mode 取 auth / setup / login_and_save，
+        yield (原条目, 结果) 便于调用方对账。handle 透传给 setup。
+        到达 deadline 时只返回已完成与在途（DEADLINE_EXCEEDED）的部分结果，未开始的条目不 yield。
+        """
+        options = options or LoginOptions().default
+        concurrency = max(1, concurrency or settings.BATCH_CONCURRENCY)
+        source = iter(items)
+        exhausted = False
+        pending: Dict[str, Deque[Tuple[str, str, str]]] = {}  # 平台 -> 待派发的条目
+        order: Deque[str] = deque()  # 轮转顺序
+        buffered = 0
+        running: Dict[asyncio.Task, Tuple[str, str, str]] = {}
+        per_platform: Counter = Counter()
+
+        def expired() -> bool:
+            return deadline is not None and time.time() >= deadline
+
+        def fill() -> None:
+            nonlocal exhausted, buffered
+            while not exhausted and buffered < settings.BATCH_BUFFER:
+                try:
+                    item = next(source)
+                except StopIteration:
+                    exhausted = True
+                    return
+                platform = item[0]
+                if platform not in pending:
+                    pending[platform] = deque()
+                    order.append(platform)
+                pending[platform].append(item)
+                buffered += 1
+
+        def dispatch() -> None:
+            nonlocal buffered
+            idle_rounds = 0
+            while len(running) < concurrency and order and idle_rounds < len(order) and not expired():
+                platform = order[0]
+                order.rotate(-1)
+                queue = pending[platform]
+                if not queue or per_platform[platform] >= scheduler.concurrency(platform):
+                    idle_rounds += 1
+                    continue
+                idle_rounds = 0
+                item = queue.popleft()
+                buffered -= 1
+                per_platform[platform] += 1
+                task = asyncio.create_task(LoginService._run_one(item[0], item[1], item[2], options, handle, deadline))
+                running[task] = item
+
+        # 纯 HTTP 校验用不到浏览器，不必拉起驱动；池按引用计数，批量结束只释放自己的那一份
+        use_pool = not options.http_auth
+        if use_pool:
+            await browser_pool.start()
+        try:
+            while True:
+                if not expired():
+                    fill()
+                    dispatch()
+                if not running:
+                    if (exhausted and not buffered) or expired():
+                        break
+                    continue
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    item = running.pop(task)
+                    per_platform[item[0]] -= 1
+                    yield item, task.result()
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            if use_pool:
+                await browser_pool.stop()
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 下午4:02
+# @Author  : fzf
+# @FileName: __init__.py
+# @Software: PyCharm
+from __future__ import annotations
+from ..config import settings
+from .base import Fingerprint, SessionStore, StorageState
+from .file import FileSessionStore
+from .sqlite import SqliteSessionStore
+
+_store: SessionStore | None = None
+
+
+def get_session_store() -> SessionStore:
+    """当前使用的存储后端，默认按 settings.SESSION_STORE 创建（file / sqlite）。"""
+    global _store
+    if _store is None:
+        _store = SqliteSessionStore() if settings.SESSION_STORE == "sqlite" else FileSessionStore()
+    return _store
+
+
+def set_session_store(store: SessionStore) -> None:
+    global _store
+    _store = store
+
+
+async def close_session_store() -> None:
+    """关闭并卸下当前后端，之后 get_session_store() 按配置重新创建（自定义后端需重新 set_session_store）。"""
+    global _store
+    store, _store = _store, None
+    if store is not None:
+        await store.close()
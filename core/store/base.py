@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 下午4:05
+# @Author  : fzf
+# @FileName: base.py
+# @Software: PyCharm
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Tuple
+
+StorageState = Dict[str, Any]
+Fingerprint = Tuple[Any, ...]
+
+
+class SessionStore(ABC):
+    """
+    storage_state 存储接口：策略只和内存中的 state dict 打交道，不再关心落在文件还是数据库。
+    account 为账号标识：文件后端即 account_file 路径，数据库后端为任意账号 id。
+    """
+
+    @abstractmethod
+    async def load(self, platform: str, account: str) -> StorageState | None:
+        """读取 state，不存在返回 None。"""
+        ...
+
+    @abstractmethod
+    async def save(self, platform: str, account: str, state: StorageState) -> None:
+        """原子写入 state。"""
+        ...
+
+    @abstractmethod
+    async def exists(self, platform: str, account: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def fingerprint(self, platform: str, account: str) -> Fingerprint | None:
+        """state 变化即变化的指纹，供 auth 结果缓存判断是否过期；不存在返回 None。"""
+        ...
+
+    async def load_many(self, platform: str, accounts: Iterable[str]) -> Dict[str, StorageState]:
+        result = {}
+        for account in accounts:
+            state = await self.load(platform, account)
+            if state is not None:
+                result[account] = state
+        return result
+
+    async def save_many(self, platform: str, states: Dict[str, StorageState]) -> None:
+        for account, state in states.items():
+            await self.save(platform, account, state)
+
+    async def mark_validated(self, platform: str, account: str, ok: bool, at: float | None = None) -> None:
+        """记录最近一次校验结果，后端不支持时忽略。"""
+        return None
+
+    async def close(self) -> None:
+        return None
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 下午4:12
+# @Author  : fzf
+# @FileName: file.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import hashlib
+import os
+import tempfile
+
+from ..config import settings
+from ..utils.cookies import dumps_storage_state, load_storage_state
+from .base import Fingerprint, SessionStore, StorageState
+
+
+class FileSessionStore(SessionStore):
+    """
+    一个账号一个 JSON 文件（原有行为），account 即文件路径，platform 不参与寻址。
+    默认写精简格式（可选 gzip），读取兼容原始 Playwright 格式。
+    """
+
+    def __init__(self, compact: bool | None = None, compress: bool | None = None) -> None:
+        self.compact = settings.STATE_COMPACT if compact is None else compact
+        self.compress = settings.STATE_COMPRESS if compress is None else compress
+
+    # 文件读写、fsync 与哈希都在线程中执行，不阻塞事件循环（同 SqliteSessionStore）
+    async def load(self, platform: str, account: str) -> StorageState | None:
+        try:
+            return await asyncio.to_thread(load_storage_state, account)
+        except FileNotFoundError:
+            return None
+
+    async def save(self, platform: str, account: str, state: StorageState) -> None:
+        await asyncio.to_thread(self._save, account, state)
+
+    def _save(self, account: str, state: StorageState) -> None:
+        data = dumps_storage_state(state, compact=self.compact, compress=self.compress)
+        directory = os.path.dirname(account) or "."
+        os.makedirs(directory, exist_ok=True)
+        # 先写同目录临时文件再 rename，读方永远看不到半个文件
+        fd, tmp = tempfile.mkstemp(prefix=".state-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, account)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    async def exists(self, platform: str, account: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, account)
+
+    async def fingerprint(self, platform: str, account: str) -> Fingerprint | None:
+        return await asyncio.to_thread(self._fingerprint, account)
+
+    @staticmethod
+    def _fingerprint(account: str) -> Fingerprint | None:
+        try:
+            st = os.stat(account)
+            with open(account, "rb") as f:
+                digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, digest
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 下午4:20
+# @Author  : fzf
+# @FileName: sqlite.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+from ..config import settings
+from ..utils.cookies import compact_storage_state, critical_cookie_expiry, expand_storage_state
+from .base import Fingerprint, SessionStore, StorageState
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    platform          TEXT NOT NULL,
+    account           TEXT NOT NULL,
+    state             TEXT NOT NULL,
+    digest            TEXT NOT NULL,
+    updated_at        REAL NOT NULL,
+    last_validated_at REAL,
+    last_ok           INTEGER,
+    earliest_expiry   REAL,
+    PRIMARY KEY (platform, account)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    单库存放全部账号的 storage_state：
+    - 主键 (platform, account)，同时记录最近校验时间与关键 cookie 最早过期时间
+    - 写入走事务，天然原子；批量读写一条语句完成
+    - 所有 sqlite 调用放到线程池，不阻塞事件循环
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or settings.SESSION_DB
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def _run(self, sql: str, params: Iterable[Any] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def _run_many(self, sql: str, rows: List[Tuple[Any, ...]]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _row(platform: str, account: str, state: StorageState, now: float) -> Tuple[Any, ...]:
+        stored = compact_storage_state(state) if settings.STATE_COMPACT else state
+        raw = json.dumps(stored, ensure_ascii=False, separators=(",", ":"))
+        digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+        names = settings.platform(platform, "AUTH_COOKIES", ())
+        earliest = critical_cookie_expiry(state, names).earliest if names else None
+        return platform, account, raw, digest, now, earliest
+
+    async def load(self, platform: str, account: str) -> StorageState | None:
+        rows = await asyncio.to_thread(
+            self._run, "SELECT state FROM sessions WHERE platform = ? AND account = ?", (platform, account))
+        return expand_storage_state(json.loads(rows[0][0])) if rows else None
+
+    async def load_many(self, platform: str, accounts: Iterable[str]) -> Dict[str, StorageState]:
+        accounts = list(accounts)
+        result: Dict[str, StorageState] = {}
+        # 分批避免超出 sqlite 参数个数上限
+        for i in range(0, len(accounts), 500):
+            chunk = accounts[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = await asyncio.to_thread(
+                self._run, f"SELECT account, state FROM sessions WHERE platform = ? AND account IN ({marks})",
+                (platform, *chunk))
+            result.update({account: expand_storage_state(json.loads(raw)) for account, raw in rows})
+        return result
+
+    _UPSERT = ("INSERT INTO sessions (platform, account, state, digest, updated_at, earliest_expiry) "
+               "VALUES (?, ?, ?, ?, ?, ?) "
+               "ON CONFLICT (platform, account) DO UPDATE SET state = excluded.state, digest = excluded.digest, "
+               "updated_at = excluded.updated_at, earliest_expiry = excluded.earliest_expiry")
+
+    async def save(self, platform: str, account: str, state: StorageState) -> None:
+        await self.save_many(platform, {account: state})
+
+    async def save_many(self, platform: str, states: Dict[str, StorageState]) -> None:
+        now = time.time()
+        rows = [self._row(platform, account, state, now) for account, state in states.items()]
+        await asyncio.to_thread(self._run_many, self._UPSERT, rows)
+
+    async def exists(self, platform: str, account: str) -> bool:
+        rows = await asyncio.to_thread(
+            self._run, "SELECT 1 FROM sessions WHERE platform = ? AND account = ?", (platform, account))
+        return bool(rows)
+
+    async def fingerprint(self, platform: str, account: str) -> Fingerprint | None:
+        rows = await asyncio.to_thread(
+            self._run, "SELECT updated_at, digest FROM sessions WHERE platform = ? AND account = ?",
+            (platform, account))
+        return tuple(rows[0]) if rows else None
+
+    async def mark_validated(self, platform: str, account: str, ok: bool, at: float | None = None) -> None:
+        await asyncio.to_thread(
+            self._run, "UPDATE sessions SET last_validated_at = ?, last_ok = ? WHERE platform = ? AND account = ?",
+            (at or time.time(), int(ok), platform, account))
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
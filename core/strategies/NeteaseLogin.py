@@ -5,14 +5,18 @@
 # @Software: PyCharm
 from __future__ import annotations
 import os
-from playwright.async_api import Page
+from typing import TYPE_CHECKING
 
 from .utils.base import LoginStrategy
 from ..schemas import LoginOptions, LoginResponse
 from ..enums import LoginReasonType, LoginStrategyType
+from ..utils.deadline import budget_ms
 from ..utils.logger import get_logger, LogCtx
 from ..config import settings
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 logger = get_logger(LoginStrategyType.NETEASE)
 
 
@@ -31,9 +35,9 @@ class NeteaseLogin(LoginStrategy):
         await self.safe_goto(page, settings.NETEASE_LOGIN_URL, options)
         try:
             # ✅ 等到登录成功自动跳到 home（最多等 timeout_ms）
-            await page.wait_for_url(settings.NETEASE_HOME_URL, timeout=options.timeout_ms)
+            await page.wait_for_url(settings.NETEASE_HOME_URL, timeout=budget_ms(options.timeout_ms))
             # 保存 cookie
-            # await page.context.storage_state(path=account_file)
+            # 由 LoginStrategy._persist_state 裁剪后经存储后端原子写入
             state = await page.context.storage_state()
             return LoginResponse(True, LoginReasonType.COOKIE_SAVED, path=account_file, data=state)
 
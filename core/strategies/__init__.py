@@ -4,32 +4,128 @@
 # @FileName: __init__.py
 # @Software: PyCharm
 from __future__ import annotations
-from typing import Dict
+import importlib
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, MutableMapping, Type, Union
+
 from ..enums import LoginStrategyType
-from .BaijiahaoLogin import BaijiahaoLogin
-from .ToutiaoLogin import ToutiaoLogin
-from .NeteaseLogin import NeteaseLogin
-from .SohuLogin import SohuLogin
-from .DayuLogin import DayuLogin
-from .PenguinLogin import PenguinLogin
-from .YidianLogin import YidianLogin
-from .utils.base import LoginStrategy
+
+if TYPE_CHECKING:
+    from .utils.base import LoginStrategy
+
+# 第三方平台可在自己的包里声明该组的 entry point：<platform> = "pkg.module:Class"
+ENTRY_POINT_GROUP = "auto_base_login.strategies"
+
+StrategyTarget = Union[str, "Type[LoginStrategy]", "LoginStrategy"]
+
+_BUILTIN: Dict[str, str] = {
+    LoginStrategyType.BAIJIAHAO: f"{__name__}.BaijiahaoLogin:BaijiahaoLogin",
+    LoginStrategyType.TOUTIAO: f"{__name__}.ToutiaoLogin:ToutiaoLogin",
+    LoginStrategyType.NETEASE: f"{__name__}.NeteaseLogin:NeteaseLogin",
+    LoginStrategyType.SOHU: f"{__name__}.SohuLogin:SohuLogin",
+    LoginStrategyType.DAYU: f"{__name__}.DayuLogin:DayuLogin",
+    LoginStrategyType.PENGUIN: f"{__name__}.PenguinLogin:PenguinLogin",
+    LoginStrategyType.YIDIAN: f"{__name__}.YidianLogin:YidianLogin",
+}
+
+
+def _resolve(target: StrategyTarget) -> "LoginStrategy":
+    """"module:Class" 路径 / 策略类 / 策略实例 → 策略实例。"""
+    if isinstance(target, str):
+        module_name, _, attr = target.partition(":")
+        if not attr:
+            raise ValueError(f"strategy path must look like 'module:Class', got {target!r}")
+        target = getattr(importlib.import_module(module_name), attr)
+    return target() if isinstance(target, type) else target
+
+
+class _LazyRegistry(MutableMapping):
+    """
+    平台名 → 策略实例，首次取用时才导入模块并实例化。
+    `in` / 遍历 / len 只看已登记的名字，不触发导入；entry point 只在第一次需要完整名单时扫描一次。
+    """
+
+    def __init__(self, targets: Dict[str, StrategyTarget]) -> None:
+        self._targets: Dict[str, StrategyTarget] = dict(targets)
+        self._instances: Dict[str, LoginStrategy] = {}
+        self._entry_points_loaded = False
+        self._lock = threading.Lock()
+
+    def _load_entry_points(self) -> None:
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        from importlib.metadata import entry_points
+
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            # 代码内显式注册优先于 entry point
+            self._targets.setdefault(ep.name, ep.value)
+
+    def __getitem__(self, platform: str) -> "LoginStrategy":
+        strategy = self._instances.get(platform)
+        if strategy is not None:
+            return strategy
+        with self._lock:
+            if platform not in self._targets:
+                self._load_entry_points()
+            if platform not in self._instances:
+                self._instances[platform] = _resolve(self._targets[platform])
+            return self._instances[platform]
+
+    def __setitem__(self, platform: str, target: StrategyTarget) -> None:
+        with self._lock:
+            self._targets[platform] = target
+            self._instances.pop(platform, None)
+
+    def __delitem__(self, platform: str) -> None:
+        with self._lock:
+            del self._targets[platform]
+            self._instances.pop(platform, None)
+
+    def __contains__(self, platform: object) -> bool:
+        if platform in self._targets:
+            return True
+        self._load_entry_points()
+        return platform in self._targets
+
+    def __iter__(self) -> Iterator[str]:
+        self._load_entry_points()
+        return iter(list(self._targets))
+
+    def __len__(self) -> int:
+        self._load_entry_points()
+        return len(self._targets)
+
+    @property
+    def loaded(self) -> Dict[str, "LoginStrategy"]:
+        """已实例化的策略（不触发导入）。"""
+        return dict(self._instances)
 
 
 class LoginStrategyFactory:
-    registry: Dict[str, LoginStrategy] = {
-        LoginStrategyType.BAIJIAHAO: BaijiahaoLogin(),
-        LoginStrategyType.TOUTIAO: ToutiaoLogin(),
-        LoginStrategyType.NETEASE: NeteaseLogin(),
-        LoginStrategyType.SOHU: SohuLogin(),
-        LoginStrategyType.DAYU: DayuLogin(),
-        LoginStrategyType.PENGUIN: PenguinLogin(),
-        LoginStrategyType.YIDIAN: YidianLogin(),
-    }
+    registry: _LazyRegistry = _LazyRegistry(_BUILTIN)
 
     @classmethod
-    def get(cls, platform: str) -> LoginStrategy:
+    def get(cls, platform: str) -> "LoginStrategy":
         try:
             return cls.registry[platform]
         except KeyError:
-            raise KeyError(f"Unknown platform={platform}. Registered={list(cls.registry.keys())}")
\ No newline at end of file
+            raise KeyError(f"Unknown platform={platform}. Registered={list(cls.registry.keys())}")
+
+    @classmethod
+    def register(cls, platform: str, target: StrategyTarget | None = None) -> Callable | None:
+        """
+        注册/覆盖平台策略，无需修改本文件：
+            LoginStrategyFactory.register("new_platform", "my_pkg.login:NewPlatformLogin")
+            @LoginStrategyFactory.register("new_platform")
+            class NewPlatformLogin(LoginStrategy): ...
+        """
+        if target is not None:
+            cls.registry[platform] = target
+            return None
+
+        def decorator(strategy_cls):
+            cls.registry[platform] = strategy_cls
+            return strategy_cls
+
+        return decorator
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 下午11:30
+# @Author  : fzf
+# @FileName: artifacts.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+from ...config import settings
+
+
+class ArtifactSampler:
+    """
+    排障文件采样：先按 ARTIFACT_SAMPLE_RATE 概率抽样，再限制每个 (平台, 原因) 每分钟最多 ARTIFACT_RATE_PER_MIN 份。
+    某平台一段时间大面积失败时只留少量样本，不拖慢重试、不写满磁盘。
+    """
+
+    def __init__(self) -> None:
+        self._recent: Dict[Tuple[str, str], Deque[float]] = {}
+        self.sampled = 0
+        self.skipped = 0
+
+    def allow(self, platform: str, reason: str, rate: float | None = None) -> bool:
+        rate = settings.ARTIFACT_SAMPLE_RATE if rate is None else rate
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            self.skipped += 1
+            return False
+        now = time.monotonic()
+        recent = self._recent.setdefault((str(platform), str(reason)), deque())
+        while recent and now - recent[0] >= 60:
+            recent.popleft()
+        if len(recent) >= settings.ARTIFACT_RATE_PER_MIN:
+            self.skipped += 1
+            return False
+        recent.append(now)
+        self.sampled += 1
+        return True
+
+
+class ArtifactStore:
+    """
+    有界的排障目录：按总字节数上限与最长保留时间清理，先删最旧的（按 mtime）。
+    首次使用某目录时扫描一次已有文件，之后增量记账；只在后台写线程中调用。
+    """
+
+    def __init__(self) -> None:
+        self._files: Dict[str, Dict[str, Tuple[float, int]]] = {}
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def _index(self, directory: str) -> Dict[str, Tuple[float, int]]:
+        index = self._files.get(directory)
+        if index is None:
+            index = self._files[directory] = {}
+            try:
+                for entry in os.scandir(directory):
+                    if entry.is_file() and not entry.name.startswith("."):
+                        st = entry.stat()
+                        index[entry.path] = (st.st_mtime, st.st_size)
+            except OSError:
+                pass
+        return index
+
+    def write(self, path: str, data: bytes | None) -> None:
+        """data 为 None 表示文件已由他人写好（如 trace），只登记并触发清理。"""
+        directory = os.path.dirname(path) or "."
+        with self._lock:
+            if data is not None:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(prefix=".artifact-", dir=directory)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                return
+            index = self._index(directory)
+            index[path] = (st.st_mtime, st.st_size)
+            self._evict(index)
+
+    def _evict(self, index: Dict[str, Tuple[float, int]]) -> None:
+        cutoff = time.time() - settings.ARTIFACT_MAX_AGE_S
+        total = sum(size for _, size in index.values())
+        for path, (mtime, size) in sorted(index.items(), key=lambda kv: kv[1][0]):
+            if total <= settings.ARTIFACT_MAX_BYTES and mtime >= cutoff:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            del index[path]
+            total -= size
+            self.evicted += 1
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {directory: {"files": len(index), "bytes": sum(size for _, size in index.values())}
+                for directory, index in self._files.items()}
+
+
+class ArtifactWriter:
+    """后台写排障文件：调用方只把字节放进有界队列，写盘与清理在线程中完成；队列满时丢弃并计数。"""
+
+    def __init__(self, store: ArtifactStore) -> None:
+        self.store = store
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def _ensure(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop or self._task is None or self._task.done():
+            # 每个事件循环（如多次 asyncio.run）各自一个写任务
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=settings.ARTIFACT_QUEUE_SIZE)
+            self._task = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    def submit(self, path: str, data: bytes | None = None) -> bool:
+        try:
+            self._ensure().put_nowait((path, data))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            path, data = await queue.get()
+            try:
+                await asyncio.to_thread(self.store.write, path, data)
+                self.written += 1
+            except Exception:
+                self.failed += 1
+            finally:
+                queue.task_done()
+
+    async def aclose(self) -> None:
+        """写完队列中剩余的文件后停止后台任务。"""
+        if self._task is None or self._loop is not asyncio.get_running_loop():
+            return
+        await self._queue.join()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = self._queue = None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": self._queue.qsize() if self._queue is not None else 0, "written": self.written,
+                "dropped": self.dropped, "failed": self.failed, "evicted": self.store.evicted,
+                "sampled": artifact_sampler.sampled, "skipped": artifact_sampler.skipped,
+                "dirs": self.store.stats}
+
+
+artifact_sampler = ArtifactSampler()
+artifact_writer = ArtifactWriter(ArtifactStore())
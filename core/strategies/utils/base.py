@@ -4,45 +4,223 @@
 # @FileName: base.py
 # @Software: PyCharm
 from __future__ import annotations
-from abc import ABC, abstractmethod
+import logging
 import os
-
-from playwright.async_api import Page
+from abc import ABC
+from contextlib import AsyncExitStack
+from typing import List, Tuple
+from urllib.parse import urlsplit
 
 from ...schemas import LoginOptions, LoginResponse
+from ...config import settings
+from ...scheduler import scheduler
 from ...enums import LoginReasonType, LoginStrategyType
+from ...utils.auth_cache import auth_cache
+from ...store import SessionStore, StorageState, get_session_store
+from ...utils.cookies import CookieExpiry, critical_cookie_expiry, prune_storage_state
+from ...utils.deadline import remaining_ms
+from ...utils.logger import LogCtx, get_logger, log_kv
+from ...utils.metrics import Spans, collect_spans, metrics, span
+from ...utils.singleflight import KeyedLock, SingleFlight
+from .circuit_breaker import circuit_breakers, outcome
+from .http_base import HttpAuthCheckMinIx
 from .playwright_base import BasePlaywrightStrategy
 
+logger = get_logger("strategy")
+
+# 所有平台共享：key 中带平台名
+inflight = SingleFlight()
+account_locks = KeyedLock()
+
 
 class LoginStrategy(ABC,
-                    BasePlaywrightStrategy):
+                    BasePlaywrightStrategy,
+                    HttpAuthCheckMinIx):
     """每个平台实现：生成cookie、校验cookie。"""
 
+    @property
+    def store(self) -> SessionStore:
+        return get_session_store()
+
+    def account_key(self, account_file: str) -> Tuple[str, str]:
+        """账号标识：路径规范为绝对路径（与 auth_cache 一致），"./a.json" 与 "a.json" 是同一个账号。"""
+        return self.name, os.path.abspath(account_file)
+
     async def login_and_save(self, account_file: str, options: LoginOptions) -> LoginResponse:
+        """同账号并发登录合并为一次；再加账号级锁，登录写 storage_state 期间同账号的 auth 排在后面。"""
+        key = (*self.account_key(account_file), LoginStrategyType.LOGIN, options.coalesce_key)
+        return await inflight.do(key, lambda: self._login_and_save_locked(account_file, options))
+
+    async def _login_and_save_locked(self, account_file: str, options: LoginOptions) -> LoginResponse:
+        with collect_spans() as spans:
+            async with AsyncExitStack() as stack:
+                with span("queue"):
+                    await stack.enter_async_context(account_locks.hold(self.account_key(account_file)))
+                    await stack.enter_async_context(scheduler.slot(self.name))
+                res = await self._login_and_save(account_file, options)
+        return self._record(res, LoginStrategyType.LOGIN, spans)
+
+    async def _login_and_save(self, account_file: str, options: LoginOptions) -> LoginResponse:
         try:
-            return await self.execute(account_file, options, mode=LoginStrategyType.LOGIN)
+            res = await self.execute(account_file, options, mode=LoginStrategyType.LOGIN)
+            if res.ok and res.data:
+                await self._persist_state(res, account_file)
+            if not options.return_state:
+                # state 已落到存储，批量场景下不再随结果常驻内存
+                res.data = None
+            return res
         except Exception as e:
             return LoginResponse(False, LoginReasonType.UNKNOWN_ERROR, path=account_file, extra={"err": str(e)})
+        finally:
+            # cookie 已（可能）被重写，之前的校验结果作废
+            auth_cache.invalidate(self.name, account_file)
+
+    def state_domains(self) -> List[str]:
+        """storage_state 中需要保留的域：auth 放行域名 + 首页 / 登录页主机。"""
+        domains = list(settings.platform(self.name, "AUTH_DOMAINS", ()))
+        for key in ("HOME_URL", "LOGIN_URL"):
+            host = urlsplit(settings.platform(self.name, key) or "").hostname
+            if host and host not in domains:
+                domains.append(host)
+        return domains
+
+    async def _persist_state(self, res: LoginResponse, account_file: str) -> None:
+        """登录拿到的 state 裁剪后经存储后端原子写入，res.data 同步替换为裁剪后的 state。"""
+        state = res.data
+        before = len(state.get("cookies") or []), len(state.get("origins") or [])
+        if settings.STATE_PRUNE:
+            state = prune_storage_state(state, self.state_domains())
+        await self.store.save(self.name, account_file, state)
+        res.data = state
+        res.extra["state"] = {"cookies": len(state["cookies"]), "origins": len(state["origins"]),
+                              "pruned_cookies": before[0] - len(state["cookies"]),
+                              "pruned_origins": before[1] - len(state["origins"])}
 
     async def auth(self, account_file: str, options: LoginOptions) -> LoginResponse:
-        if not os.path.exists(account_file):
+        """同账号、同结果相关选项（LoginOptions.coalesce_key）的并发校验合并为一次，调用方共享同一个结果。"""
+        key = (*self.account_key(account_file), LoginStrategyType.AUTH, options.coalesce_key)
+        return await inflight.do(key, lambda: self._auth_flow(account_file, options))
+
+    async def _auth_flow(self, account_file: str, options: LoginOptions) -> LoginResponse:
+        with collect_spans() as spans:
+            async with AsyncExitStack() as stack:
+                # 与同账号的登录互斥：不读写到一半的 state，登录完成后读到的是新 state
+                with span("queue"):
+                    await stack.enter_async_context(account_locks.hold(self.account_key(account_file)))
+                res = await self._auth_pipeline(account_file, options)
+        return self._record(res, LoginStrategyType.AUTH, spans)
+
+    async def _auth_pipeline(self, account_file: str, options: LoginOptions) -> LoginResponse:
+        try:
+            with span("load_state"):
+                state = await self.store.load(self.name, account_file)
+        except (OSError, ValueError) as e:
+            # 文件损坏/不可读：不可能通过校验，也没有重试的意义
+            return LoginResponse(False, LoginReasonType.COOKIE_INVALID, path=account_file, extra={"err": str(e)})
+        if state is None:
             return LoginResponse(False, LoginReasonType.COOKIE_FILE_MISSING, path=account_file)
 
+        if options.offline_precheck:
+            expired = self.precheck(account_file, state)
+            if expired is not None:
+                return expired
+
+        fingerprint = None
+        if options.auth_cache:
+            with span("cache"):
+                fingerprint = await self.store.fingerprint(self.name, account_file)
+            cached = auth_cache.get(self.name, account_file, fingerprint)
+            if cached is not None:
+                return cached
+
+        res = await self._auth(account_file, options, state)
+        if fingerprint is not None:
+            auth_cache.put(self.name, account_file, fingerprint, res)
+        if res.reason in (LoginReasonType.COOKIE_VALID, LoginReasonType.COOKIE_INVALID):
+            await self.store.mark_validated(self.name, account_file, bool(res.ok))
+        return res
+
+    async def _auth(self, account_file: str, options: LoginOptions, state: StorageState) -> LoginResponse:
+        """平台熔断打开时直接返回 CIRCUIT_OPEN，不排队、不拉浏览器；否则按结果更新熔断统计。"""
+        if not options.circuit_breaker:
+            return await self._auth_queued(account_file, options, state)
+        breaker = circuit_breakers.get(self.name)
+        probe = breaker.acquire()
+        if probe is None:
+            return LoginResponse(False, LoginReasonType.CIRCUIT_OPEN, path=account_file,
+                                 extra={"circuit": breaker.data})
+        failure = None
+        try:
+            res = await self._auth_queued(account_file, options, state)
+            # 超时被调用方截止时间截短时，失败不归咎于平台
+            left = remaining_ms()
+            failure = outcome(res) if left is None or left > 0 else None
+            return res
+        finally:
+            breaker.record(probe, failure)
+
+    async def _auth_queued(self, account_file: str, options: LoginOptions, state: StorageState) -> LoginResponse:
+        # 只有真正发起网络请求的校验才占用平台并发与令牌；缓存命中、离线预检不受限
+        async with AsyncExitStack() as stack:
+            with span("queue"):
+                await stack.enter_async_context(scheduler.slot(self.name))
+            return await self._auth_backend(account_file, options, state)
+
+    async def _auth_backend(self, account_file: str, options: LoginOptions, state: StorageState) -> LoginResponse:
         try:
-            return await self.execute(account_file, options, mode=LoginStrategyType.AUTH)
+            if self.use_http_auth(options):
+                with span("http"):
+                    return await self.handler_auth_http(account_file, options, state)
+            return await self.execute(account_file, options, mode=LoginStrategyType.AUTH, storage_state=state)
         except Exception as e:
             return LoginResponse(False, LoginReasonType.PLAYWRIGHT_ERROR, path=account_file, extra={"err": str(e)})
 
+    def _record(self, res: LoginResponse, mode: LoginStrategyType, spans: Spans) -> LoginResponse:
+        """把本次调用的阶段耗时写入 extra["timings"]，上报指标，并记一条 DEBUG 结果日志（未开启时不产生开销）。"""
+        res.extra["timings"] = spans.data
+        metrics.observe(self.name, mode, res.reason, spans)
+        log_kv(logger, logging.DEBUG, "login result", **LogCtx(self.name, res.path).data, mode=mode,
+               ok=res.ok, reason=res.reason, timings=res.extra["timings"])
+        return res
+
+    def critical_expiry(self, state: StorageState) -> CookieExpiry | None:
+        """本平台关键 cookie 的过期信息；平台未声明关键 cookie 时返回 None。"""
+        names = settings.platform(self.name, "AUTH_COOKIES", ())
+        if not names:
+            return None
+        return critical_cookie_expiry(state, names)
+
+    async def cookie_expiry(self, account_file: str) -> CookieExpiry | None:
+        """从存储读取 state 并解析关键 cookie 过期信息；不存在或不可读时返回 None。"""
+        try:
+            state = await self.store.load(self.name, account_file)
+        except (OSError, ValueError):
+            return None
+        return None if state is None else self.critical_expiry(state)
+
+    def precheck(self, account_file: str, state: StorageState) -> LoginResponse | None:
+        """离线预检：关键 cookie 已过期直接返回 COOKIE_INVALID，否则返回 None 继续在线校验。"""
+        expiry = self.critical_expiry(state)
+        if expiry is None or not expiry.expired:
+            return None
+        return LoginResponse(False, LoginReasonType.COOKIE_INVALID, path=account_file,
+                             extra={"precheck": "cookie_expired", **expiry.data})
+
+    def use_http_auth(self, options: LoginOptions) -> bool:
+        """选项打开且平台在 URLConfig 中允许时，auth 走无浏览器 HTTP 校验。"""
+        return options.http_auth and bool(settings.platform(self.name, "HTTP_AUTH", False))
+
     async def setup(self, account_file: str, options: LoginOptions, handle: bool = False) -> LoginResponse:
         """不存在/失效则（可选）触发登录生成。"""
 
-        if not os.path.exists(account_file):
+        if not await self.store.exists(self.name, account_file):
             if not handle:
                 return LoginResponse(False, LoginReasonType.COOKIE_FILE_MISSING, path=account_file)
             return await self.login_and_save(account_file, options)
         auth_res = await self.auth(account_file, options)
 
-        if auth_res.ok:
+        # 熔断中站点不可用，拉起登录窗口也无意义
+        if auth_res.ok or auth_res.reason == LoginReasonType.CIRCUIT_OPEN:
             return auth_res
         if not handle:
             return LoginResponse(False, LoginReasonType.COOKIE_INVALID, path=account_file)
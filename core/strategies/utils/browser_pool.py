@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 上午10:05
+# @Author  : fzf
+# @FileName: browser_pool.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Tuple
+
+from ...config import settings
+from ...utils.timeouts import ANY_PLATFORM, adaptive_timeouts
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Playwright
+
+
+@dataclass(slots=True)
+class _PooledBrowser:
+    browser: Browser
+    uses: int = 0  # 已分配的 context 次数
+    active: int = 0  # 当前正在使用的 context 数
+    retired: bool = False  # 达到回收次数，等在用的 context 释放后关闭
+
+
+class _BrowserGroup:
+    """同一组启动参数的浏览器集合：按需启动，最多 size 个，每个可同时承载 max_contexts 个 context。"""
+
+    def __init__(self, driver: Playwright, launch_kwargs: Dict[str, Any], size: int, max_uses: int,
+                 max_contexts: int) -> None:
+        self._driver = driver
+        self._launch_kwargs = launch_kwargs
+        self._size = max(1, size)
+        self._max_uses = max(1, max_uses)
+        self._max_contexts = max(1, max_contexts)
+        self._browsers: List[_PooledBrowser] = []
+        self._launching = 0
+        self._cond = asyncio.Condition()
+
+    def _pick(self) -> _PooledBrowser | None:
+        candidates = [b for b in self._browsers
+                      if not b.retired and b.active < self._max_contexts and b.browser.is_connected()]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda b: b.active)
+
+    def _take(self, item: _PooledBrowser) -> _PooledBrowser:
+        item.active += 1
+        item.uses += 1
+        if item.uses >= self._max_uses:
+            item.retired = True
+        return item
+
+    async def acquire(self, learn: bool = True) -> _PooledBrowser:
+        """learn=False 时启动耗时不计入自适应超时（对应 LoginOptions.adaptive_timeouts）。"""
+        async with self._cond:
+            while True:
+                # 顺手清理已断开的浏览器
+                self._browsers = [b for b in self._browsers if b.browser.is_connected() or b.active]
+                item = self._pick()
+                if item is not None:
+                    return self._take(item)
+                alive = sum(1 for b in self._browsers if not b.retired)
+                if alive + self._launching < self._size:
+                    self._launching += 1
+                    break
+                await self._cond.wait()
+
+        # 启动放在锁外，避免阻塞其他请求归还
+        launch_kwargs = self._launch_kwargs
+        start = time.perf_counter()
+        try:
+            browser = await self._driver.chromium.launch(**launch_kwargs)
+        except BaseException as e:
+            if learn and type(e).__name__ == "TimeoutError":
+                adaptive_timeouts.observe_timeout(ANY_PLATFORM, "launch")
+            async with self._cond:
+                self._launching -= 1
+                self._cond.notify_all()
+            raise
+
+        if learn:
+            adaptive_timeouts.observe(ANY_PLATFORM, "launch", (time.perf_counter() - start) * 1000)
+        async with self._cond:
+            self._launching -= 1
+            item = _PooledBrowser(browser)
+            self._browsers.append(item)
+            self._cond.notify_all()
+            return self._take(item)
+
+    async def release(self, item: _PooledBrowser) -> None:
+        to_close: Browser | None = None
+        async with self._cond:
+            item.active -= 1
+            if (item.retired or not item.browser.is_connected()) and item.active <= 0:
+                if item in self._browsers:
+                    self._browsers.remove(item)
+                to_close = item.browser
+            self._cond.notify_all()
+        if to_close is not None:
+            await _close_quietly(to_close)
+
+    async def close(self) -> None:
+        async with self._cond:
+            browsers, self._browsers = self._browsers, []
+            self._cond.notify_all()
+        for item in browsers:
+            await _close_quietly(item.browser)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "browsers": len(self._browsers),
+            "active_contexts": sum(b.active for b in self._browsers),
+            "launching": self._launching,
+        }
+
+
+async def _close_quietly(browser: Browser) -> None:
+    try:
+        await browser.close()
+    except Exception:
+        pass
+
+
+class BrowserPool:
+    """
+    常驻 Playwright 驱动 + 浏览器池：
+    - start()/stop() 管理生命周期，按引用计数：每次 start() 对应一次 stop()，最后一个使用者 stop() 时才关闭
+    - 按 (mode, 启动参数) 分组，auth 与 login 的浏览器互不混用
+    - 每次请求只新建 BrowserContext，浏览器达到 max_uses 后回收重启
+    """
+
+    def __init__(self, size: int | None = None, max_uses: int | None = None,
+                 max_contexts: int | None = None) -> None:
+        self.size = size or settings.PW_POOL_SIZE
+        self.max_uses = max_uses or settings.PW_POOL_MAX_USES
+        self.max_contexts = max_contexts or settings.PW_POOL_MAX_CONTEXTS
+        self._driver: Playwright | None = None
+        self._groups: Dict[Tuple[Any, ...], _BrowserGroup] = {}
+        self._users = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._driver is not None
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._driver is None:
+                # 只有真正启用浏览器池时才导入 playwright
+                from playwright.async_api import async_playwright
+                self._driver = await async_playwright().start()
+            self._users += 1
+
+    async def stop(self) -> None:
+        async with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users:
+                # 还有其他使用者（如并发的批量任务），不能关掉它们正在用的浏览器
+                return
+            groups, self._groups = self._groups, {}
+            for group in groups.values():
+                await group.close()
+            if self._driver is not None:
+                driver, self._driver = self._driver, None
+                try:
+                    await driver.stop()
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _key(mode: str, launch_kwargs: Dict[str, Any]) -> Tuple[Any, ...]:
+        return (
+            str(mode),
+            launch_kwargs.get("headless"),
+            tuple(launch_kwargs.get("args") or ()),
+            launch_kwargs.get("executable_path"),
+            launch_kwargs.get("channel"),
+            (launch_kwargs.get("proxy") or {}).get("server"),
+        )
+
+    def _group(self, mode: str, launch_kwargs: Dict[str, Any]) -> _BrowserGroup:
+        if self._driver is None:
+            raise RuntimeError("BrowserPool is not started, call start() first")
+        key = self._key(mode, launch_kwargs)
+        group = self._groups.get(key)
+        if group is None:
+            group = _BrowserGroup(self._driver, launch_kwargs, self.size, self.max_uses, self.max_contexts)
+            self._groups[key] = group
+        else:
+            # 同组参数只可能在启动超时上不同，用最新的（自适应）值启动后续浏览器
+            group._launch_kwargs = launch_kwargs
+        return group
+
+    @asynccontextmanager
+    async def browser(self, mode: str, launch_kwargs: Dict[str, Any], learn: bool = True) -> AsyncIterator[Browser]:
+        """借出一个浏览器，调用方在其上 new_context，用完自动归还。"""
+        group = self._group(mode, launch_kwargs)
+        item = await group.acquire(learn)
+        try:
+            yield item.browser
+        finally:
+            await group.release(item)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {"started": self.started, "users": self._users,
+                "groups": [{"mode": k[0], "headless": k[1], **g.stats} for k, g in self._groups.items()]}
+
+
+browser_pool = BrowserPool()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 下午10:10
+# @Author  : fzf
+# @FileName: circuit_breaker.py
+# @Software: PyCharm
+from __future__ import annotations
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+from ...config import settings
+from ...enums import CircuitStateType, LoginReasonType
+from ...schemas import LoginResponse
+
+# 站点侧故障：计入熔断失败率；有效/失效/文件缺失等确定结论算成功，其余（如用户中止、代码异常）不计
+FAILURE_REASONS = frozenset({
+    LoginReasonType.NAVIGATION_TIMEOUT,
+    LoginReasonType.ELEMENT_TIMEOUT,
+    LoginReasonType.RETRY_EXHAUSTED,
+})
+# 这些原因既可能是网络错误 / 浏览器崩溃，也可能是代码缺陷：只有结果标了 extra["transient"] 时才算站点故障
+TRANSIENT_REASONS = frozenset({
+    LoginReasonType.PLAYWRIGHT_ERROR,
+    LoginReasonType.UNKNOWN_ERROR,
+})
+SUCCESS_REASONS = frozenset({
+    LoginReasonType.COOKIE_VALID,
+    LoginReasonType.COOKIE_INVALID,
+    LoginReasonType.COOKIE_FILE_MISSING,
+})
+
+
+def outcome(res: LoginResponse) -> bool | None:
+    """True 为失败，False 为成功，None 不计入。"""
+    if res.reason in FAILURE_REASONS or (res.reason in TRANSIENT_REASONS and res.extra.get("transient")):
+        return True
+    if res.reason in SUCCESS_REASONS:
+        return False
+    return None
+
+
+class CircuitBreaker:
+    """
+    单个平台的熔断器：
+    - closed     最近 window 次调用中失败率达到 failure_rate（且不少于 min_calls 次）即打开
+    - open       open_s 秒内直接拒绝，调用方返回 CIRCUIT_OPEN，不占浏览器/连接
+    - half_open  冷却结束后只放行一个探测请求：成功则关闭并清空统计，失败则重新打开
+    """
+
+    def __init__(self, window: int, min_calls: int, failure_rate: float, open_s: float) -> None:
+        self.window = max(1, window)
+        self.min_calls = max(1, min_calls)
+        self.failure_rate = failure_rate
+        self.open_s = open_s
+        self.state = CircuitStateType.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=self.window)
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def retry_after_s(self) -> float:
+        if self.state != CircuitStateType.OPEN:
+            return 0.0
+        return max(0.0, self.open_s - (time.monotonic() - self._opened_at))
+
+    def acquire(self) -> bool | None:
+        """放行返回是否为探测请求（True/False），拒绝返回 None。"""
+        if self.state == CircuitStateType.OPEN:
+            if time.monotonic() - self._opened_at < self.open_s:
+                self.rejected += 1
+                return None
+            self.state = CircuitStateType.HALF_OPEN
+            self._probing = False
+        if self.state == CircuitStateType.HALF_OPEN:
+            if self._probing:
+                self.rejected += 1
+                return None
+            self._probing = True
+            return True
+        return False
+
+    def record(self, probe: bool, failure: bool | None) -> None:
+        """登记一次放行调用的结果；failure 为 None（被取消、结果不计入）时探测名额交给下一个调用。"""
+        if probe:
+            self._probing = False
+            if failure is True:
+                self._open()
+            elif failure is False:
+                self.state = CircuitStateType.CLOSED
+                self._outcomes.clear()
+            return
+        # 打开前已放行的调用晚到的结果不影响当前状态
+        if failure is None or self.state != CircuitStateType.CLOSED:
+            return
+        self._outcomes.append(failure)
+        if len(self._outcomes) >= self.min_calls and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = CircuitStateType.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.opened += 1
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        failures = sum(self._outcomes)
+        return {
+            "state": self.state,
+            "calls": len(self._outcomes),
+            "failures": failures,
+            "retry_after_s": round(self.retry_after_s, 3),
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreakers:
+    """按平台懒创建熔断器，参数取自配置。"""
+
+    def __init__(self) -> None:
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, platform: str) -> CircuitBreaker:
+        breaker = self._breakers.get(platform)
+        if breaker is None:
+            breaker = self._breakers[platform] = CircuitBreaker(
+                window=settings.CIRCUIT_WINDOW,
+                min_calls=settings.CIRCUIT_MIN_CALLS,
+                failure_rate=settings.CIRCUIT_FAILURE_RATE,
+                open_s=settings.CIRCUIT_OPEN_S,
+            )
+        return breaker
+
+    def reset(self, platform: str | None = None) -> None:
+        if platform is None:
+            self._breakers.clear()
+        else:
+            self._breakers.pop(platform, None)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {platform: breaker.data for platform, breaker in self._breakers.items()}
+
+
+circuit_breakers = CircuitBreakers()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 下午8:40
+# @Author  : fzf
+# @FileName: detection.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, List
+from urllib.parse import urljoin
+
+from ...config import settings
+from ...enums import AuthSignalType, LoginReasonType
+from .http_base import url_match
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Request, Response
+
+
+@dataclass(slots=True)
+class Detection:
+    ok: bool
+    reason: str
+    signal: AuthSignalType
+    url: str | None = None
+    nav_ms: float | None = None  # 导航提交耗时（未提交为 None）
+    elapsed_ms: float = 0.0  # 从发起导航到判定的耗时
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return {"signal": self.signal, "final_url": self.url,
+                "nav_ms": round(self.nav_ms, 3) if self.nav_ms is not None else None}
+
+
+class LoginDetector:
+    """
+    浏览器 auth 判定：并行监听多个信号，先到的确定信号胜出，不再固定等待一段时间后数文案。
+    - redirect   主框架导航请求指向登录页（跳转链中一出现就判失效，不必等登录页加载）
+    - status     主文档返回 401/403
+    - api        直接请求平台登录态接口（URLConfig *_AUTH_API，带 context 的 cookie）：2xx 有效，401/403 或跳转登录页失效
+                 （auth 的 context 禁用了 JS，页面自己不会发出接口请求，所以不能靠监听响应）
+    - dom_marker 页面出现需登录文案
+    - home_url   DOM 就绪后仍停留在首页且没有需登录文案
+    超时前没有任何信号时返回 ELEMENT_TIMEOUT（导航未完成则 NAVIGATION_TIMEOUT），不做有效/失效的猜测。
+    """
+
+    def __init__(self, page: Page, *, home_url: str, login_url: str | None, need_login_text: str,
+                 api_url: str | None = None, timeout_ms: int | None = None) -> None:
+        self.page = page
+        self.home_url = home_url
+        self.login_url = login_url
+        self.need_login_text = need_login_text
+        self.api_url = api_url or None
+        self.timeout_ms = timeout_ms or settings.AUTH_DETECT_TIMEOUT_MS
+        self._decided: asyncio.Future | None = None
+        self._navigated = False
+        self._start = 0.0
+        self._nav_ms: float | None = None
+
+    # ---- 信号 ----
+    def _decide(self, ok: bool, signal: AuthSignalType, url: str | None = None) -> None:
+        if self._decided is not None and not self._decided.done():
+            reason = LoginReasonType.COOKIE_VALID if ok else LoginReasonType.COOKIE_INVALID
+            self._decided.set_result(Detection(ok, reason, signal, url or self.page.url, self._nav_ms,
+                                               (time.perf_counter() - self._start) * 1000))
+
+    def _on_request(self, request: Request) -> None:
+        if (self.login_url and request.is_navigation_request() and request.frame == self.page.main_frame
+                and url_match(request.url, self.login_url)):
+            self._decide(False, AuthSignalType.REDIRECT, request.url)
+
+    def _on_response(self, response: Response) -> None:
+        request = response.request
+        if request.is_navigation_request() and request.frame == self.page.main_frame:
+            if response.status in (401, 403):
+                self._decide(False, AuthSignalType.STATUS, response.url)
+
+    async def _probe_api(self) -> None:
+        response = await self.page.context.request.get(self.api_url, timeout=self.timeout_ms, max_redirects=0,
+                                                       fail_on_status_code=False)
+        status = response.status
+        if 200 <= status < 300:
+            self._decide(True, AuthSignalType.API, response.url)
+        elif status in (401, 403):
+            self._decide(False, AuthSignalType.API, response.url)
+        elif (300 <= status < 400 and self.login_url
+              and url_match(urljoin(response.url, response.headers.get("location", "")), self.login_url)):
+            self._decide(False, AuthSignalType.API, response.url)
+        # 其他状态（5xx 等）不作判定，交给其余信号
+
+    async def _watch_marker(self) -> None:
+        await self.page.get_by_text(self.need_login_text).first.wait_for(state="attached", timeout=self.timeout_ms)
+        self._decide(False, AuthSignalType.DOM_MARKER)
+
+    async def _watch_home(self, goto: asyncio.Task) -> None:
+        await goto
+        self._navigated = True
+        self._nav_ms = (time.perf_counter() - self._start) * 1000
+        await self.page.wait_for_load_state("domcontentloaded", timeout=self.timeout_ms)
+        url = self.page.url
+        if self.login_url and url_match(url, self.login_url):
+            self._decide(False, AuthSignalType.REDIRECT, url)
+        elif url_match(url, self.home_url):
+            # DOM 已就绪：文案此时不在就判有效；在的话 marker 信号会先一步判失效
+            if not await self.page.get_by_text(self.need_login_text).count():
+                self._decide(True, AuthSignalType.HOME_URL, url)
+
+    # ---- 判定 ----
+    async def detect(self, navigate: Awaitable[Any]) -> Detection:
+        """navigate 为发起导航的协程（如 page.goto(..., wait_until="commit")），与各信号并行执行。"""
+        self._decided = asyncio.get_running_loop().create_future()
+        self._start = time.perf_counter()
+        self.page.on("request", self._on_request)
+        self.page.on("response", self._on_response)
+        goto = asyncio.ensure_future(navigate)
+        watchers: List[asyncio.Task] = [asyncio.ensure_future(self._watch_marker()),
+                                        asyncio.ensure_future(self._watch_home(goto))]
+        if self.api_url:
+            watchers.append(asyncio.ensure_future(self._probe_api()))
+        try:
+            pending = {self._decided, goto, *watchers}
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.timeout_ms / 1000.0
+            while not self._decided.done():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                # 导航本身失败且还没有信号：交给上层按原有超时/异常逻辑处理
+                if goto in done and goto.exception() is not None and not self._decided.done():
+                    raise goto.exception()
+            if self._decided.done():
+                return self._decided.result()
+            reason = LoginReasonType.ELEMENT_TIMEOUT if self._navigated else LoginReasonType.NAVIGATION_TIMEOUT
+            return Detection(False, reason, AuthSignalType.NONE, self.page.url, self._nav_ms,
+                             (time.perf_counter() - self._start) * 1000)
+        finally:
+            self.page.remove_listener("request", self._on_request)
+            self.page.remove_listener("response", self._on_response)
+            for task in (goto, *watchers):
+                if not task.done():
+                    task.cancel()
+            # 取回被取消/失败任务的异常，避免 "exception was never retrieved"
+            await asyncio.gather(goto, *watchers, return_exceptions=True)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 下午10:50
+# @Author  : fzf
+# @FileName: errors.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import random
+from dataclasses import dataclass
+
+from ...enums import LoginReasonType
+
+# execute 中出错所处的阶段
+PHASE_LAUNCH = "launch"  # 驱动 / 浏览器启动（含从池中获取）
+PHASE_CONTEXT = "context"  # 新建 context、加载 storage_state
+PHASE_RUN = "run"  # 导航与平台逻辑
+
+# 用户关闭窗口时 Playwright 的报错文本；只认完整短语，不再把任何含 "closed" 的报错都当作中止
+USER_ABORT_MESSAGES = (
+    "target page, context or browser has been closed",
+    "target closed",
+    "browser has been closed",
+    "context has been closed",
+    "page has been closed",
+    "context closed",
+    "page closed",
+)
+# 浏览器进程崩溃 / 驱动断连：换个浏览器重试通常能恢复
+CRASH_MESSAGES = ("crashed", "connection closed", "websocket", "browser closed", "closed unexpectedly")
+# 可执行文件、权限等配置问题，重试也不会成功
+LAUNCH_PERMANENT_MESSAGES = ("executable doesn't exist", "no such file", "enoent", "permission denied", "eacces",
+                             "not a valid", "unsupported", "please run the following command")
+# storage_state 文件不可读 / 格式错误（Playwright 读取 state 文件、Node JSON.parse、storageState 参数校验的报错），
+# 只认这些具体短语：消息里提到 JSON 的其他异常（如接口响应解析失败）不算 state 错误
+STATE_MESSAGES = ("error reading storage state", "enoent: no such file", "in json at position", "is not valid json",
+                  "unexpected end of json input", "storagestate")
+# 不可重试的网络错误（证书、地址非法、被拦截）
+NET_PERMANENT_MESSAGES = ("net::err_cert", "net::err_invalid_url", "net::err_unsafe_port", "net::err_blocked_by")
+
+
+@dataclass(slots=True)
+class ErrorClass:
+    reason: str
+    transient: bool  # 是否值得重试
+    user_abort: bool = False
+
+
+def is_user_abort(e: BaseException) -> bool:
+    if isinstance(e, asyncio.CancelledError):
+        return True
+    msg = str(e).lower()
+    return any(m in msg for m in USER_ABORT_MESSAGES)
+
+
+def classify_error(e: BaseException, phase: str, interactive: bool = False) -> ErrorClass:
+    """
+    把 execute 中的异常归类到 LoginReasonType，并标记是否为瞬时故障。
+    interactive 为有头登录窗口：只有这时“已关闭”类报错才算用户中止，无头 auth 中出现则按浏览器崩溃处理。
+    """
+    from playwright.async_api import Error as PWError, TimeoutError as PWTimeout
+
+    msg = str(e).lower()
+    if phase == PHASE_LAUNCH:
+        if any(m in msg for m in LAUNCH_PERMANENT_MESSAGES):
+            return ErrorClass(LoginReasonType.BROWSER_LAUNCH_FAILED, transient=False)
+        return ErrorClass(LoginReasonType.BROWSER_LAUNCH_FAILED, transient=True)
+
+    if phase == PHASE_CONTEXT and (isinstance(e, (OSError, ValueError)) or any(m in msg for m in STATE_MESSAGES)):
+        return ErrorClass(LoginReasonType.COOKIE_INVALID, transient=False)
+
+    if isinstance(e, PWTimeout):
+        nav = "navigating to" in msg or ".goto" in msg or "wait_for_url" in msg
+        return ErrorClass(LoginReasonType.NAVIGATION_TIMEOUT if nav else LoginReasonType.ELEMENT_TIMEOUT,
+                          transient=True)
+
+    if interactive and phase == PHASE_RUN and is_user_abort(e):
+        return ErrorClass(LoginReasonType.USER_ABORTED, transient=False, user_abort=True)
+
+    if isinstance(e, PWError):
+        if any(m in msg for m in NET_PERMANENT_MESSAGES):
+            return ErrorClass(LoginReasonType.PLAYWRIGHT_ERROR, transient=False)
+        if "net::err_" in msg or any(m in msg for m in CRASH_MESSAGES) or is_user_abort(e):
+            return ErrorClass(LoginReasonType.PLAYWRIGHT_ERROR, transient=True)
+        return ErrorClass(LoginReasonType.PLAYWRIGHT_ERROR, transient=False)
+
+    # 代码缺陷等非 Playwright 异常：重试只会重复同样的错误
+    return ErrorClass(LoginReasonType.UNKNOWN_ERROR, transient=False)
+
+
+def backoff_ms(attempt: int, base_ms: float, cap_ms: float) -> float:
+    """指数退避加抖动：上限 min(cap, base × 2^attempt)，在 [上限/2, 上限] 内均匀取值，避免批量任务同时重试。"""
+    ceiling = min(cap_ms, base_ms * (2 ** attempt))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 上午11:32
+# @Author  : fzf
+# @FileName: http_base.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import time
+from http.cookiejar import CookieJar
+from typing import TYPE_CHECKING, Any, Dict, List
+from urllib.parse import urljoin, urlsplit
+
+from ...config import settings
+from ...enums import LoginReasonType
+from ...schemas import LoginOptions, LoginResponse
+from ...utils.cookies import cookie_header, load_storage_state, merge_set_cookie
+from ...utils.timeouts import TimeoutMinIx
+from .proxy_pool import proxy_pool
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class _NullCookieJar(CookieJar):
+    """共享 client 不能记住任何账号的 cookie，cookie 由每次请求显式携带。"""
+
+    def set_cookie(self, cookie) -> None:
+        pass
+
+    def extract_cookies(self, response, request) -> None:
+        pass
+
+
+class HttpClientPool:
+    """
+    按事件循环懒加载带连接池的 httpx.AsyncClient，所有账号共享 keep-alive 连接；
+    走代理池时每个出口代理各一个 client（直连为 None）。
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[str | None, httpx.AsyncClient] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def get(self, proxy: str | None = None) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._clients = {}
+            self._loop = loop
+        client = self._clients.get(proxy)
+        if client is None or client.is_closed:
+            import httpx  # 首次 HTTP 校验时才导入
+
+            client = self._clients[proxy] = httpx.AsyncClient(
+                proxy=proxy,
+                cookies=_NullCookieJar(),
+                follow_redirects=False,  # 手动跟随跳转，逐跳按域名挑 cookie
+                timeout=settings.HTTP_TIMEOUT_MS / 1000.0,
+                limits=httpx.Limits(max_connections=settings.HTTP_MAX_CONNECTIONS,
+                                    max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS),
+                headers={"User-Agent": settings.HTTP_USER_AGENT,
+                         "Accept": "text/html,application/xhtml+xml,*/*;q=0.8"},
+            )
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients, self._loop = self._clients, {}, None
+        for client in clients.values():
+            await client.aclose()
+
+
+http_client_pool = HttpClientPool()
+
+
+def url_match(actual: str, expected: str) -> bool:
+    """同 host 且 path 以期望 path 开头（忽略 query/fragment）。"""
+    a, e = urlsplit(actual), urlsplit(expected)
+    if (a.hostname or "").lower() != (e.hostname or "").lower():
+        return False
+    return a.path.startswith(e.path.rstrip("/") or "/")
+
+
+class HttpAuthCheckMinIx(TimeoutMinIx):
+    """
+    无浏览器的 cookie 校验：与 _optimized_auth_check 判定一致（禁用 JS，只看首页是否出现需登录文案），
+    但用共享连接池的 HTTP 客户端完成，CPU/内存开销远低于 Chromium。
+    """
+
+    name: str
+
+    async def handler_auth_http(self, account_file: str, options: LoginOptions,
+                                state: Dict[str, Any] | None = None) -> LoginResponse:
+        """默认按 URLConfig 中的 *_HOME_URL / *_LOGIN_URL / *_NEED_LOGIN_TEXT 校验，平台可覆盖。"""
+        return await self._http_auth_check(account_file, options,
+                                           url=settings.platform(self.name, "HOME_URL"),
+                                           login_url=settings.platform(self.name, "LOGIN_URL"),
+                                           need_login_text=settings.platform(self.name, "NEED_LOGIN_TEXT"),
+                                           state=state)
+
+    async def _http_auth_check(self, account_file: str, options: LoginOptions, url: str, login_url: str | None,
+                               need_login_text: str, state: Dict[str, Any] | None = None) -> LoginResponse:
+        if state is None:
+            try:
+                state = load_storage_state(account_file)
+            except (OSError, ValueError) as e:
+                return LoginResponse(False, LoginReasonType.COOKIE_INVALID, path=account_file,
+                                     extra={"err": str(e), "backend": "http"})
+        import httpx
+
+        cookies: List[Dict[str, Any]] = list(state.get("cookies") or [])
+        # 与浏览器校验同一套账号亲和：同一账号总从同一出口访问
+        proxy = proxy_pool.pick(self.name, account_file) if proxy_pool.active(options) else None
+        client = http_client_pool.get(proxy.url if proxy else None)
+        # 单跳超时按平台观测到的响应耗时自适应，样本不足时为 HTTP_TIMEOUT_MS
+        timeout_ms = self.timeout_ms(options, "http", settings.HTTP_TIMEOUT_MS)
+
+        chain: List[str] = []
+        try:
+            current = url
+            for _ in range(settings.HTTP_MAX_REDIRECTS + 1):
+                chain.append(current)
+                # 跳到登录页即判定失效，无需再请求登录页本身
+                if login_url and url_match(current, login_url):
+                    return LoginResponse(False, LoginReasonType.COOKIE_INVALID, path=account_file,
+                                         extra={"backend": "http", "final_url": current, "redirects": chain})
+                headers = {}
+                cookie = cookie_header(cookies, current)
+                if cookie:
+                    headers["Cookie"] = cookie
+                start = time.perf_counter()
+                resp = await client.get(current, headers=headers, timeout=timeout_ms / 1000.0)
+                self.observe_latency(options, "http", (time.perf_counter() - start) * 1000)
+                merge_set_cookie(cookies, resp.headers.get_list("set-cookie"), current)
+                if resp.is_redirect and "location" in resp.headers:
+                    current = urljoin(current, resp.headers["location"])
+                    continue
+                break
+            else:
+                return LoginResponse(False, LoginReasonType.NAVIGATION_TIMEOUT, path=account_file,
+                                     extra={"backend": "http", "err": "too many redirects", "redirects": chain})
+        except httpx.TimeoutException as e:
+            self.observe_timeout(options, "http")
+            # 走代理时建连的对端就是代理：连不上算代理的错，读超时可能是站点慢，不计入
+            proxy_pool.record(proxy, True if isinstance(e, httpx.ConnectTimeout) else None)
+            return LoginResponse(False, LoginReasonType.NAVIGATION_TIMEOUT, path=account_file,
+                                 extra={"backend": "http", "err": str(e) or type(e).__name__, "redirects": chain,
+                                        **({"proxy": proxy.server} if proxy else {})})
+        except httpx.HTTPError as e:
+            # 连不上代理 / 隧道握手失败计入代理健康，读写中断、协议解析等其他错误不计
+            proxy_pool.record(proxy, True if isinstance(e, (httpx.ConnectError, httpx.ProxyError)) else None)
+            return LoginResponse(False, LoginReasonType.UNKNOWN_ERROR, path=account_file,
+                                 extra={"backend": "http", "err": str(e) or type(e).__name__, "redirects": chain,
+                                        "transient": isinstance(e, httpx.TransportError),
+                                        **({"proxy": proxy.server} if proxy else {})})
+
+        proxy_pool.record(proxy, False)
+        extra = {"backend": "http", "final_url": current, "status": resp.status_code, "redirects": chain}
+        if proxy is not None:
+            extra["proxy"] = proxy.server
+        if resp.status_code in (401, 403):
+            return LoginResponse(False, LoginReasonType.COOKIE_INVALID, path=account_file, extra=extra)
+        if resp.status_code >= 500:
+            extra["transient"] = True
+            return LoginResponse(False, LoginReasonType.UNKNOWN_ERROR, path=account_file, extra=extra)
+
+        need_login = need_login_text in resp.text
+        return LoginResponse(not need_login,
+                             LoginReasonType.COOKIE_VALID if not need_login else LoginReasonType.COOKIE_INVALID,
+                             path=account_file, extra=extra)
@@ -6,36 +6,63 @@
 from __future__ import annotations
 import asyncio
 import os
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from contextlib import AsyncExitStack
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page, TimeoutError as PWTimeout
-
-from ...enums import LoginStrategyType, LoginReasonType
+from ...config import settings
+from ...enums import AuthSignalType, LoginStrategyType, LoginReasonType
 from ...schemas import LoginOptions, LoginResponse
+from ...utils.cookies import load_storage_state
+from ...utils.deadline import budget_ms, remaining_ms
+from ...utils.metrics import add_span, span
+from ...utils.timeouts import ANY_PLATFORM, TimeoutMinIx, adaptive_timeouts
+from .artifacts import artifact_sampler, artifact_writer
+from .browser_pool import browser_pool
+from .detection import LoginDetector
+from .errors import PHASE_CONTEXT, PHASE_LAUNCH, PHASE_RUN, ErrorClass, backoff_ms, classify_error
+from .proxy_pool import Proxy, is_proxy_error, proxy_pool
+from .resource_policy import ResourcePolicy, ResourceStats, apply_resource_policy
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page, Playwright
 
 
-class AuthCheckMinIx:
+class AuthCheckMinIx(TimeoutMinIx):
     """
     认证检查Mixin，提供统一的优化认证检查方法
     """
 
     async def _optimized_auth_check(self, page: Page, account_file: str, options: LoginOptions, url: str,
                                     need_login_text: str) -> LoginResponse:
-        """统一的优化认证检查方法，所有策略在auth时都使用此方法提高性能"""
-        # 激进优化：完全不等待页面加载，尽快检查登录状态
-        await self.safe_goto(page, url, options, wait_until="none")
-
-        # 激进优化：立即检查登录状态，不等待页面渲染完成
+        """统一的认证检查：导航与各判定信号并行，先到的确定信号胜出（见 LoginDetector），依据写入 extra["signal"]。"""
+        detect_timeout = self.timeout_ms(options, "auth.detect", settings.AUTH_DETECT_TIMEOUT_MS)
+        detector = LoginDetector(page,
+                                 home_url=url,
+                                 login_url=settings.platform(self.name, "LOGIN_URL"),
+                                 need_login_text=need_login_text,
+                                 api_url=settings.platform(self.name, "AUTH_API"),
+                                 timeout_ms=detect_timeout)
+        nav_timeout = self.timeout_ms(options, "auth.nav", settings.AUTH_NAV_TIMEOUT_MS)
+        # 只等导航提交（commit），之后由信号决定，不再固定等待
+        start = time.perf_counter()
         try:
-            # 尝试快速检查登录状态元素，仅等待500ms
-            need_login = await page.get_by_text(need_login_text).count(timeout=500)
-            return LoginResponse(not need_login,
-                                 LoginReasonType.COOKIE_VALID if not need_login else LoginReasonType.COOKIE_INVALID,
-                                 path=account_file)
-        except Exception:
-            # 检查失败直接返回无效，避免额外等待
-            return LoginResponse(False, LoginReasonType.COOKIE_INVALID, path=account_file)
+            result = await detector.detect(self.safe_goto(page, url, options, wait_until="commit",
+                                                          timeout_ms=nav_timeout, kind="auth.nav"))
+        except BaseException:
+            add_span("goto", (time.perf_counter() - start) * 1000)
+            raise
+        # 导航与信号并行：goto 为发起导航到提交，check 为其余等待信号的时间；未提交就已判定时全部记为 goto
+        nav_ms = result.elapsed_ms if result.nav_ms is None else min(result.nav_ms, result.elapsed_ms)
+        add_span("goto", nav_ms)
+        add_span("check", result.elapsed_ms - nav_ms)
+        # 没有信号算一次超时：只小幅放宽，不作为耗时样本
+        if result.signal != AuthSignalType.NONE:
+            self.observe_latency(options, "auth.detect", result.elapsed_ms)
+        else:
+            self.observe_timeout(options, "auth.detect")
+        return LoginResponse(result.ok, result.reason, path=account_file, extra=result.data)
 
 
 class BasePlaywrightStrategy(AuthCheckMinIx):
@@ -72,61 +99,71 @@ class BasePlaywrightStrategy(AuthCheckMinIx):
     async def set_init_script(context: BrowserContext) -> BrowserContext:
         return context
 
+    async def apply_resource_policy(self, context: BrowserContext, options: LoginOptions,
+                                    mode: LoginStrategyType | str) -> ResourceStats | None:
+        """按平台默认资源策略拦截请求，平台可覆盖以定制策略。"""
+        if not options.resource_policy:
+            return None
+        return await apply_resource_policy(context, ResourcePolicy.for_platform(self.name, mode))
+
     @staticmethod
     def _ensure_dir(path: str) -> None:
         os.makedirs(path, exist_ok=True)
 
+    async def safe_goto(self, page: Page, url: str, options: LoginOptions, wait_until: str = "domcontentloaded",
+                        timeout_ms: int | None = None, kind: str = "nav") -> None:
+        """导航并记录耗时；timeout_ms 缺省取该平台的自适应超时（样本不足时为 options.nav_timeout_ms）。"""
+        from playwright.async_api import TimeoutError as PWTimeout
+
+        timeout = timeout_ms or self.timeout_ms(options, kind, options.nav_timeout_ms)
+        start = time.perf_counter()
+        try:
+            await page.goto(url, wait_until=wait_until, timeout=timeout)
+        except PWTimeout:
+            self.observe_timeout(options, kind)
+            raise
+        self.observe_latency(options, kind, (time.perf_counter() - start) * 1000)
+
     @staticmethod
-    async def safe_goto(page: Page, url: str, options: LoginOptions,
-                        wait_until: str = "domcontentloaded") -> None:
-        await page.goto(url, wait_until=wait_until, timeout=options.nav_timeout_ms)
+    def _artifact_path(options: LoginOptions, name: str, ext: str) -> str:
+        # 带毫秒时间戳，同一平台/模式/尝试次数的多次失败不互相覆盖
+        return os.path.join(options.artifacts_dir, f"{name}_{int(time.time() * 1000)}.{ext}")
 
-    async def _screenshot(self, page: Optional[Page], options: LoginOptions, name: str) -> None:
+    async def _screenshot(self, page: Optional[Page], options: LoginOptions, name: str,
+                          reason: str = LoginReasonType.UNKNOWN_ERROR) -> None:
+        """按 (平台, 原因) 采样截图；默认只截视口，字节交给后台写入，不在事件循环里写盘。"""
         if not options.enable_screenshot_on_error or page is None:
             return
-        self._ensure_dir(options.artifacts_dir)
-        out = os.path.join(options.artifacts_dir, f"{name}.png")
+        if not artifact_sampler.allow(self.name, reason):
+            return
         try:
-            await page.screenshot(path=out, full_page=True)
+            data = await page.screenshot(full_page=options.screenshot_full_page,
+                                         timeout=settings.ARTIFACT_SCREENSHOT_TIMEOUT_MS)
         except Exception:
-            pass
+            return
+        artifact_writer.submit(self._artifact_path(options, name, "png"), data)
 
-    async def _trace_start(self, context: BrowserContext, options: LoginOptions) -> None:
-        if options.enable_trace:
-            self._ensure_dir(options.artifacts_dir)
-            await context.tracing.start(screenshots=True, snapshots=True, sources=False)
+    async def _trace_start(self, context: BrowserContext, options: LoginOptions) -> bool:
+        """只对抽中的调用录制 trace，返回是否已开始录制。"""
+        if not options.enable_trace:
+            return False
+        if not artifact_sampler.allow(self.name, "trace", settings.ARTIFACT_TRACE_SAMPLE_RATE):
+            return False
+        self._ensure_dir(options.artifacts_dir)
+        await context.tracing.start(screenshots=True, snapshots=True, sources=False)
+        return True
 
     async def _trace_stop(self, context: BrowserContext, options: LoginOptions, name: str) -> None:
-        if options.enable_trace:
-            self._ensure_dir(options.artifacts_dir)
-            out = os.path.join(options.artifacts_dir, f"{name}.zip")
-            try:
-                await context.tracing.stop(path=out)
-            except Exception:
-                pass
+        out = self._artifact_path(options, name, "zip")
+        try:
+            await context.tracing.stop(path=out)
+        except Exception:
+            return
+        # zip 由 Playwright 写好，这里只登记到有界目录，超限时淘汰最旧的文件
+        artifact_writer.submit(out)
 
     @staticmethod
-    def is_user_abort_error(e: Exception) -> bool:
-        # Ctrl+C / task cancel
-        if isinstance(e, asyncio.CancelledError):
-            return True
-
-        msg = str(e).lower()
-        # Playwright 常见关闭异常文本（不同版本略有差异）
-        keywords = [
-            "target closed",
-            "browser has been closed",
-            "browser closed",
-            "page closed",
-            "context closed",
-            "closed",
-            "connection closed",
-            "websocket connection closed",
-        ]
-        return any(k in msg for k in keywords)
-
-    async def execute(self, account_file: str, options: LoginOptions, mode: LoginStrategyType | str) -> LoginResponse:
-        last_exc: Exception | None = None
+    def launch_kwargs(options: LoginOptions, mode: LoginStrategyType | str) -> Dict[str, Any]:
         if mode == LoginStrategyType.AUTH:
             headless = True
             # 激进优化：禁用几乎所有非必要功能，最大化性能
@@ -134,79 +171,181 @@ class BasePlaywrightStrategy(AuthCheckMinIx):
         else:
             headless = False
             optimized_browser_args = options.browser_args
+        kwargs = dict(
+            headless=headless,
+            args=optimized_browser_args,
+            executable_path=options.executable_path,
+            channel=options.channel,
+            slow_mo=0,  # 禁用慢动作
+            # 浏览器启动超时：按观测到的启动耗时自适应，样本不足时用 PW_LAUNCH_TIMEOUT_MS
+            timeout=budget_ms(adaptive_timeouts.timeout_ms(ANY_PLATFORM, "launch", settings.PW_LAUNCH_TIMEOUT_MS)
+                              if options.adaptive_timeouts else settings.PW_LAUNCH_TIMEOUT_MS),
+        )
+        # 出口由 context 级代理决定，浏览器本身不能再强制直连
+        if proxy_pool.active(options):
+            proxy_pool.launch_kwargs(kwargs)
+        return kwargs
+
+    @staticmethod
+    async def new_context(browser: Browser, account_file: str, mode: LoginStrategyType | str,
+                          storage_state: Dict[str, Any] | None = None,
+                          proxy: Dict[str, str] | None = None) -> BrowserContext:
+        # proxy 为 context 级出口（见 proxy_pool.py），同一浏览器上的 context 可走不同代理
+        if mode == LoginStrategyType.AUTH:
+            # 文件可能是精简/压缩格式，统一经 load_storage_state 解析后再交给 Playwright
+            return await browser.new_context(
+                storage_state=storage_state if storage_state is not None else load_storage_state(account_file),
+                accept_downloads=False,
+                java_script_enabled=False,  # 禁用JavaScript，仅用于cookie验证
+                proxy=proxy,
+            )
+        return await browser.new_context(proxy=proxy)
+
+    @staticmethod
+    async def _close_quietly(target: Browser | BrowserContext) -> None:
+        try:
+            await target.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    async def _launch(p: Playwright, launch_kwargs: Dict[str, Any], options: LoginOptions) -> Browser:
+        from playwright.async_api import TimeoutError as PWTimeout
+
+        start = time.perf_counter()
+        try:
+            browser = await p.chromium.launch(**launch_kwargs)
+        except PWTimeout:
+            if options.adaptive_timeouts:
+                adaptive_timeouts.observe_timeout(ANY_PLATFORM, "launch")
+            raise
+        if options.adaptive_timeouts:
+            adaptive_timeouts.observe(ANY_PLATFORM, "launch", (time.perf_counter() - start) * 1000)
+        return browser
 
-        async with async_playwright() as p:
+    async def execute(self, account_file: str, options: LoginOptions, mode: LoginStrategyType | str,
+                      storage_state: Dict[str, Any] | None = None) -> LoginResponse:
+        """
+        storage_state 为已加载的 state dict（来自 SessionStore），缺省时按 account_file 路径读取。
+        失败按 classify_error 归类：只重试瞬时故障（超时、网络、浏览器崩溃），退避为带抖动的指数退避，
+        且不超过 retry_deadline_ms；每次尝试记录在 extra["attempts"]。
+        配置了代理池时每个 context 按账号亲和分配出口，代理出错后重试换到下一个代理。
+        """
+        # 延迟导入：只走 HTTP 校验 / 缓存 / 预检的调用方不需要加载 playwright
+        from playwright.async_api import async_playwright, TimeoutError as PWTimeout
+
+        launch_kwargs = self.launch_kwargs(options, mode)
+        # 浏览器池已启动则复用常驻浏览器，否则沿用每次调用临时拉起驱动 + 浏览器
+        pooled = browser_pool.started
+        interactive = mode != LoginStrategyType.AUTH
+        deadline = time.monotonic() + options.retry_deadline_ms / 1000.0
+        attempts: List[Dict[str, Any]] = []
+        last_exc: Exception | None = None
+        error: ErrorClass | None = None
+        use_proxy = proxy_pool.active(options)
+        tried: List[Proxy] = []
+
+        async with AsyncExitStack() as driver_stack:
+            p: Playwright | None = None
             # 优化：减少重试次数，认证模式只尝试1次
             retries = 1 if mode == LoginStrategyType.AUTH else options.retries
             for attempt in range(retries):
-                browser: Browser | None = None
-                context: BrowserContext | None = None
                 page: Page | None = None
+                proxy = proxy_pool.pick(self.name, account_file, exclude=tried) if use_proxy else None
                 trace_name = f"{self.name}_{mode}_attempt{attempt}"
+                phase = PHASE_LAUNCH
+                started = time.perf_counter()
+
+                # 退出时按倒序关闭：先 context（含 trace），再归还/关闭浏览器
+                async with AsyncExitStack() as stack:
+                    try:
+                        if pooled:
+                            with span("acquire"):
+                                browser = await stack.enter_async_context(browser_pool.browser(
+                                    mode, launch_kwargs, learn=options.adaptive_timeouts))
+                        else:
+                            if p is None:
+                                with span("driver"):
+                                    p = await driver_stack.enter_async_context(async_playwright())
+                            with span("launch"):
+                                browser = await self._launch(p, launch_kwargs, options)
+                            stack.push_async_callback(self._close_quietly, browser)
+
+                        phase = PHASE_CONTEXT
+                        with span("new_context"):
+                            context = await self.new_context(browser, account_file, mode, storage_state,
+                                                             proxy=proxy.playwright if proxy else None)
+                        stack.push_async_callback(self._close_quietly, context)
+
+                        phase = PHASE_RUN
+                        # 按平台观测到的耗时自适应（样本不足时 auth 用 AUTH_NAV_TIMEOUT_MS，登录用 nav_timeout_ms）
+                        if mode == LoginStrategyType.AUTH:
+                            nav_timeout = self.timeout_ms(options, "auth.nav", settings.AUTH_NAV_TIMEOUT_MS)
+                        else:
+                            nav_timeout = self.timeout_ms(options, "nav", options.nav_timeout_ms)
+                        context.set_default_navigation_timeout(nav_timeout)
+                        context.set_default_timeout(nav_timeout)
+                        context = await self.set_init_script(context)
+                        resources = await self.apply_resource_policy(context, options, mode)
+
+                        # 优化：认证模式下禁用trace和截图以提高性能
+                        if mode != LoginStrategyType.AUTH and await self._trace_start(context, options):
+                            # 后压入先执行：关闭 context 前先停止并保存 trace
+                            stack.push_async_callback(self._trace_stop, context, options, trace_name)
+
+                        page = await context.new_page()
+                        res = await self.run(page, account_file, options, mode)
+                        if proxy is not None:
+                            # 拿到了结果说明代理可用；导航未提交的超时分不清是代理还是站点，不计入
+                            proxy_pool.record(proxy, None if res.reason == LoginReasonType.NAVIGATION_TIMEOUT else False)
+                            res.extra["proxy"] = proxy.server
+                        if resources is not None:
+                            res.extra["resources"] = resources.data
+                        if attempts:
+                            res.extra["attempts"] = attempts
+                        return res
+
+                    except Exception as e:
+                        error = classify_error(e, phase, interactive=interactive)
+                        # ✅ 用户主动关闭窗口/中止：不重试，直接退出
+                        if error.user_abort:
+                            return LoginResponse(
+                                False,
+                                LoginReasonType.USER_ABORTED,
+                                path=account_file,
+                                extra={"err": str(e), "mode": mode, "attempt": attempt},
+                            )
+                        last_exc = e
+                        if proxy is not None and (phase == PHASE_RUN or is_proxy_error(e)):
+                            # 只有代理本身的错误计入代理健康；重试时仍换下一个代理
+                            proxy_pool.record(proxy, True if is_proxy_error(e) else None)
+                            tried.append(proxy)
+                        attempts.append({
+                            "attempt": attempt,
+                            "phase": phase,
+                            "reason": error.reason,
+                            "transient": error.transient,
+                            "err": (str(e).splitlines() or [type(e).__name__])[0],
+                            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+                        })
+                        if proxy is not None:
+                            attempts[-1]["proxy"] = proxy.server
+                        suffix = "timeout" if isinstance(e, PWTimeout) else "error"
+                        await self._screenshot(page, options, f"{trace_name}_{suffix}", reason=error.reason)
+
+                # context/浏览器已释放，退避期间不占用资源
+                if not error.transient or attempt + 1 >= retries:
+                    break
+                delay_ms = backoff_ms(attempt, options.retry_backoff_ms, options.retry_backoff_max_ms)
+                left = remaining_ms()  # 调用方传入的截止时间（LoginService deadline）
+                if time.monotonic() + delay_ms / 1000.0 >= deadline or (left is not None and delay_ms >= left):
+                    attempts[-1]["stopped"] = "deadline"
+                    break
+                attempts[-1]["backoff_ms"] = round(delay_ms, 3)
+                await asyncio.sleep(delay_ms / 1000.0)
 
-                try:
-                    browser = await p.chromium.launch(
-                        headless=headless,
-                        args=optimized_browser_args,
-                        executable_path=options.executable_path,
-                        channel=options.channel,
-                        slow_mo=0,  # 禁用慢动作
-                        timeout=3000,  # 更短的浏览器启动超时
-                    )
-                    if mode == LoginStrategyType.AUTH:
-                        context = await browser.new_context(
-                            storage_state=account_file,
-                            accept_downloads=False,
-                            java_script_enabled=False,  # 禁用JavaScript，仅用于cookie验证
-                        )
-                    elif mode == LoginStrategyType.LOGIN:
-                        context = await browser.new_context()
-
-                    # 激进优化：更短的超时时间
-                    nav_timeout = 3000 if mode == LoginStrategyType.AUTH else options.nav_timeout_ms
-                    context.set_default_navigation_timeout(nav_timeout)
-                    context.set_default_timeout(nav_timeout)
-                    context = await self.set_init_script(context)
-
-                    # 优化：认证模式下禁用trace和截图以提高性能
-                    if mode != LoginStrategyType.AUTH:
-                        await self._trace_start(context, options)
-
-                    page = await context.new_page()
-                    return await self.run(page, account_file, options, mode)
-
-                except PWTimeout as e:
-                    last_exc = e
-                    await self._screenshot(page, options, f"{trace_name}_timeout")
-                    await asyncio.sleep(options.retry_backoff_ms / 1000.0)
-
-                except Exception as e:
-                    # ✅ 用户主动关闭窗口/中止：不重试，直接退出
-                    if self.is_user_abort_error(e):
-                        return LoginResponse(
-                            False,
-                            "user_aborted",
-                            path=account_file,
-                            extra={"err": str(e), "mode": mode, "attempt": attempt},
-                        )
-                    last_exc = e
-                    await self._screenshot(page, options, f"{trace_name}_error")
-                    await asyncio.sleep(options.retry_backoff_ms / 1000.0)
-
-                finally:
-                    if context is not None:
-                        await self._trace_stop(context, options, trace_name)
-                        try:
-                            await context.close()
-                        except Exception:
-                            pass
-                    if browser is not None:
-                        try:
-                            await browser.close()
-                        except Exception:
-                            pass
-
-        # 重试耗尽，返回失败（或抛异常都行，你选）
-        return LoginResponse(False, "retry_exhausted",
+        # 返回最后一次失败的归类（超时 / 启动失败 / 存储不可读 ...），历次尝试见 extra["attempts"]
+        return LoginResponse(False, error.reason if error is not None else LoginReasonType.RETRY_EXHAUSTED,
                              path=account_file,
-                             extra={"err": str(last_exc) if last_exc else None})
+                             extra={"err": str(last_exc) if last_exc else None, "attempts": attempts,
+                                    "transient": bool(error and error.transient)})
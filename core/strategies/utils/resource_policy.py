@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 下午3:10
+# @Author  : fzf
+# @FileName: resource_policy.py
+# @Software: PyCharm
+from __future__ import annotations
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Tuple
+from urllib.parse import urlsplit
+
+from ...config import settings
+from ...enums import LoginStrategyType
+from ...utils.cookies import domain_match
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Request, Response, Route
+
+
+@dataclass(slots=True)
+class ResourcePolicy:
+    """
+    声明式资源策略，判定顺序：
+    deny_domains → deny_types → allow_types → allow_domains(仅限 domain_types) → default_allow
+    """
+    allow_types: FrozenSet[str] = frozenset()
+    deny_types: FrozenSet[str] = frozenset()
+    allow_domains: Tuple[str, ...] = ()
+    deny_domains: Tuple[str, ...] = ()
+    domain_types: FrozenSet[str] = frozenset({"xhr", "fetch"})
+    default_allow: bool = False
+
+    def allows(self, resource_type: str, url: str) -> bool:
+        host = urlsplit(url).hostname or ""
+        if any(domain_match(host, d) for d in self.deny_domains):
+            return False
+        if resource_type in self.deny_types:
+            return False
+        if resource_type in self.allow_types:
+            return True
+        if resource_type in self.domain_types and any(domain_match(host, d) for d in self.allow_domains):
+            return True
+        return self.default_allow
+
+    @classmethod
+    def for_platform(cls, platform: str, mode: str) -> ResourcePolicy:
+        """平台默认策略：auth 只放行主文档与平台域名下的接口；login 页面需完整渲染，仅拦截字体/媒体与统计。"""
+        deny_domains = tuple(settings.RESOURCE_DENY_DOMAINS)
+        if mode == LoginStrategyType.AUTH:
+            return cls(allow_types=frozenset({"document"}),
+                       allow_domains=tuple(settings.platform(platform, "AUTH_DOMAINS", ())),
+                       deny_domains=deny_domains)
+        return cls(deny_types=frozenset({"font", "media"}), deny_domains=deny_domains, default_allow=True)
+
+
+@dataclass(slots=True)
+class ResourceStats:
+    """
+    拦截统计。被拦截的请求不会下载，其体积无从得知，
+    因此记录放行请求的字节数，对比关闭策略时的数值即为节省的流量。
+    """
+    allowed: int = 0
+    blocked: int = 0
+    allowed_bytes: int = 0
+    blocked_by_type: Counter = field(default_factory=Counter)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return {"allowed": self.allowed, "blocked": self.blocked, "allowed_bytes": self.allowed_bytes,
+                "blocked_by_type": dict(self.blocked_by_type)}
+
+
+async def apply_resource_policy(context: BrowserContext, policy: ResourcePolicy) -> ResourceStats:
+    """在 context 上挂载路由，按策略放行/拦截，并统计结果。"""
+    stats = ResourceStats()
+
+    async def _route(route: Route, request: Request) -> None:
+        if policy.allows(request.resource_type, request.url):
+            stats.allowed += 1
+            await route.continue_()
+        else:
+            stats.blocked += 1
+            stats.blocked_by_type[request.resource_type] += 1
+            await route.abort("blockedbyclient")
+
+    def _on_response(response: Response) -> None:
+        try:
+            stats.allowed_bytes += int(response.headers.get("content-length") or 0)
+        except ValueError:
+            pass
+
+    await context.route("**/*", _route)
+    context.on("response", _on_response)
+    return stats
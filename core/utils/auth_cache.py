@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 下午1:40
+# @Author  : fzf
+# @FileName: auth_cache.py
+# @Software: PyCharm
+from __future__ import annotations
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+from ..config import settings
+from ..enums import LoginReasonType
+from ..schemas import LoginResponse
+from ..store.base import Fingerprint
+
+
+@dataclass(slots=True)
+class _Entry:
+    fingerprint: Fingerprint
+    response: LoginResponse
+    expires_at: float
+
+
+class AuthCache:
+    """
+    进程内 auth 结果缓存：
+    - 按 (platform, account_file) 定位，命中还要求存储指纹一致（文件后端为 mtime/size/内容哈希）
+    - COOKIE_VALID / COOKIE_INVALID 各自 TTL，其余结果（超时、异常）不缓存
+    - 超过 maxsize 按 LRU 淘汰
+    """
+
+    def __init__(self, maxsize: int | None = None, valid_ttl_s: float | None = None,
+                 invalid_ttl_s: float | None = None) -> None:
+        self.maxsize = maxsize or settings.AUTH_CACHE_SIZE
+        self.valid_ttl_s = settings.AUTH_CACHE_VALID_TTL_S if valid_ttl_s is None else valid_ttl_s
+        self.invalid_ttl_s = settings.AUTH_CACHE_INVALID_TTL_S if invalid_ttl_s is None else invalid_ttl_s
+        self._data: OrderedDict[Tuple[str, str], _Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(platform: str, account_file: str) -> Tuple[str, str]:
+        return str(platform), os.path.abspath(account_file)
+
+    def _ttl(self, reason: str | None) -> float:
+        if reason == LoginReasonType.COOKIE_VALID:
+            return self.valid_ttl_s
+        if reason == LoginReasonType.COOKIE_INVALID:
+            return self.invalid_ttl_s
+        return 0
+
+    def get(self, platform: str, account_file: str, fingerprint: Fingerprint | None) -> LoginResponse | None:
+        key = self._key(platform, account_file)
+        entry = self._data.get(key)
+        if entry is None or fingerprint is None:
+            self.misses += 1
+            return None
+        if entry.fingerprint != fingerprint or entry.expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        res = entry.response
+        return LoginResponse(res.ok, res.reason, path=res.path, extra={**res.extra, "cached": True})
+
+    def put(self, platform: str, account_file: str, fingerprint: Fingerprint | None, response: LoginResponse) -> None:
+        ttl = self._ttl(response.reason)
+        if fingerprint is None or ttl <= 0:
+            return
+        key = self._key(platform, account_file)
+        # 只存精简副本，不持有 storage_state 等大对象
+        snapshot = LoginResponse(response.ok, response.reason, path=response.path, extra=dict(response.extra))
+        self._data[key] = _Entry(fingerprint, snapshot, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, platform: str, account_file: str) -> None:
+        self._data.pop(self._key(platform, account_file), None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+
+auth_cache = AuthCache()
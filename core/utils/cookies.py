@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 上午11:20
+# @Author  : fzf
+# @FileName: cookies.py
+# @Software: PyCharm
+from __future__ import annotations
+import gzip
+import json
+import time
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from typing import Any, Dict, Iterable, List
+from urllib.parse import urlsplit
+
+
+# 精简格式：外层带 format 标记，cookie 中等于缺省值的字段省略；没有标记的按 Playwright 原始格式读取
+COMPACT_FORMAT = "compact/1"
+_GZIP_MAGIC = b"\x1f\x8b"
+_COOKIE_DEFAULTS: Dict[str, Any] = {"path": "/", "expires": -1, "httpOnly": False, "secure": False, "sameSite": "Lax"}
+
+
+def load_storage_state(account_file: str) -> Dict[str, Any]:
+    """读取 storage_state 文件：兼容 Playwright 原始 JSON、精简格式及其 gzip 压缩版本。"""
+    with open(account_file, "rb") as f:
+        return loads_storage_state(f.read())
+
+
+def loads_storage_state(raw: bytes) -> Dict[str, Any]:
+    if raw[:2] == _GZIP_MAGIC:
+        raw = gzip.decompress(raw)
+    return expand_storage_state(json.loads(raw.decode("utf-8")))
+
+
+def dumps_storage_state(state: Dict[str, Any], *, compact: bool = True, compress: bool = False) -> bytes:
+    """序列化 storage_state；compact=False 输出 Playwright 原始格式，可直接交给 new_context(storage_state=path)。"""
+    if compact:
+        raw = json.dumps(compact_storage_state(state), ensure_ascii=False, separators=(",", ":"))
+    else:
+        raw = json.dumps(state, ensure_ascii=False)
+    data = raw.encode("utf-8")
+    # mtime=0：相同内容压缩结果一致，文件指纹不因写入时间变化
+    return gzip.compress(data, mtime=0) if compress else data
+
+
+def compact_storage_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    if state.get("format") == COMPACT_FORMAT:
+        return state
+    cookies = [{k: v for k, v in c.items() if _COOKIE_DEFAULTS.get(k, ...) != v} for c in state.get("cookies") or []]
+    origins = [o for o in state.get("origins") or [] if o.get("localStorage")]
+    return {"format": COMPACT_FORMAT, "cookies": cookies, "origins": origins}
+
+
+def expand_storage_state(data: Dict[str, Any]) -> Dict[str, Any]:
+    """精简格式还原为 Playwright storage_state；原始格式原样返回。"""
+    if data.get("format") != COMPACT_FORMAT:
+        return data
+    return {"cookies": [{**_COOKIE_DEFAULTS, **c} for c in data.get("cookies") or []],
+            "origins": list(data.get("origins") or [])}
+
+
+def prune_storage_state(state: Dict[str, Any], domains: Iterable[str], now: float | None = None) -> Dict[str, Any]:
+    """
+    只保留与平台相关的部分：
+    - cookie：会发往任一平台域名（或属于其子域）的，丢弃已过期的，同 (name, domain, path) 只留最后一份
+    - origin：主机属于平台域名且 localStorage 非空的
+    domains 为空时只做去重与过期清理。
+    """
+    now = time.time() if now is None else now
+    domains = [d.lstrip(".").lower() for d in domains if d]
+
+    def relevant(host: str) -> bool:
+        host = host.lstrip(".").lower()
+        return not domains or any(domain_match(d, host) or domain_match(host, d) for d in domains)
+
+    cookies: Dict[tuple, Dict[str, Any]] = {}
+    for c in state.get("cookies") or []:
+        expires = c.get("expires", -1)
+        if expires is not None and 0 <= expires < now:
+            continue
+        if not relevant(c.get("domain", "")):
+            continue
+        # ".a.com"（域 cookie）与 "a.com"（仅主机）在 Playwright 中是两个 cookie，按原样区分
+        key = (c.get("name"), c.get("domain", "").lower(), c.get("path") or "/")
+        cookies.pop(key, None)
+        cookies[key] = c
+    origins = [o for o in state.get("origins") or []
+               if o.get("localStorage") and relevant(urlsplit(o.get("origin", "")).hostname or "")]
+    return {"cookies": list(cookies.values()), "origins": origins}
+
+
+def domain_match(host: str, domain: str) -> bool:
+    domain = domain.lstrip(".").lower()
+    host = host.lower()
+    return host == domain or host.endswith("." + domain)
+
+
+def cookie_header(cookies: Iterable[Dict[str, Any]], url: str, now: float | None = None) -> str:
+    """按 domain/path/secure/expires 挑出该 url 应携带的 cookie，拼成 Cookie 头。"""
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    path = parts.path or "/"
+    secure = parts.scheme == "https"
+    now = time.time() if now is None else now
+
+    pairs = []
+    for c in cookies:
+        if not domain_match(host, c.get("domain", "")):
+            continue
+        if not path.startswith(c.get("path") or "/"):
+            continue
+        if c.get("secure") and not secure:
+            continue
+        expires = c.get("expires", -1)
+        if expires is not None and 0 <= expires < now:
+            continue
+        pairs.append(f"{c['name']}={c['value']}")
+    return "; ".join(pairs)
+
+
+def merge_set_cookie(cookies: List[Dict[str, Any]], headers: Iterable[str], url: str) -> None:
+    """把响应里的 Set-Cookie 合并进 cookie 列表（同名同域覆盖），用于跟随跳转。"""
+    host = urlsplit(url).hostname or ""
+    for raw in headers:
+        jar = SimpleCookie()
+        try:
+            jar.load(raw)
+        except Exception:
+            continue
+        for name, morsel in jar.items():
+            domain = morsel["domain"] or host
+            path = morsel["path"] or "/"
+            cookies[:] = [c for c in cookies
+                          if not (c.get("name") == name and c.get("domain", "").lstrip(".") == domain.lstrip(".")
+                                  and (c.get("path") or "/") == path)]
+            cookies.append({"name": name, "value": morsel.value, "domain": domain, "path": path,
+                            "expires": -1, "secure": bool(morsel["secure"])})
+
+
+@dataclass(slots=True)
+class CookieExpiry:
+    earliest: float | None = None  # 关键 cookie 中最早的过期时间（epoch 秒），全为会话 cookie 时为 None
+    expired: List[str] = field(default_factory=list)  # 已过期的关键 cookie
+    missing: List[str] = field(default_factory=list)  # 文件中不存在的关键 cookie
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return {"earliest_expiry": self.earliest, "expired": list(self.expired), "missing": list(self.missing)}
+
+
+def critical_cookie_expiry(state: Dict[str, Any], names: Iterable[str], now: float | None = None) -> CookieExpiry:
+    """
+    统计关键 cookie 的过期情况：
+    - 同名 cookie 出现在多个域时取最晚的过期时间（任一份有效即视为有效）
+    - expires 为 -1 的会话 cookie 视为离线无法判断，不计入 earliest
+    """
+    now = time.time() if now is None else now
+    latest: Dict[str, float] = {}
+    wanted = set(names)
+    for c in state.get("cookies") or []:
+        name = c.get("name")
+        if name not in wanted:
+            continue
+        expires = c.get("expires", -1)
+        expires = float("inf") if expires is None or expires < 0 else float(expires)
+        latest[name] = max(latest.get(name, expires), expires)
+
+    result = CookieExpiry()
+    for name in names:
+        if name not in latest:
+            result.missing.append(name)
+        elif latest[name] <= now:
+            result.expired.append(name)
+    finite = [v for v in latest.values() if v != float("inf")]
+    result.earliest = min(finite) if finite else None
+    return result
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/20 上午10:10
+# @Author  : fzf
+# @FileName: deadline.py
+# @Software: PyCharm
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from contextvars import Context, ContextVar
+from typing import Iterator
+
+# 当前调用的绝对截止时间（epoch 秒），随 contextvar 传到同一调用链上的所有协程 / 子任务
+_deadline: ContextVar[float | None] = ContextVar("login_deadline", default=None)
+
+
+def current_deadline() -> float | None:
+    return _deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: float | None) -> Iterator[float | None]:
+    """在作用域内生效的截止时间；已有更早的截止时间时保留更早的那个。"""
+    outer = _deadline.get()
+    if deadline is None or (outer is not None and outer <= deadline):
+        yield outer
+        return
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def joined_deadline(a: float | None, b: float | None) -> float | None:
+    """多个调用方共享一次执行时的截止时间：取最晚的；任一方不限时则不限时。"""
+    return None if a is None or b is None else max(a, b)
+
+
+def set_context_deadline(ctx: Context, deadline: float | None) -> None:
+    """修改另一个（当前未在执行的）上下文中的截止时间，如共享任务有新调用方加入时放宽。"""
+    ctx.run(_deadline.set, deadline)
+
+
+def remaining_ms() -> float | None:
+    """距截止时间的剩余毫秒数（可能为负），没有截止时间返回 None。"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return (deadline - time.time()) * 1000
+
+
+def budget_ms(timeout_ms: float) -> int:
+    """各阶段超时取 min(自身超时, 剩余预算)，至少 1ms（到点后由外层的截止控制负责取消）。"""
+    left = remaining_ms()
+    if left is None:
+        return int(timeout_ms)
+    return max(1, int(min(timeout_ms, left)))
@@ -4,41 +4,134 @@
 # @FileName: logger.py
 # @Software: PyCharm
 from __future__ import annotations
+import atexit
+import json
 import logging
+import queue
+import sys
+import threading
 from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Dict
-from rich.logging import RichHandler
 
 from ..config import settings
 
 default_level = settings.LOGGER_LEVEL
+ROOT_LOGGER = "login"
 
+_listener: QueueListener | None = None
+_setup_lock = threading.Lock()
 
-def get_logger(name=None, level=default_level):
-    return _get_rich_logger(name, level)
 
+class _DropQueueHandler(QueueHandler):
+    """事件循环侧只做入队：不在调用线程格式化，队列满时丢弃并计数，不阻塞也不抛错。"""
 
-def _get_standard_logger(name, level=default_level):
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
-    FORMAT = "[%(asctime)s][%(levelname)s][%(filename)s][line %(lineno)s][%(funcName)5s()]: %(message)s"
-    formatter = logging.Formatter(FORMAT)
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    return logger
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 同进程内的 queue.Queue 不需要序列化，格式化（含 log_kv 的延迟拼接）留给后台线程
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DropQueueHandler.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """一行一个 JSON：时间、级别、logger、消息，以及 log_kv 传入的字段（LogCtx、timings 等）平铺在顶层。"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        msg = record.msg
+        payload: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": msg.msg if isinstance(msg, KVMessage) else record.getMessage(),
+        }
+        kv = getattr(record, "kv", None)
+        if kv:
+            payload.update(kv)
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def _output_handler(fmt: str) -> logging.Handler:
+    # 统一写 stderr：stdout 留给 CLI 结果与 MCP stdio 传输
+    if fmt == "json":
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JsonFormatter())
+        return handler
+    if fmt == "plain":
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter(
+            "[%(asctime)s][%(levelname)s][%(filename)s][line %(lineno)s][%(funcName)5s()]: %(message)s"))
+        return handler
+    from rich.console import Console  # rich 较重，首次需要输出时才导入
+    from rich.logging import RichHandler
+
+    handler = RichHandler(console=Console(stderr=True))
+    handler.setFormatter(logging.Formatter("[%(filename)s][line %(lineno)s][%(funcName)5s()]: %(message)s"))
+    return handler
+
+
+class _LazyOutput(logging.Handler):
+    """真正的输出 handler 在后台线程收到第一条日志时才创建：import 阶段不加载 rich。"""
+
+    def __init__(self, fmt: str) -> None:
+        super().__init__()
+        self.fmt = fmt
+        self._handler: logging.Handler | None = None
 
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._handler is None:
+            self._handler = _output_handler(self.fmt)
+        self._handler.handle(record)
 
-def _get_rich_logger(name, level=default_level):
-    logger = logging.getLogger('login.' + name)
+
+def setup_logging(fmt: str | None = None, level: str | int = default_level) -> logging.Logger:
+    """
+    只安装一次：login 根 logger 挂 QueueHandler，后台 QueueListener 线程负责格式化与输出；
+    login.* 子 logger 不挂 handler，统一冒泡到这里，propagate=False 避免再被 root 重复输出。
+    再次调用会替换输出格式（如切到 json）。
+    """
+    global _listener
+    with _setup_lock:
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level)
+        root.propagate = False
+        if _listener is not None:
+            _listener.stop()
+        for h in [h for h in root.handlers if getattr(h, "_login_handler", False)]:
+            root.removeHandler(h)
+        log_queue: queue.Queue = queue.Queue(maxsize=settings.LOGGER_QUEUE_SIZE)
+        handler = _DropQueueHandler(log_queue)
+        handler._login_handler = True
+        root.addHandler(handler)
+        _listener = QueueListener(log_queue, _LazyOutput(fmt or settings.LOGGER_FORMAT), respect_handler_level=True)
+        _listener.start()
+        return root
+
+
+def shutdown_logging() -> None:
+    """把队列中剩余的日志输出完并停止后台线程（进程退出时自动调用）。"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def get_logger(name=None, level=default_level):
+    if _listener is None:
+        setup_logging()
+    logger = logging.getLogger(f'{ROOT_LOGGER}.{name}' if name else ROOT_LOGGER)
     logger.setLevel(level)
-    FORMAT = "[%(filename)s][line %(lineno)s][%(funcName)5s()]: %(message)s"
-    formatter = logging.Formatter(FORMAT)
-    console_handler = RichHandler()
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
     return logger
 
 
@@ -52,10 +145,25 @@ class LogCtx:
         return {"platform": self.platform, "account_file": self.account_file}
 
 
+class KVMessage:
+    """message + key=value，直到真正输出（后台线程）时才拼接字符串。"""
+
+    __slots__ = ("msg", "kv")
+
+    def __init__(self, msg: str, kv: Dict[str, Any]) -> None:
+        self.msg = msg
+        self.kv = kv
+
+    def __str__(self) -> str:
+        suffix = " ".join([f"{k}={repr(v)}" for k, v in self.kv.items()])
+        return f"{self.msg} {suffix}".rstrip()
+
+
 def log_kv(logger: logging.Logger, level: int, msg: str, **kv: Any) -> None:
-    # 简单结构化：message + key=value
-    suffix = " ".join([f"{k}={repr(v)}" for k, v in kv.items()])
-    logger.log(level, f"{msg} {suffix}".rstrip())
+    # 级别未开启时只有一次 isEnabledFor 判断；字段原样随 record 传递，json 格式下平铺输出
+    if not logger.isEnabledFor(level):
+        return
+    logger.log(level, KVMessage(msg, kv), extra={"kv": kv}, stacklevel=2)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 下午4:05
+# @Author  : fzf
+# @FileName: metrics.py
+# @Software: PyCharm
+from __future__ import annotations
+import bisect
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Tuple
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Spans:
+    """一次调用内各阶段耗时（毫秒），同名阶段多次出现时累加（如重试）。"""
+
+    __slots__ = ("phases", "_start")
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    def add(self, name: str, ms: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + ms
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    @property
+    def data(self) -> Dict[str, float]:
+        return {**{k: round(v, 3) for k, v in self.phases.items()}, "total": round(self.total_ms, 3)}
+
+
+_current: ContextVar[Spans | None] = ContextVar("login_spans", default=None)
+
+
+@contextmanager
+def collect_spans() -> Iterator[Spans]:
+    """开启一次调用的计时收集，期间所有 span() 记到同一个 Spans 上。"""
+    spans = Spans()
+    token = _current.set(spans)
+    try:
+        yield spans
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """记录一个阶段的耗时；不在 collect_spans() 内时什么也不做。"""
+    spans = _current.get()
+    if spans is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.add(name, (time.perf_counter() - start) * 1000)
+
+
+def add_span(name: str, ms: float) -> None:
+    """记一个已知耗时的阶段（如从并行流程中拆出的子阶段）；不在 collect_spans() 内时什么也不做。"""
+    spans = _current.get()
+    if spans is not None:
+        spans.add(name, ms)
+
+
+class MetricsSink:
+    """指标出口：每次调用结束时收到平台、模式、结果与各阶段耗时。默认什么也不做。"""
+
+    def observe(self, platform: str, mode: str, reason: str | None, spans: Spans) -> None:
+        return None
+
+    def render(self) -> str:
+        return ""
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        if idx < len(self.counts):
+            self.counts[idx] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(**kv: str) -> str:
+    inner = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in kv.items())
+    return "{" + inner + "}"
+
+
+class PrometheusSink(MetricsSink):
+    """
+    内存聚合，render() 输出 Prometheus 文本格式：
+    - login_phase_seconds{platform,mode,phase}  各阶段耗时直方图（phase="total" 为整次调用）
+    - login_requests_total{platform,mode,reason} 调用计数
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, prefix: str = "login") -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._histograms: Dict[Tuple[str, str, str], _Histogram] = {}
+        self._counters: Dict[Tuple[str, str, str], int] = defaultdict(int)
+
+    def observe(self, platform: str, mode: str, reason: str | None, spans: Spans) -> None:
+        self._counters[(str(platform), str(mode), str(reason))] += 1
+        for phase, ms in spans.data.items():
+            key = (str(platform), str(mode), phase)
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = _Histogram(self.buckets)
+            hist.observe(ms / 1000.0)
+
+    def render(self) -> str:
+        name = f"{self.prefix}_phase_seconds"
+        lines: List[str] = [f"# HELP {name} Duration of each login/auth phase.", f"# TYPE {name} histogram"]
+        for (platform, mode, phase), hist in sorted(self._histograms.items()):
+            cumulative = 0
+            for le, n in zip(hist.buckets, hist.counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(platform=platform, mode=mode, phase=phase, le=repr(le))} "
+                             f"{cumulative}")
+            labels = _labels(platform=platform, mode=mode, phase=phase)
+            lines.append(f"{name}_bucket{_labels(platform=platform, mode=mode, phase=phase, le='+Inf')} {hist.count}")
+            lines.append(f"{name}_sum{labels} {hist.sum}")
+            lines.append(f"{name}_count{labels} {hist.count}")
+
+        name = f"{self.prefix}_requests_total"
+        lines += [f"# HELP {name} Login/auth calls by result.", f"# TYPE {name} counter"]
+        for (platform, mode, reason), n in sorted(self._counters.items()):
+            lines.append(f"{name}{_labels(platform=platform, mode=mode, reason=reason)} {n}")
+        return "\n".join(lines) + "\n"
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return {
+            "requests": {"/".join(k): v for k, v in self._counters.items()},
+            "phases": {"/".join(k): {"count": h.count, "avg_ms": round(h.sum / h.count * 1000, 3) if h.count else 0}
+                       for k, h in self._histograms.items()},
+        }
+
+
+class MetricsRegistry:
+    """全局持有当前的 sink，可替换为自定义实现（如推送到 StatsD）。"""
+
+    def __init__(self, sink: MetricsSink | None = None) -> None:
+        self.sink = sink or PrometheusSink()
+
+    def observe(self, platform: str, mode: str, reason: str | None, spans: Spans) -> None:
+        try:
+            self.sink.observe(platform, mode, reason, spans)
+        except Exception:
+            # 指标出口出错不能影响业务结果
+            pass
+
+    def render(self) -> str:
+        return self.sink.render()
+
+
+metrics = MetricsRegistry()
+
+
+def set_metrics_sink(sink: MetricsSink) -> None:
+    metrics.sink = sink
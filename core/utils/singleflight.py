@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 下午5:30
+# @Author  : fzf
+# @FileName: singleflight.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+from contextvars import Context, copy_context
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from .deadline import current_deadline, joined_deadline, set_context_deadline
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class _Call:
+    task: asyncio.Future
+    context: Context
+    deadline: float | None
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    同 key 的并发调用合并为一次执行，所有调用方等待同一个结果。
+    单个调用方被取消不影响其他人；最后一个调用方也离开时才取消底层任务。
+    共享任务的截止时间取已加入调用方中最晚的（有人不限时则不限时），各阶段仍按剩余预算截短；
+    先到点的调用方只是离开等待，由自己的超时控制返回。
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _Call] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        deadline = current_deadline()
+        if call is None:
+            ctx = copy_context()
+            call = _Call(asyncio.get_running_loop().create_task(fn(), context=ctx), ctx, deadline)
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, k=key, c=call: self._forget(k, c))
+        else:
+            joined = joined_deadline(call.deadline, deadline)
+            if joined != call.deadline:
+                # 本协程在跑时共享任务必然处于挂起状态，可以直接改它上下文里的截止时间
+                call.deadline = joined
+                set_context_deadline(call.context, joined)
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+                # 等底层任务关掉 context / 浏览器后再把取消传出去，调用方返回时资源已释放
+                await asyncio.gather(call.task, return_exceptions=True)
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    @property
+    def inflight(self) -> int:
+        return len(self._calls)
+
+
+class KeyedLock:
+    """按 key 分配的互斥锁，无人持有/等待时自动回收，key 再多也不会堆积。"""
+
+    def __init__(self) -> None:
+        self._locks: Dict[Hashable, list[Any]] = {}  # key -> [Lock, 引用数]
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and self._locks.get(key) is entry:
+                del self._locks[key]
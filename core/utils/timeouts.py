@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/19 下午9:30
+# @Author  : fzf
+# @FileName: timeouts.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from ..config import settings
+from .deadline import budget_ms
+
+# 所有平台共用的指标（如浏览器启动）用这个平台名
+ANY_PLATFORM = "*"
+
+
+class LatencySketch:
+    """
+    对数分桶的分位数草图：桶宽按比例增长（gamma），分位误差约 (gamma - 1) / 2，内存只与数值跨度有关。
+    总数超过 max_count 时所有桶减半，使旧样本逐步淡出、分位跟随最近的延迟变化。
+    """
+
+    __slots__ = ("gamma", "max_count", "buckets", "count", "_log_gamma")
+
+    def __init__(self, gamma: float = 1.05, max_count: int = 2000) -> None:
+        self.gamma = gamma
+        self.max_count = max_count
+        self.buckets: Dict[int, float] = {}
+        self.count = 0.0
+        self._log_gamma = math.log(gamma)
+
+    def add(self, value_ms: float) -> None:
+        idx = math.ceil(math.log(max(value_ms, 1.0)) / self._log_gamma)
+        self.buckets[idx] = self.buckets.get(idx, 0.0) + 1
+        self.count += 1
+        if self.count > self.max_count:
+            self.buckets = {k: v / 2 for k, v in self.buckets.items() if v >= 1}
+            self.count = sum(self.buckets.values())
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0.0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen >= rank:
+                return self.gamma ** idx
+        return self.gamma ** max(self.buckets)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return {"gamma": self.gamma, "buckets": {str(k): v for k, v in self.buckets.items()}}
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any], max_count: int) -> LatencySketch:
+        sketch = cls(float(data.get("gamma", 1.05)), max_count)
+        sketch.buckets = {int(k): float(v) for k, v in (data.get("buckets") or {}).items()}
+        sketch.count = sum(sketch.buckets.values())
+        return sketch
+
+
+class _Series:
+    __slots__ = ("ewma", "samples", "sketch", "widen")
+
+    def __init__(self, sketch: LatencySketch, ewma: float | None = None, samples: int = 0) -> None:
+        self.ewma = ewma
+        self.samples = samples
+        self.sketch = sketch
+        self.widen = 1.0  # 近期超时带来的放宽系数，只在进程内生效，不落盘
+
+    def add(self, value_ms: float, alpha: float) -> None:
+        self.ewma = value_ms if self.ewma is None else alpha * value_ms + (1 - alpha) * self.ewma
+        self.samples += 1
+        self.sketch.add(value_ms)
+
+
+class AdaptiveTimeouts:
+    """
+    按 (平台, 阶段) 学习耗时，给出超时：max(分位数, EWMA) × multiplier，并限制在 [floor, ceiling]。
+    - 样本不足 min_samples 时返回调用方给的默认值（原固定超时）
+    - 只从成功的耗时学习；超时只把放宽系数乘 WIDEN_STEP，最多 MAX_WIDEN 倍，成功后逐步回落。
+      站点故障时超时有上界，不会被一串超时越推越长
+    - 状态按 TIMEOUT_SAVE_INTERVAL_S 节流、在线程中落盘到 TIMEOUT_STATE_FILE（构造时解析为绝对路径），重启后继续使用
+    阶段名：auth.nav / auth.detect / nav（登录页导航）/ http / launch
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        path = settings.TIMEOUT_STATE_FILE if path is None else path
+        # 固定为绝对路径：之后切换工作目录也写回同一个文件
+        self.path = os.path.abspath(path) if path else ""
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._loaded = False
+        self._dirty = False
+        self._saving = False
+        self._last_save = time.monotonic()
+        # 后台写与 stop() 的写可能同时在不同线程中：按快照序号只让新的覆盖旧的
+        self._write_lock = threading.Lock()
+        self._snapshots = 0
+        self._written = 0
+
+    def _get(self, platform: str, kind: str) -> _Series:
+        if not self._loaded:
+            self.load()
+        key = (str(platform), kind)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series(LatencySketch(max_count=settings.TIMEOUT_WINDOW))
+        return series
+
+    def observe(self, platform: str, kind: str, value_ms: float) -> None:
+        """记一次成功的耗时。"""
+        series = self._get(platform, kind)
+        series.add(value_ms, settings.TIMEOUT_EWMA_ALPHA)
+        series.widen = max(1.0, series.widen / settings.TIMEOUT_WIDEN_STEP)
+        self._dirty = True
+        if self.path and not self._saving and time.monotonic() - self._last_save >= settings.TIMEOUT_SAVE_INTERVAL_S:
+            self._save_in_background()
+
+    def observe_timeout(self, platform: str, kind: str) -> None:
+        """记一次超时：不进样本，只按步长放宽（有上限）。"""
+        series = self._get(platform, kind)
+        series.widen = min(series.widen * settings.TIMEOUT_WIDEN_STEP, settings.TIMEOUT_MAX_WIDEN)
+
+    def timeout_ms(self, platform: str, kind: str, default: int) -> int:
+        series = self._get(platform, kind)
+        if series.samples < settings.TIMEOUT_MIN_SAMPLES:
+            # 样本不足时以默认值为基准：一直慢于默认值的平台学不到成功样本，只能靠超时放宽
+            if series.widen == 1.0:
+                return default
+            return int(min(default * series.widen, max(default, settings.TIMEOUT_CEILING_MS)))
+        base = max(series.sketch.quantile(settings.TIMEOUT_QUANTILE) or 0.0, series.ewma or 0.0)
+        return int(min(max(base * settings.TIMEOUT_MULTIPLIER * series.widen, settings.TIMEOUT_FLOOR_MS),
+                       settings.TIMEOUT_CEILING_MS))
+
+    # ---- 持久化 ----
+    def load(self) -> None:
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            # 状态文件损坏不影响业务，从头学习
+            return
+        for key, item in (raw.get("series") or {}).items():
+            platform, _, kind = key.partition("|")
+            sketch = LatencySketch.from_data(item.get("sketch") or {}, settings.TIMEOUT_WINDOW)
+            self._series[(platform, kind)] = _Series(sketch, item.get("ewma"), int(item.get("samples", 0)))
+
+    def _snapshot(self) -> Dict[str, Any] | None:
+        """在事件循环上取快照（只拷贝桶计数），序列化与写盘交给调用方。"""
+        self._last_save = time.monotonic()
+        if not self.path or not self._dirty:
+            return None
+        self._dirty = False
+        self._snapshots += 1
+        return {"version": 1, "seq": self._snapshots, "saved_at": time.time(), "series": {
+            f"{platform}|{kind}": {"ewma": s.ewma, "samples": s.samples, "sketch": s.sketch.data}
+            for (platform, kind), s in self._series.items()}}
+
+    def _write(self, payload: Dict[str, Any]) -> None:
+        directory = os.path.dirname(self.path)
+        with self._write_lock:
+            if payload["seq"] <= self._written:
+                return
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(prefix=".timeouts.", dir=directory)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(payload, f)
+                os.replace(tmp, self.path)
+                self._written = payload["seq"]
+            except OSError:
+                self._dirty = True
+
+    def _save_in_background(self) -> None:
+        payload = self._snapshot()
+        if payload is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(payload)
+            return
+        self._saving = True
+        future = loop.run_in_executor(None, self._write, payload)
+        future.add_done_callback(lambda _: setattr(self, "_saving", False))
+
+    def save(self) -> None:
+        """同步落盘（无事件循环时用）。"""
+        payload = self._snapshot()
+        if payload is not None:
+            self._write(payload)
+
+    async def asave(self) -> None:
+        """在线程中落盘，不阻塞事件循环。"""
+        payload = self._snapshot()
+        if payload is not None:
+            await asyncio.to_thread(self._write, payload)
+
+    def reset(self) -> None:
+        self._series.clear()
+        self._dirty = True
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for (platform, kind), s in self._series.items():
+            out.setdefault(platform, {})[kind] = {
+                "samples": s.samples,
+                "ewma_ms": round(s.ewma, 1) if s.ewma is not None else None,
+                "widen": round(s.widen, 3),
+                "p50_ms": round(s.sketch.quantile(0.5) or 0, 1),
+                f"p{int(settings.TIMEOUT_QUANTILE * 100)}_ms": round(
+                    s.sketch.quantile(settings.TIMEOUT_QUANTILE) or 0, 1),
+            }
+        return out
+
+
+adaptive_timeouts = AdaptiveTimeouts()
+
+
+class TimeoutMinIx:
+    """策略侧取超时 / 上报耗时；LoginOptions.adaptive_timeouts 关闭时退回固定值，均不超过截止时间。"""
+
+    name: str
+
+    def timeout_ms(self, options: Any, kind: str, default: int) -> int:
+        """阶段超时：自适应值（或固定默认值），再受当前调用剩余的截止预算限制。"""
+        if options.adaptive_timeouts:
+            default = adaptive_timeouts.timeout_ms(self.name, kind, default)
+        return budget_ms(default)
+
+    def observe_latency(self, options: Any, kind: str, value_ms: float) -> None:
+        if options.adaptive_timeouts:
+            adaptive_timeouts.observe(self.name, kind, value_ms)
+
+    def observe_timeout(self, options: Any, kind: str) -> None:
+        if options.adaptive_timeouts:
+            adaptive_timeouts.observe_timeout(self.name, kind)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 下午2:30
+# @Author  : fzf
+# @FileName: test_account_keys.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+
+from core.enums import LoginReasonType
+from core.schemas import LoginOptions, LoginResponse
+from core.strategies.BaijiahaoLogin import BaijiahaoLogin
+
+
+class _Recording(BaijiahaoLogin):
+    def __init__(self) -> None:
+        self.events = []
+
+    async def _auth_pipeline(self, account_file, options):
+        self.events.append(("auth", account_file))
+        await asyncio.sleep(0.02)
+        return LoginResponse(True, LoginReasonType.COOKIE_VALID, path=account_file)
+
+    async def _login_and_save(self, account_file, options):
+        self.events.append(("login start", account_file))
+        await asyncio.sleep(0.05)
+        self.events.append(("login end", account_file))
+        return LoginResponse(True, LoginReasonType.COOKIE_SAVED, path=account_file)
+
+
+def test_equivalent_paths_share_one_auth(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    strategy = _Recording()
+    options = LoginOptions()
+
+    async def main():
+        return await asyncio.gather(strategy.auth("./a.json", options), strategy.auth("a.json", options),
+                                    strategy.auth(str(tmp_path / "a.json"), options))
+
+    results = asyncio.run(main())
+    assert all(r.ok for r in results)
+    assert len(strategy.events) == 1
+
+
+def test_auth_waits_for_running_login_of_same_account(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    strategy = _Recording()
+    options = LoginOptions()
+
+    async def main():
+        login = asyncio.ensure_future(strategy.login_and_save("./a.json", options))
+        await asyncio.sleep(0.01)
+        await asyncio.gather(login, strategy.auth("a.json", options), strategy.auth("b.json", options))
+
+    asyncio.run(main())
+    # 其他账号不受影响，同账号的 auth 排在登录之后
+    assert strategy.events.index(("auth", "b.json")) < strategy.events.index(("login end", "./a.json"))
+    assert strategy.events[-1] == ("auth", "a.json")
+
+
+def test_different_result_options_are_not_coalesced(tmp_path, monkeypatch):
+    from core import store as store_module
+    from core.store.file import FileSessionStore
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(store_module, "_store", FileSessionStore())
+    state = {"cookies": [], "origins": []}
+    calls = []
+
+    class _Login(BaijiahaoLogin):
+        async def execute(self, account_file, options, mode, storage_state=None):
+            calls.append(options.return_state)
+            await asyncio.sleep(0.01)
+            return LoginResponse(True, LoginReasonType.COOKIE_SAVED, data=dict(state), path=account_file)
+
+    strategy = _Login()
+
+    async def main():
+        return await asyncio.gather(strategy.login_and_save("a.json", LoginOptions(return_state=True)),
+                                    strategy.login_and_save("a.json", LoginOptions(return_state=False)),
+                                    strategy.login_and_save("./a.json", LoginOptions(return_state=False)))
+
+    with_state, without_state, joined = asyncio.run(main())
+    assert sorted(calls) == [False, True]
+    assert with_state.data == state
+    assert without_state.data is None and joined.data is None
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 下午6:10
+# @Author  : fzf
+# @FileName: test_auth_cache.py
+# @Software: PyCharm
+from __future__ import annotations
+
+from core.enums import LoginReasonType
+from core.schemas import LoginResponse
+from core.utils import auth_cache as module
+from core.utils.auth_cache import AuthCache
+
+FP = (1, 2, "abc")
+
+
+def _valid() -> LoginResponse:
+    return LoginResponse(True, LoginReasonType.COOKIE_VALID, path="a.json", extra={"signal": "home_url"})
+
+
+def test_hit_requires_same_fingerprint_and_normalized_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = AuthCache(maxsize=10, valid_ttl_s=60, invalid_ttl_s=10)
+    cache.put("baijiahao", "./a.json", FP, _valid())
+    hit = cache.get("baijiahao", "a.json", FP)
+    assert hit is not None and hit.extra == {"signal": "home_url", "cached": True}
+    assert cache.get("baijiahao", "a.json", (1, 3, "abc")) is None
+    # 指纹不一致时条目作废
+    assert cache.get("baijiahao", "a.json", FP) is None
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 2
+
+
+def test_ttl_per_reason_and_uncacheable_results(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: clock[0])
+    cache = AuthCache(maxsize=10, valid_ttl_s=60, invalid_ttl_s=10)
+    cache.put("p", "valid.json", FP, _valid())
+    cache.put("p", "invalid.json", FP, LoginResponse(False, LoginReasonType.COOKIE_INVALID))
+    cache.put("p", "timeout.json", FP, LoginResponse(False, LoginReasonType.NAVIGATION_TIMEOUT))
+    cache.put("p", "nofp.json", None, _valid())
+    assert cache.stats["size"] == 2
+    clock[0] += 30
+    assert cache.get("p", "valid.json", FP) is not None
+    assert cache.get("p", "invalid.json", FP) is None
+    cache.invalidate("p", "valid.json")
+    assert cache.get("p", "valid.json", FP) is None
+
+
+def test_lru_eviction():
+    cache = AuthCache(maxsize=2, valid_ttl_s=60, invalid_ttl_s=10)
+    cache.put("p", "a.json", FP, _valid())
+    cache.put("p", "b.json", FP, _valid())
+    assert cache.get("p", "a.json", FP) is not None
+    cache.put("p", "c.json", FP, _valid())
+    assert cache.get("p", "b.json", FP) is None
+    assert cache.get("p", "a.json", FP) is not None
+    assert cache.stats["evictions"] == 1
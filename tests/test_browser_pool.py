@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 上午11:00
+# @Author  : fzf
+# @FileName: test_browser_pool.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+from types import SimpleNamespace
+
+from core.strategies.utils.browser_pool import _BrowserGroup
+from core.utils.timeouts import ANY_PLATFORM, adaptive_timeouts
+
+
+class _FakeBrowser:
+    def __init__(self) -> None:
+        self.closed = False
+
+    def is_connected(self) -> bool:
+        return not self.closed
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def _driver(launched: list) -> SimpleNamespace:
+    async def launch(**kwargs):
+        launched.append(kwargs)
+        return _FakeBrowser()
+
+    return SimpleNamespace(chromium=SimpleNamespace(launch=launch))
+
+
+def test_launch_not_learned_when_adaptive_timeouts_disabled(monkeypatch):
+    observed = []
+    monkeypatch.setattr(adaptive_timeouts, "observe", lambda *a: observed.append(a))
+    launched = []
+    group = _BrowserGroup(_driver(launched), {"headless": True}, size=2, max_uses=10, max_contexts=1)
+
+    async def main():
+        first = await group.acquire(learn=False)
+        second = await group.acquire()
+        await group.release(first)
+        await group.release(second)
+
+    asyncio.run(main())
+    assert len(launched) == 2
+    assert [a[:2] for a in observed] == [(ANY_PLATFORM, "launch")]
+
+
+def test_group_reuses_browser_up_to_max_contexts():
+    launched = []
+    group = _BrowserGroup(_driver(launched), {}, size=1, max_uses=10, max_contexts=2)
+
+    async def main():
+        a = await group.acquire(learn=False)
+        b = await group.acquire(learn=False)
+        assert a is b
+        waiter = asyncio.ensure_future(group.acquire(learn=False))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await group.release(a)
+        c = await waiter
+        assert c is a
+        await group.release(b)
+        await group.release(c)
+
+    asyncio.run(main())
+    assert len(launched) == 1
+
+
+def test_pool_stays_up_until_last_user_stops(monkeypatch):
+    import playwright.async_api
+    from core.strategies.utils.browser_pool import BrowserPool
+
+    stopped = []
+
+    class _Driver:
+        async def stop(self):
+            stopped.append(1)
+
+    def fake_async_playwright():
+        async def start():
+            return _Driver()
+        return SimpleNamespace(start=start)
+
+    monkeypatch.setattr(playwright.async_api, "async_playwright", fake_async_playwright)
+    pool = BrowserPool()
+
+    async def main():
+        await pool.start()  # 服务
+        await pool.start()  # 批量任务
+        await pool.stop()
+        assert pool.started and not stopped
+        await pool.stop()
+        assert not pool.started and stopped == [1]
+
+    asyncio.run(main())
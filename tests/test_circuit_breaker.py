@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 下午4:30
+# @Author  : fzf
+# @FileName: test_circuit_breaker.py
+# @Software: PyCharm
+from __future__ import annotations
+
+from core.enums import CircuitStateType, LoginReasonType
+from core.schemas import LoginResponse
+from core.strategies.utils import circuit_breaker as cb
+from core.strategies.utils.circuit_breaker import CircuitBreaker, outcome
+
+
+def _open_breaker(monkeypatch, open_s: float = 30.0):
+    """返回 (已打开的熔断器, 可拨动的时钟)。"""
+    clock = [1000.0]
+    monkeypatch.setattr(cb.time, "monotonic", lambda: clock[0])
+    breaker = CircuitBreaker(window=10, min_calls=4, failure_rate=0.5, open_s=open_s)
+    for failure in (False, True, True, False):
+        breaker.record(breaker.acquire(), failure)
+    assert breaker.state == CircuitStateType.OPEN
+    return breaker, clock
+
+
+def test_opens_on_failure_rate_and_rejects(monkeypatch):
+    breaker, _ = _open_breaker(monkeypatch)
+    assert breaker.acquire() is None
+    assert breaker.rejected == 1
+    assert breaker.retry_after_s == 30.0
+
+
+def test_half_open_allows_single_probe_and_success_closes(monkeypatch):
+    breaker, clock = _open_breaker(monkeypatch)
+    clock[0] += 31
+    assert breaker.acquire() is True
+    assert breaker.state == CircuitStateType.HALF_OPEN
+    assert breaker.acquire() is None
+    breaker.record(True, False)
+    assert breaker.state == CircuitStateType.CLOSED
+    assert breaker.acquire() is False
+
+
+def test_failed_probe_reopens_and_uncounted_probe_frees_slot(monkeypatch):
+    breaker, clock = _open_breaker(monkeypatch)
+    clock[0] += 31
+    breaker.record(breaker.acquire(), None)
+    assert breaker.state == CircuitStateType.HALF_OPEN
+    assert breaker.acquire() is True
+    breaker.record(True, True)
+    assert breaker.state == CircuitStateType.OPEN
+    assert breaker.opened == 2
+
+
+def test_outcome_counts_only_platform_health_failures():
+    def res(reason, **extra):
+        return LoginResponse(False, reason, extra=extra)
+
+    assert outcome(res(LoginReasonType.NAVIGATION_TIMEOUT)) is True
+    assert outcome(res(LoginReasonType.PLAYWRIGHT_ERROR, transient=True)) is True
+    assert outcome(res(LoginReasonType.UNKNOWN_ERROR, transient=True)) is True
+    # 代码缺陷 / 未归类异常不打开熔断
+    assert outcome(res(LoginReasonType.UNKNOWN_ERROR)) is None
+    assert outcome(res(LoginReasonType.PLAYWRIGHT_ERROR, transient=False)) is None
+    assert outcome(res(LoginReasonType.USER_ABORTED)) is None
+    assert outcome(LoginResponse(True, LoginReasonType.COOKIE_VALID)) is False
+    assert outcome(res(LoginReasonType.COOKIE_INVALID)) is False
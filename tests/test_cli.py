@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/22 上午10:20
+# @Author  : fzf
+# @FileName: test_cli.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import json
+
+from core import cli
+from core.enums import LoginReasonType
+from core.schemas import LoginOptions, LoginResponse
+from core.service import LoginService
+
+OUTCOMES = {
+    "valid.json": LoginResponse(True, LoginReasonType.COOKIE_VALID),
+    "invalid.json": LoginResponse(False, LoginReasonType.COOKIE_INVALID),
+    "missing.json": LoginResponse(False, LoginReasonType.COOKIE_FILE_MISSING),
+    "saved.json": LoginResponse(True, LoginReasonType.COOKIE_SAVED),
+    "open.json": LoginResponse(False, LoginReasonType.CIRCUIT_OPEN),
+    "nav.json": LoginResponse(False, LoginReasonType.NAVIGATION_TIMEOUT),
+    "pw.json": LoginResponse(False, LoginReasonType.PLAYWRIGHT_ERROR),
+    "unknown.json": LoginResponse(False, LoginReasonType.UNKNOWN_ERROR),
+    "late.json": LoginResponse(False, LoginReasonType.DEADLINE_EXCEEDED),
+}
+
+
+def test_only_conclusive_outcomes_are_checkpointed(tmp_path, monkeypatch):
+    async def fake_run_many(items, **kwargs):
+        for item in items:
+            yield item, LoginResponse(OUTCOMES[item[1]].ok, OUTCOMES[item[1]].reason, path=item[1])
+
+    async def noop():
+        return None
+
+    monkeypatch.setattr(LoginService, "run_many", fake_run_many)
+    monkeypatch.setattr(LoginService, "stop", noop)
+    manifest = tmp_path / "accounts.jsonl"
+    manifest.write_text("".join(json.dumps({"platform": "baijiahao", "account_file": name}) + "\n"
+                                for name in OUTCOMES), encoding="utf-8")
+    output = tmp_path / "results.jsonl"
+    args = cli.parse_args([str(manifest), "-o", str(output)])
+
+    stats = asyncio.run(cli.run(args, LoginOptions()))
+    assert stats["done"] == len(OUTCOMES)
+    done = {json.loads(line)[1] for line in (tmp_path / "accounts.jsonl.ckpt").read_text().splitlines()}
+    assert done == {"valid.json", "invalid.json", "missing.json", "saved.json"}
+    first = json.loads(output.read_text(encoding="utf-8").splitlines()[0])
+    assert first == {"platform": "baijiahao", "account_file": "valid.json", "mode": "auth",
+                     **OUTCOMES["valid.json"].to_dict(), "path": "valid.json"}
+
+    # 续跑只重试暂时性失败
+    stats = asyncio.run(cli.run(args, LoginOptions()))
+    assert stats["resumed"] == 4 and stats["done"] == len(OUTCOMES) - 4
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 下午6:00
+# @Author  : fzf
+# @FileName: test_cookies.py
+# @Software: PyCharm
+from __future__ import annotations
+
+from core.utils.cookies import (COMPACT_FORMAT, compact_storage_state, cookie_header, critical_cookie_expiry,
+                                dumps_storage_state, loads_storage_state, merge_set_cookie, prune_storage_state)
+
+NOW = 1_700_000_000.0
+
+
+def _cookie(name, domain, expires=-1, path="/", **kw):
+    return {"name": name, "value": f"{name}-v", "domain": domain, "path": path, "expires": expires,
+            "httpOnly": False, "secure": False, "sameSite": "Lax", **kw}
+
+
+STATE = {
+    "cookies": [_cookie("BDUSS", ".baidu.com", NOW + 3600, httpOnly=True),
+                _cookie("ad", ".tracker.com"),
+                _cookie("old", "baijiahao.baidu.com", NOW - 1),
+                _cookie("dup", "baijiahao.baidu.com"),
+                {**_cookie("dup", "baijiahao.baidu.com"), "value": "newer"}],
+    "origins": [{"origin": "https://baijiahao.baidu.com", "localStorage": [{"name": "k", "value": "1"}]},
+                {"origin": "https://baijiahao.baidu.com:8443", "localStorage": []},
+                {"origin": "https://tracker.com", "localStorage": [{"name": "t", "value": "1"}]}],
+}
+
+
+def test_prune_keeps_platform_domains_and_drops_expired_and_duplicates():
+    pruned = prune_storage_state(STATE, ["baijiahao.baidu.com"], now=NOW)
+    assert [(c["name"], c["value"]) for c in pruned["cookies"]] == [("BDUSS", "BDUSS-v"), ("dup", "newer")]
+    assert [o["origin"] for o in pruned["origins"]] == ["https://baijiahao.baidu.com"]
+    # 不指定域名时只去重和清理过期
+    assert len(prune_storage_state(STATE, [], now=NOW)["cookies"]) == 3
+
+
+def test_compact_codec_round_trip_and_raw_compat():
+    state = prune_storage_state(STATE, [], now=NOW)
+    compact = compact_storage_state(state)
+    assert compact["format"] == COMPACT_FORMAT
+    assert "path" not in compact["cookies"][0] and compact["cookies"][0]["httpOnly"] is True
+    for kwargs in ({"compact": True}, {"compact": True, "compress": True}, {"compact": False}):
+        assert loads_storage_state(dumps_storage_state(state, **kwargs)) == state
+    # gzip 的 mtime 固定，同样内容的字节一致（指纹稳定）
+    assert dumps_storage_state(state, compress=True) == dumps_storage_state(state, compress=True)
+
+
+def test_cookie_header_and_set_cookie_merge():
+    cookies = [_cookie("a", ".example.com"), _cookie("b", "www.example.com", path="/admin"),
+               _cookie("s", ".example.com", secure=True), _cookie("gone", ".example.com", NOW - 1)]
+    assert cookie_header(cookies, "http://www.example.com/home", now=NOW) == "a=a-v"
+    assert cookie_header(cookies, "https://www.example.com/admin/x", now=NOW) == "a=a-v; b=b-v; s=s-v"
+    merge_set_cookie(cookies, ["a=fresh; Domain=.example.com; Path=/", "c=1"], "https://www.example.com/")
+    assert [c["value"] for c in cookies if c["name"] == "a"] == ["fresh"]
+    assert any(c["name"] == "c" and c["domain"] == "www.example.com" for c in cookies)
+
+
+def test_critical_cookie_expiry():
+    state = {"cookies": [_cookie("BDUSS", ".baidu.com", NOW - 10), _cookie("BDUSS", "passport.baidu.com", NOW + 60),
+                         _cookie("STOKEN", ".baidu.com", NOW - 5), _cookie("SESSION", ".baidu.com")]}
+    expiry = critical_cookie_expiry(state, ["BDUSS", "STOKEN", "SESSION", "PTOKEN"], now=NOW)
+    assert expiry.expired == ["STOKEN"]
+    assert expiry.missing == ["PTOKEN"]
+    assert expiry.earliest == NOW - 5
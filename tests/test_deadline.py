@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 下午6:20
+# @Author  : fzf
+# @FileName: test_deadline.py
+# @Software: PyCharm
+from __future__ import annotations
+import time
+
+from core.utils.deadline import budget_ms, current_deadline, deadline_scope, joined_deadline, remaining_ms
+
+
+def test_scope_keeps_the_earlier_deadline():
+    now = time.time()
+    assert current_deadline() is None and remaining_ms() is None
+    with deadline_scope(now + 10) as outer:
+        assert outer == now + 10
+        with deadline_scope(now + 60) as inner:
+            assert inner == now + 10
+        with deadline_scope(now + 1) as inner:
+            assert current_deadline() == now + 1
+        assert current_deadline() == now + 10
+    assert current_deadline() is None
+
+
+def test_budget_is_clamped_to_remaining_time():
+    assert budget_ms(3_000) == 3_000
+    with deadline_scope(time.time() + 0.5):
+        assert 400 <= budget_ms(3_000) <= 500
+        assert budget_ms(100) == 100
+    with deadline_scope(time.time() - 1):
+        assert remaining_ms() < 0
+        assert budget_ms(3_000) == 1
+
+
+def test_joined_deadline_is_latest_or_unbounded():
+    assert joined_deadline(1.0, 2.0) == 2.0
+    assert joined_deadline(None, 2.0) is None
+    assert joined_deadline(1.0, None) is None
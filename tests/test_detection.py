@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 下午2:00
+# @Author  : fzf
+# @FileName: test_detection.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+from types import SimpleNamespace
+from typing import Dict
+
+from core.enums import AuthSignalType, LoginReasonType
+from core.strategies.utils.detection import LoginDetector
+
+HOME = "https://mp.example.com/home"
+LOGIN = "https://passport.example.com/login"
+API = "https://mp.example.com/api/user/info"
+
+
+class _Locator:
+    first = property(lambda self: self)
+
+    async def wait_for(self, **kwargs) -> None:
+        await asyncio.sleep(10)
+
+    async def count(self) -> int:
+        return 0
+
+
+class _FakePage:
+    """不导航、不出文案的页面，只有接口探测能给出信号。"""
+
+    def __init__(self, status: int, headers: Dict[str, str] | None = None) -> None:
+        self.url = "about:blank"
+        self.main_frame = object()
+        self.probed = []
+
+        async def get(url, **kwargs):
+            self.probed.append((url, kwargs))
+            return SimpleNamespace(status=status, url=url, headers=headers or {})
+
+        self.context = SimpleNamespace(request=SimpleNamespace(get=get))
+
+    def on(self, *args) -> None:
+        pass
+
+    def remove_listener(self, *args) -> None:
+        pass
+
+    def get_by_text(self, text: str) -> _Locator:
+        return _Locator()
+
+
+def _detect(page: _FakePage, api_url: str | None = API):
+    detector = LoginDetector(page, home_url=HOME, login_url=LOGIN, need_login_text="请登录", api_url=api_url,
+                             timeout_ms=200)
+    return asyncio.run(detector.detect(asyncio.sleep(10)))
+
+
+def test_api_probe_valid():
+    page = _FakePage(200)
+    result = _detect(page)
+    assert (result.ok, result.reason, result.signal) == (True, LoginReasonType.COOKIE_VALID, AuthSignalType.API)
+    assert page.probed[0][0] == API
+    assert page.probed[0][1]["max_redirects"] == 0
+
+
+def test_api_probe_invalid_on_401_and_login_redirect():
+    for page in (_FakePage(401), _FakePage(302, {"location": "//passport.example.com/login?u=1"})):
+        result = _detect(page)
+        assert (result.ok, result.reason, result.signal) == (False, LoginReasonType.COOKIE_INVALID,
+                                                             AuthSignalType.API)
+
+
+def test_api_probe_inconclusive_and_disabled():
+    result = _detect(_FakePage(500))
+    assert result.signal == AuthSignalType.NONE
+    assert result.reason == LoginReasonType.NAVIGATION_TIMEOUT
+    page = _FakePage(200)
+    assert _detect(page, api_url=None).signal == AuthSignalType.NONE
+    assert not page.probed
+
+
+def test_auth_check_splits_goto_and_check_timings(monkeypatch):
+    from core.schemas import LoginOptions
+    from core.strategies.BaijiahaoLogin import BaijiahaoLogin
+    from core.strategies.utils import detection
+    from core.strategies.utils.detection import Detection
+    from core.utils.metrics import collect_spans
+
+    async def fake_detect(self, navigate):
+        navigate.close()
+        return Detection(True, LoginReasonType.COOKIE_VALID, AuthSignalType.HOME_URL, HOME, nav_ms=40.0,
+                         elapsed_ms=100.0)
+
+    monkeypatch.setattr(detection.LoginDetector, "detect", fake_detect)
+
+    async def main():
+        with collect_spans() as spans:
+            res = await BaijiahaoLogin()._optimized_auth_check(_FakePage(200), "a.json",
+                                                               LoginOptions(adaptive_timeouts=False), HOME, "请登录")
+        return res, spans.phases
+
+    res, phases = asyncio.run(main())
+    assert res.extra["nav_ms"] == 40.0
+    assert phases == {"goto": 40.0, "check": 60.0}
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 下午5:00
+# @Author  : fzf
+# @FileName: test_errors.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import json
+
+from playwright.async_api import Error as PWError, TimeoutError as PWTimeout
+
+from core.enums import LoginReasonType
+from core.strategies.utils.errors import PHASE_CONTEXT, PHASE_LAUNCH, PHASE_RUN, backoff_ms, classify_error
+
+
+def test_storage_state_load_failures_are_state_errors():
+    for e in (PWError("Error reading storage state from a.json:\nUnexpected token } in JSON at position 10"),
+              PWError("browser.newContext: storageState.cookies[0].expires: expected float, got string"),
+              PWError("ENOENT: no such file or directory, open 'a.json'"),
+              json.JSONDecodeError("Expecting value", "", 0),
+              FileNotFoundError("a.json")):
+        error = classify_error(e, PHASE_CONTEXT)
+        assert (error.reason, error.transient) == (LoginReasonType.COOKIE_INVALID, False), e
+
+
+def test_json_mention_alone_is_not_a_state_error():
+    error = classify_error(RuntimeError("handler expected json payload"), PHASE_CONTEXT)
+    assert error.reason == LoginReasonType.UNKNOWN_ERROR
+    error = classify_error(PWError("net::ERR_CONNECTION_RESET while fetching /api/info.json"), PHASE_CONTEXT)
+    assert (error.reason, error.transient) == (LoginReasonType.PLAYWRIGHT_ERROR, True)
+
+
+def test_run_phase_classification():
+    nav = classify_error(PWTimeout("page.goto: Timeout 3000ms exceeded.\nnavigating to \"https://x\""), PHASE_RUN)
+    assert (nav.reason, nav.transient) == (LoginReasonType.NAVIGATION_TIMEOUT, True)
+    element = classify_error(PWTimeout("locator.wait_for: Timeout 3000ms exceeded."), PHASE_RUN)
+    assert element.reason == LoginReasonType.ELEMENT_TIMEOUT
+    cert = classify_error(PWError("net::ERR_CERT_AUTHORITY_INVALID"), PHASE_RUN)
+    assert (cert.reason, cert.transient) == (LoginReasonType.PLAYWRIGHT_ERROR, False)
+    crash = classify_error(PWError("Target page, context or browser has been closed"), PHASE_RUN)
+    assert crash.transient and not crash.user_abort
+    abort = classify_error(PWError("Target page, context or browser has been closed"), PHASE_RUN, interactive=True)
+    assert abort.user_abort
+    assert classify_error(asyncio.CancelledError(), PHASE_RUN, interactive=True).user_abort
+    assert not classify_error(KeyError("bug"), PHASE_RUN).transient
+
+
+def test_launch_classification():
+    missing = classify_error(PWError("Executable doesn't exist at /ms-playwright/chromium"), PHASE_LAUNCH)
+    assert (missing.reason, missing.transient) == (LoginReasonType.BROWSER_LAUNCH_FAILED, False)
+    assert classify_error(PWTimeout("browserType.launch: Timeout 30000ms exceeded."), PHASE_LAUNCH).transient
+
+
+def test_backoff_is_jittered_exponential_and_capped():
+    for attempt in range(8):
+        ceiling = min(2_000, 100 * 2 ** attempt)
+        samples = [backoff_ms(attempt, 100, 2_000) for _ in range(200)]
+        assert all(ceiling / 2 <= s <= ceiling for s in samples)
+        assert len(set(samples)) > 1
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 下午3:00
+# @Author  : fzf
+# @FileName: test_import.py
+# @Software: PyCharm
+from __future__ import annotations
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("playwright", "httpx", "rich")
+# 冷启动上限（微秒），远宽于本地实测的一两百毫秒，只用来发现重依赖被提前导入这类量级退化
+IMPORT_BUDGET_US = 2_000_000
+
+_PROBE = r"""
+import json, sys
+import core.service
+after_import = [m for m in %(heavy)r if m in sys.modules]
+from core.strategies import LoginStrategyFactory
+LoginStrategyFactory.get("baijiahao")
+print(json.dumps({"after_import": after_import, "after_get": [m for m in %(heavy)r if m in sys.modules]}))
+"""
+
+
+def _probe() -> dict:
+    # 全新解释器：本进程里其他测试早已导入过这些模块
+    out = subprocess.run([sys.executable, "-c", _PROBE % {"heavy": HEAVY_MODULES}], cwd=ROOT, check=True,
+                         capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_heavy_dependencies_not_imported_eagerly():
+    result = _probe()
+    assert result["after_import"] == []
+    assert result["after_get"] == []
+
+
+def _importtime(statement: str) -> dict:
+    """python -X importtime 的输出解析为 {模块名: 累计微秒}。"""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT, check=True,
+                         capture_output=True, text=True)
+    cumulative = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        try:
+            cumulative[name.strip()] = int(total)
+        except ValueError:  # 表头
+            continue
+    return cumulative
+
+
+def test_import_cost_stays_small():
+    cumulative = _importtime("import core; import core.service")
+    assert "core" in cumulative and "core.service" in cumulative
+    assert cumulative["core"] + cumulative["core.service"] < IMPORT_BUDGET_US
+    assert not [m for m in cumulative if m.split(".")[0] in HEAVY_MODULES]
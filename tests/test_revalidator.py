@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 下午5:30
+# @Author  : fzf
+# @FileName: test_revalidator.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import os
+import threading
+
+from core.revalidator import Revalidator
+
+
+def test_incremental_scan_off_loop(tmp_path, monkeypatch):
+    (tmp_path / "baijiahao").mkdir()
+    a = tmp_path / "baijiahao" / "a.json"
+    b = tmp_path / "baijiahao" / "b.json"
+    for f in (a, b):
+        f.write_text("{}")
+    (tmp_path / "baijiahao" / "notes.txt").write_text("")
+    revalidator = Revalidator(str(tmp_path), platform_of=lambda path: "baijiahao")
+    threads = []
+    walk = revalidator._walk
+
+    def spy():
+        threads.append(threading.current_thread())
+        return walk()
+
+    monkeypatch.setattr(revalidator, "_walk", spy)
+
+    async def main():
+        changes = [await revalidator.ascan()]
+        changes.append(await revalidator.ascan())
+        os.utime(a, ns=(0, 1))
+        b.unlink()
+        changes.append(await revalidator.ascan())
+        return changes
+
+    assert asyncio.run(main()) == [2, 0, 2]
+    assert list(revalidator._accounts) == [str(a)]
+    assert all(t is not threading.main_thread() for t in threads)
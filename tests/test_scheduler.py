@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 上午11:30
+# @Author  : fzf
+# @FileName: test_scheduler.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import time
+
+from core.scheduler import FairGate, PlatformScheduler, TokenBucket
+
+
+def test_scheduler_survives_sequential_event_loops():
+    sched = PlatformScheduler(global_concurrency=2)
+
+    async def job():
+        async with sched.slot("baijiahao"):
+            await asyncio.sleep(0.001)
+
+    async def batch():
+        await asyncio.gather(*(job() for _ in range(20)))
+
+    asyncio.run(batch())
+    asyncio.run(batch())
+    stats = sched.stats
+    assert stats["global"]["active"] == 0
+    assert stats["platforms"]["baijiahao"]["completed"] == 40
+    assert stats["platforms"]["baijiahao"]["running"] == 0
+
+
+def test_token_bucket_spaces_out_acquires():
+    bucket = TokenBucket(rate=100, burst=1)
+
+    async def main():
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # 第一个令牌立即可用，之后每 10ms 一个
+    assert asyncio.run(main()) >= 0.035
+
+
+def test_fair_gate_rotates_between_platforms():
+    gate = FairGate(limit=1)
+    order = []
+
+    async def job(platform: str):
+        await gate.acquire(platform)
+        order.append(platform)
+        await asyncio.sleep(0)
+        gate.release()
+
+    async def main():
+        await gate.acquire("hog")
+        tasks = [asyncio.ensure_future(job("hog")) for _ in range(3)]
+        tasks.append(asyncio.ensure_future(job("other")))
+        await asyncio.sleep(0)
+        gate.release()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    # 平台 other 只排了一个，却不必等 hog 的三个全部完成
+    assert order.index("other") == 1
+    assert gate.active == 0
+
+
+def test_fair_gate_cancelled_waiter_hands_slot_on():
+    gate = FairGate(limit=1)
+
+    async def main():
+        await gate.acquire("a")
+        cancelled = asyncio.ensure_future(gate.acquire("a"))
+        waiter = asyncio.ensure_future(gate.acquire("b"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        gate.release()
+        await asyncio.wait_for(waiter, 1)
+        assert gate.active == 1
+
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 上午10:00
+# @Author  : fzf
+# @FileName: test_singleflight.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import time
+
+from core.enums import LoginReasonType
+from core.schemas import LoginResponse
+from core.service import LoginService
+from core.utils.deadline import budget_ms, current_deadline
+from core.utils.singleflight import KeyedLock, SingleFlight
+
+
+def test_deadline_does_not_leak_into_shared_call():
+    """A 带 50ms 截止时间、B 不带，两者合并后 B 不应拿到 A 的预算。"""
+    flight = SingleFlight()
+    seen = {}
+
+    async def work() -> LoginResponse:
+        seen["deadline"] = current_deadline()
+        seen["budget"] = budget_ms(3_000)
+        await asyncio.sleep(0.15)
+        return LoginResponse(True, LoginReasonType.COOKIE_VALID)
+
+    async def main():
+        a = LoginService.within(time.time() + 0.05, "a.json", lambda: flight.do("k", work))
+        b = LoginService.within(None, "a.json", lambda: flight.do("k", work))
+        return await asyncio.gather(a, b)
+
+    res_a, res_b = asyncio.run(main())
+    assert res_a.reason == LoginReasonType.DEADLINE_EXCEEDED
+    assert res_b.reason == LoginReasonType.COOKIE_VALID
+    assert seen == {"deadline": None, "budget": 3_000}
+
+
+def test_concurrent_calls_coalesce():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(10)))
+
+    assert asyncio.run(main()) == [1] * 10
+    assert flight.inflight == 0
+
+
+def test_last_waiter_cancel_cancels_shared_call():
+    flight = SingleFlight()
+    state = {"cleaned": False}
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        finally:
+            state["cleaned"] = True
+
+    async def main():
+        task = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        # 取消传出时底层任务已经完成清理
+        assert state["cleaned"]
+
+    asyncio.run(main())
+    assert flight.inflight == 0
+
+
+def test_one_waiter_cancel_keeps_others():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_keyed_lock_serializes_per_key_and_cleans_up():
+    locks = KeyedLock()
+    events = []
+
+    async def job(key: str, name: str):
+        async with locks.hold(key):
+            events.append(f"{name} in")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} out")
+
+    async def main():
+        await asyncio.gather(job("a", "a1"), job("a", "a2"), job("b", "b1"))
+
+    asyncio.run(main())
+    assert events.index("a1 out") < events.index("a2 in")
+    # 不同 key 互不阻塞
+    assert events.index("b1 in") < events.index("a1 out")
+    assert not locks._locks
+
+
+def test_execute_sees_caller_deadline_through_service(tmp_path, monkeypatch):
+    import json
+
+    from core.schemas import LoginOptions
+    from core.strategies import LoginStrategyFactory
+    from core.strategies.BaijiahaoLogin import BaijiahaoLogin
+    from core.utils.deadline import remaining_ms
+
+    seen = []
+
+    class _Probe(BaijiahaoLogin):
+        async def execute(self, account_file, options, mode, storage_state=None):
+            seen.append((remaining_ms(), budget_ms(30_000)))
+            await asyncio.sleep(0.05)
+            return LoginResponse(True, LoginReasonType.COOKIE_VALID, path=account_file)
+
+    strategy = _Probe()
+    monkeypatch.setattr(LoginStrategyFactory, "get", classmethod(lambda cls, platform: strategy))
+    account = tmp_path / "a.json"
+    account.write_text(json.dumps({"cookies": [], "origins": []}))
+    options = LoginOptions(auth_cache=False, circuit_breaker=False, http_auth=False, offline_precheck=False)
+
+    async def main():
+        now = time.time()
+        first = LoginService.auth("baijiahao", str(account), options=options, deadline=now + 2)
+        # 后加入的调用方截止时间更晚：共享任务按更晚的那个算预算
+        second = LoginService.auth("baijiahao", str(account), options=options, deadline=now + 5)
+        return await asyncio.gather(first, second)
+
+    results = asyncio.run(main())
+    assert all(r.reason == LoginReasonType.COOKIE_VALID for r in results)
+    assert len(seen) == 1
+    left, budget = seen[0]
+    assert left is not None and 4_000 < left <= 5_000
+    assert budget == int(left) or abs(budget - left) < 50
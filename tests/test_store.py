@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 下午3:30
+# @Author  : fzf
+# @FileName: test_store.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+import json
+import threading
+
+import pytest
+
+from core.store.file import FileSessionStore
+from core.store.sqlite import SqliteSessionStore
+
+STATE = {"cookies": [{"name": "BDUSS", "value": "v", "domain": ".baidu.com", "path": "/", "expires": -1,
+                      "httpOnly": True, "secure": True, "sameSite": "None"}],
+         "origins": [{"origin": "https://baijiahao.baidu.com", "localStorage": [{"name": "k", "value": "1"}]}]}
+
+
+@pytest.mark.parametrize("compact,compress", [(True, False), (True, True), (False, False)])
+def test_file_store_round_trip(tmp_path, compact, compress):
+    store = FileSessionStore(compact=compact, compress=compress)
+    account = str(tmp_path / "sub" / "a.json")
+
+    async def main():
+        assert await store.load("baijiahao", account) is None
+        assert await store.fingerprint("baijiahao", account) is None
+        await store.save("baijiahao", account, STATE)
+        assert await store.exists("baijiahao", account)
+        first = await store.fingerprint("baijiahao", account)
+        await store.save("baijiahao", account, {**STATE, "origins": []})
+        return await store.load("baijiahao", account), first, await store.fingerprint("baijiahao", account)
+
+    loaded, first, second = asyncio.run(main())
+    assert loaded == {**STATE, "origins": []}
+    assert first != second
+    # 只留下目标文件，没有残留的临时文件
+    assert [p.name for p in (tmp_path / "sub").iterdir()] == ["a.json"]
+
+
+def test_file_store_reads_raw_playwright_state(tmp_path):
+    account = tmp_path / "a.json"
+    account.write_text(json.dumps(STATE), encoding="utf-8")
+    assert asyncio.run(FileSessionStore().load("baijiahao", str(account))) == STATE
+
+
+def test_file_store_io_runs_off_loop(tmp_path, monkeypatch):
+    import core.store.file as file_module
+
+    threads = []
+    real = file_module.load_storage_state
+
+    def spy(account):
+        threads.append(threading.current_thread())
+        return real(account)
+
+    monkeypatch.setattr(file_module, "load_storage_state", spy)
+    store = FileSessionStore()
+    account = str(tmp_path / "a.json")
+
+    async def main():
+        await store.save("baijiahao", account, STATE)
+        await store.load("baijiahao", account)
+
+    asyncio.run(main())
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_sqlite_store_round_trip(tmp_path):
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+
+    async def main():
+        await store.save("baijiahao", "a", STATE)
+        try:
+            return await store.load("baijiahao", "a"), await store.exists("baijiahao", "b")
+        finally:
+            await store.close()
+
+    assert asyncio.run(main()) == (STATE, False)
+
+
+def test_service_stop_releases_session_store(tmp_path, monkeypatch):
+    from core import store as store_module
+    from core.service import LoginService
+
+    from core.utils.timeouts import adaptive_timeouts
+
+    monkeypatch.setattr(store_module, "_store", None)
+    monkeypatch.setattr(adaptive_timeouts, "path", "")
+    first = SqliteSessionStore(str(tmp_path / "sessions.db"))
+    LoginService.use_store(first)
+
+    async def main():
+        await LoginService.stop()
+        # 关闭后不再留着已关闭的连接，下次按配置重新创建
+        assert store_module._store is None
+        second = store_module.get_session_store()
+        assert second is not first
+        await store_module.close_session_store()
+
+    asyncio.run(main())
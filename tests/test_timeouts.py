@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/21 上午10:30
+# @Author  : fzf
+# @FileName: test_timeouts.py
+# @Software: PyCharm
+from __future__ import annotations
+import asyncio
+
+from core.config import settings
+from core.utils.timeouts import AdaptiveTimeouts, LatencySketch
+
+
+def _learned(n: int = 30, value_ms: float = 500) -> AdaptiveTimeouts:
+    timeouts = AdaptiveTimeouts(path="")
+    for _ in range(n):
+        timeouts.observe("baijiahao", "auth.nav", value_ms)
+    return timeouts
+
+
+def test_default_until_min_samples():
+    timeouts = AdaptiveTimeouts(path="")
+    for _ in range(settings.TIMEOUT_MIN_SAMPLES - 1):
+        timeouts.observe("baijiahao", "auth.nav", 100)
+    assert timeouts.timeout_ms("baijiahao", "auth.nav", 3_000) == 3_000
+
+
+def test_learned_from_successes_and_clamped():
+    timeouts = _learned(value_ms=2_000)
+    learned = timeouts.timeout_ms("baijiahao", "auth.nav", 3_000)
+    assert 2_000 * settings.TIMEOUT_MULTIPLIER * 0.95 <= learned <= 2_000 * settings.TIMEOUT_MULTIPLIER * 1.05
+    fast = _learned(value_ms=10)
+    assert fast.timeout_ms("baijiahao", "auth.nav", 3_000) == settings.TIMEOUT_FLOOR_MS
+
+
+def test_timeouts_widen_boundedly_during_outage():
+    timeouts = _learned()
+    base = timeouts.timeout_ms("baijiahao", "auth.nav", 3_000)
+    for _ in range(100):
+        timeouts.observe_timeout("baijiahao", "auth.nav")
+    widened = timeouts.timeout_ms("baijiahao", "auth.nav", 3_000)
+    assert base < widened <= base * settings.TIMEOUT_MAX_WIDEN + 1
+    assert widened < settings.TIMEOUT_CEILING_MS
+    # 超时不进样本，恢复后逐步回到成功耗时推出的值
+    for _ in range(20):
+        timeouts.observe("baijiahao", "auth.nav", 500)
+    assert timeouts.timeout_ms("baijiahao", "auth.nav", 3_000) == base
+
+
+def test_sketch_quantile_error_bounded():
+    sketch = LatencySketch()
+    for v in range(1, 1001):
+        sketch.add(v)
+    for q in (0.5, 0.9, 0.99):
+        assert abs(sketch.quantile(q) - q * 1000) <= q * 1000 * 0.06
+
+
+def test_sketch_halves_when_full():
+    sketch = LatencySketch(max_count=100)
+    for _ in range(150):
+        sketch.add(50)
+    assert sketch.count <= 100
+    assert 47 <= sketch.quantile(0.5) <= 53
+
+
+def test_state_written_off_loop_and_reloaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TIMEOUT_SAVE_INTERVAL_S", 0)
+    path = tmp_path / "timeouts.json"
+    timeouts = AdaptiveTimeouts(path=str(path))
+
+    async def main():
+        for _ in range(30):
+            timeouts.observe("baijiahao", "auth.nav", 2_000)
+        await timeouts.asave()
+
+    asyncio.run(main())
+    restored = AdaptiveTimeouts(path=str(path))
+    assert restored.timeout_ms("baijiahao", "auth.nav", 3_000) == timeouts.timeout_ms("baijiahao", "auth.nav", 3_000)
+
+
+def test_default_widens_for_platform_slower_than_default():
+    timeouts = AdaptiveTimeouts(path="")
+    for _ in range(100):
+        timeouts.observe_timeout("baijiahao", "auth.nav")
+    widened = timeouts.timeout_ms("baijiahao", "auth.nav", 3_000)
+    assert widened == min(int(3_000 * settings.TIMEOUT_MAX_WIDEN), settings.TIMEOUT_CEILING_MS)
+    # 放宽后开始成功，攒够样本后改由成功耗时决定
+    for _ in range(settings.TIMEOUT_MIN_SAMPLES + 20):
+        timeouts.observe("baijiahao", "auth.nav", 4_000)
+    learned = timeouts.timeout_ms("baijiahao", "auth.nav", 3_000)
+    assert learned > 4_000